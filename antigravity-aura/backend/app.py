@@ -1,14 +1,35 @@
-from flask import Flask, request, jsonify, send_file
-from flask_cors import CORS
-from train_chatbot import MentalHealthChatbot
 import os
+import sys
+import startup_profile
+
+# python app.py --profile-startup: time imports and component loads, print a table and exit
+# (components load synchronously so each one's time and memory can be attributed)
+if __name__ == '__main__' and '--profile-startup' in sys.argv:
+    STARTUP_BUDGET = startup_profile.start(sys.argv[1:])
+    os.environ['BACKGROUND_WARMUP'] = '0'
+
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
+from flask_cors import CORS
+from counseling_index import CounselingIndex
+from counseling_corpus import (CRISIS_HELPLINE_RESPONSE, SUPPORTIVE_RESPONSE, DEFAULT_CORPUS_PATH,
+                               load_counseling_index)
+from keyword_matcher import get_matcher
+from inference_batcher import MicroBatcher
+from chat_pipeline import StagePipeline
+from response_cache import TTLCache, normalize_message
+from retrieval_service import create_retrieval_service
+from translation_service import create_translation_service, language_code
+from tts_cache import TTSCache
+from text_chunking import SentenceBuffer, replace_sentences, split_sentences
+from component_loader import ComponentRegistry
+import model_artifact
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-import google.generativeai as genai
+import hmac
 import json
-from deep_translator import GoogleTranslator
-from gtts import gTTS
-import tempfile
-import io
+import numpy as np
+import queue
+import threading
 
 # Load environment variables
 load_dotenv()
@@ -16,269 +37,250 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
+# Slow components (models, datasets, API clients) load on background threads so the
+# server binds its port immediately; /api/health reports per-component readiness.
+# Until a component is ready, requests fall back to keyword detection and template responses.
+components = ComponentRegistry()
+
+# Set by prefork_server.py: this process is the pre-fork master, so everything loads
+# synchronously and no threads are started until after_fork() runs in each worker
+PREFORK = os.getenv('AURA_PREFORK') == '1'
+
 # Initialize ENHANCED ML-based distress detector (v2 with feature engineering)
 distress_detector = None
-try:
-    from distress_detector_v2 import EnhancedMentalHealthDetector
-    distress_detector = EnhancedMentalHealthDetector(model_type='random_forest')
-    
-    # Try v2 model first (enhanced with 78.85% accuracy)
-    model_path_v2 = os.path.join(os.path.dirname(__file__), 'distress_detector_v2_random_forest.pkl')
-    model_path_v1 = os.path.join(os.path.dirname(__file__), 'distress_detector.pkl')
-    
-    if os.path.exists(model_path_v2):
-        distress_detector.load_model(model_path_v2)
-        print("✅ ENHANCED ML distress detector v2 loaded (RandomForest + Features)")
-        # Display test metrics if available
-        test_metrics = distress_detector.get_test_metrics()
-        if test_metrics and isinstance(test_metrics, dict):
-            print(f"   📊 Gold Standard Test Performance:")
-            print(f"      Accuracy:  {test_metrics['accuracy']*100:.2f}%")
-            print(f"      Precision: {test_metrics['precision']*100:.2f}%")
-            print(f"      Recall:    {test_metrics['recall']*100:.2f}%")
-            print(f"      F1-Score:  {test_metrics['f1_score']*100:.2f}%")
-            print(f"      Model:     {test_metrics['model_type'].upper()}")
-            print(f"      Features:  {test_metrics['feature_count']} (TF-IDF + LIWC + Social + Sentiment)")
-    else:
-        print("⚠️ Enhanced model not found, training now (this may take 2-3 minutes)...")
-        csv_path = os.path.join(os.path.dirname(__file__), 'train_data.csv')
-        if os.path.exists(csv_path):
-            distress_detector.train(csv_path, test_size=0.1, val_size=0.1)
-            distress_detector.save_model(model_path_v2)
-            print("✅ Enhanced ML distress detector v2 trained and saved")
-        else:
-            print("⚠️ train_data.csv not found, ML detection disabled")
-            distress_detector = None
-except Exception as e:
-    print(f"⚠️ Could not load enhanced detector, trying fallback v1: {e}")
-    # Fallback to v1 if v2 fails
+distress_batcher = None
+
+@components.register('distress_detector', 'ML distress detector (v2 RandomForest, v1 fallback)')
+def load_distress_detector():
+    global distress_detector
+    detector = None
     try:
+        from distress_detector_v2 import EnhancedMentalHealthDetector
+        detector = EnhancedMentalHealthDetector(model_type='random_forest')
+        
+        # Try v2 model first (enhanced with 78.85% accuracy)
+        # Prefer the memory-mappable artifact; a pickle is converted once on first load
+        model_path_v2 = os.path.join(os.path.dirname(__file__), 'distress_detector_v2_random_forest.pkl')
+        artifact_path_v2 = model_artifact.artifact_path(model_path_v2)
+        
+        has_artifact = model_artifact.is_artifact(artifact_path_v2)
+        if has_artifact and not model_artifact.is_stale(artifact_path_v2, model_path_v2):
+            try:
+                detector.load_model(artifact_path_v2)
+            except Exception as e:
+                # Corrupt or from another version: the pickle is still the source of truth
+                print(f"⚠️ Could not load distress detector artifact, using the pickle: {e}")
+                detector = EnhancedMentalHealthDetector(model_type='random_forest')
+        elif has_artifact and os.path.exists(model_path_v2):
+            print("ℹ️ Distress detector pickle changed since its artifact was built, converting again")
+        if not detector.trained and os.path.exists(model_path_v2):
+            detector.load_model(model_path_v2)
+            convert_distress_artifact(detector, artifact_path_v2, model_path_v2)
+        
+        if detector.trained:
+            print("✅ ENHANCED ML distress detector v2 loaded (RandomForest + Features)")
+            # Display test metrics if available
+            test_metrics = detector.get_test_metrics()
+            if test_metrics and isinstance(test_metrics, dict):
+                print(f"   📊 Gold Standard Test Performance:")
+                print(f"      Accuracy:  {test_metrics['accuracy']*100:.2f}%")
+                print(f"      Precision: {test_metrics['precision']*100:.2f}%")
+                print(f"      Recall:    {test_metrics['recall']*100:.2f}%")
+                print(f"      F1-Score:  {test_metrics['f1_score']*100:.2f}%")
+                print(f"      Model:     {test_metrics['model_type'].upper()}")
+                print(f"      Features:  {test_metrics['feature_count']} (TF-IDF + LIWC + Social + Sentiment)")
+        else:
+            print("⚠️ Enhanced model not found, training now in the background (this may take 2-3 minutes)...")
+            csv_path = os.path.join(os.path.dirname(__file__), 'train_data.csv')
+            if os.path.exists(csv_path):
+                detector.train(csv_path, test_size=0.1, val_size=0.1)
+                detector.save_model(model_path_v2)
+                convert_distress_artifact(detector, artifact_path_v2, model_path_v2)
+                print("✅ Enhanced ML distress detector v2 trained and saved")
+            else:
+                print("⚠️ train_data.csv not found, ML detection disabled")
+                detector = None
+    except Exception as e:
+        print(f"⚠️ Could not load enhanced detector, trying fallback v1: {e}")
+        # Fallback to v1 if v2 fails
         from distress_detector import MentalHealthDetector
-        distress_detector = MentalHealthDetector()
+        detector = MentalHealthDetector()
         model_path = os.path.join(os.path.dirname(__file__), 'distress_detector.pkl')
-        if os.path.exists(model_path):
-            distress_detector.load_model(model_path)
-            print("✅ ML distress detector v1 loaded (fallback)")
-    except Exception as e2:
-        print(f"⚠️ Could not load any distress detector: {e2}")
-        distress_detector = None
-
-# Load train_data.csv as primary dataset
-counseling_dataset = []
-import csv
-import pandas as pd
-
-try:
+        v1_artifact = model_artifact.artifact_path(model_path)
+        if model_artifact.is_artifact(v1_artifact) and not model_artifact.is_stale(v1_artifact, model_path):
+            try:
+                detector.load_model(v1_artifact)
+            except Exception as artifact_error:
+                print(f"⚠️ Could not load v1 distress detector artifact, using the pickle: {artifact_error}")
+                detector = MentalHealthDetector()
+        if not detector.trained:
+            if not os.path.exists(model_path):
+                raise RuntimeError(f"Could not load any distress detector: {e}")
+            detector.load_model(model_path)
+        print("✅ ML distress detector v1 loaded (fallback)")
+    
+    if detector is None:
+        return False
+    
+    # Pre-fork master: worker threads don't survive fork, so each worker starts its own batcher
+    if not PREFORK:
+        start_distress_batcher(detector)
+    
+    # Publish last: requests start using the detector once it is fully set up
+    distress_detector = detector
+    return type(detector).__name__
+
+def convert_distress_artifact(detector, artifact_path, source_path):
+    """Write the memory-mappable artifact; on failure keep serving from the pickle"""
+    try:
+        detector.save_artifact(artifact_path, source=source_path)
+    except Exception as e:
+        # Read-only model directory, full disk...: the next start tries again
+        print(f"⚠️ Could not convert distress detector to an artifact (serving from the pickle): {e}")
+
+def start_distress_batcher(detector):
+    """Micro-batch concurrent distress predictions into one vectorized call
+    
+    Tune with DISTRESS_BATCH_MAX_SIZE / DISTRESS_BATCH_MAX_WAIT_MS (throughput vs tail latency)
+    """
+    global distress_batcher
+    if not hasattr(detector, 'predict_distress_batch'):
+        return
+    distress_batcher = MicroBatcher(
+        detector.predict_distress_batch,
+        max_batch_size=int(os.getenv('DISTRESS_BATCH_MAX_SIZE', '32')),
+        max_wait_ms=float(os.getenv('DISTRESS_BATCH_MAX_WAIT_MS', '5')),
+        name='distress'
+    )
+    print(f"✅ Distress micro-batching enabled (max batch {distress_batcher.max_batch_size}, max wait {distress_batcher.max_wait*1000:.1f}ms)")
+
+# Counseling dataset: compiled artifact (python counseling_corpus.py) or train_data.csv
+counseling_index = None
+COUNSELING_CORPUS_PATH = os.getenv('COUNSELING_CORPUS_PATH', DEFAULT_CORPUS_PATH)
+
+@components.register('counseling_index', 'Counseling dataset and retrieval index')
+def load_counseling():
+    global counseling_index
     # Load from train_data.csv in parent directory
-    csv_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'train_data.csv')
+    csv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'train_data.csv')
     
-    if os.path.exists(csv_path):
-        # Read CSV using pandas for better handling
-        df = pd.read_csv(csv_path)
-        
-        # Create context-response pairs from the distress dataset
-        for _, row in df.iterrows():
-            text = str(row['text']) if 'text' in row else ''
-            label = int(row['label']) if 'label' in row else 0
-            confidence = float(row['confidence']) if 'confidence' in row else 0.5
-            sentiment = float(row['sentiment']) if 'sentiment' in row else 0.0
-            
-            if len(text) < 20:  # Skip very short texts
-                continue
-            
-            # Determine category based on label and content
-            category = 'crisis' if label == 1 else 'general'
-            
-            # Generate appropriate response based on distress level
-            if label == 1:  # Distress detected
-                response = ("I hear how much pain you're going through, and I want you to know that you're not alone. "
-                           "What you're feeling is valid, and there are people who care about you and want to help. "
-                           "Please consider reaching out to a crisis helpline immediately:\n\n"
-                           "🇮🇳 India Crisis Helplines:\n"
-                           "• Tele MANAS: 14416 or 1800-89-14416 (24/7, Available in 20 languages)\n"
-                           "• KIRAN Mental Health: 1800-599-0019 (24/7 free)\n"
-                           "• Vandrevala Foundation: 1860-2662-345\n"
-                           "• iCall: 9152987821\n\n"
-                           "Your life has value, and with support, things can get better. "
-                           "Would you like to talk more about what you're experiencing?")
-            else:
-                response = ("Thank you for sharing what's on your mind. I'm here to listen and support you. "
-                           "It sounds like you're dealing with something challenging. "
-                           "Remember that seeking help is a sign of strength, not weakness. "
-                           "Would you like to explore some coping strategies or talk more about how you're feeling?")
-            
-            counseling_dataset.append({
-                'context': text,
-                'response': response,
-                'categories': [category],
-                'quality_score': int(confidence * 100),
-                'label': label,
-                'sentiment': sentiment
-            })
-        
-        print(f"✅ Loaded {len(counseling_dataset)} entries from train_data.csv")
-        avg_quality = sum(e.get('quality_score', 0) for e in counseling_dataset) / len(counseling_dataset) if counseling_dataset else 0
+    if os.path.isdir(COUNSELING_CORPUS_PATH) or os.path.exists(csv_path):
+        with startup_profile.phase('corpus open / dataset build', 'counseling_index'):
+            index, labels = load_counseling_index(csv_path, COUNSELING_CORPUS_PATH)
+        print(f"✅ Loaded {len(index)} counseling entries")
+        avg_quality = float(np.mean(index.quality)) if len(index) else 0
         print(f"   📊 Average quality score: {avg_quality:.1f}")
-        distress_count = sum(1 for e in counseling_dataset if e.get('label') == 1)
-        print(f"   📊 Distress samples: {distress_count} / {len(counseling_dataset)} ({distress_count/len(counseling_dataset)*100:.1f}%)")
+        distress_count = int(np.count_nonzero(labels == 1))
+        print(f"   📊 Distress samples: {distress_count} / {len(index)} ({distress_count/max(len(index), 1)*100:.1f}%)")
     else:
         print(f"⚠️ train_data.csv not found at {csv_path}, trying fallback...")
         # Fallback to processed dataset
+        dataset = []
         dataset_path = os.path.join(os.path.dirname(__file__), 'combined_dataset_processed_simple.json')
         if os.path.exists(dataset_path):
             with open(dataset_path, 'r', encoding='utf-8') as f:
-                counseling_dataset = json.load(f)
-            print(f"✅ Loaded {len(counseling_dataset)} processed counseling responses (fallback)")
-except Exception as e:
-    print(f"⚠️ Could not load dataset: {e}")
-    import traceback
-    traceback.print_exc()
+                dataset = json.load(f)
+            print(f"✅ Loaded {len(dataset)} processed counseling responses (fallback)")
+        index = CounselingIndex(dataset)
+    
+    print(f"✅ Counseling retrieval index ready ({len(index)} responses, {len(index.token_postings)} tokens)")
+    counseling_index = index
+    return f"{len(index)} responses"
+
+# Compile all crisis/category keyword lists into the shared matcher at startup
+# (cheap, and the keyword detector is the fallback while models warm up)
+crisis_matcher = get_matcher()
 
 # Function to find best matching response from dataset (enhanced)
 def find_best_counseling_response(user_message):
-    """Find best matching response using intelligent scoring"""
-    if not counseling_dataset:
+    """Find best matching response using intelligent scoring (inverted index)"""
+    if not counseling_index:
         return None
     
-    user_message_lower = user_message.lower()
-    
-    # Category keywords for intelligent matching
-    category_keywords = {
-        'crisis': ['suicide', 'suicidal', 'kill myself', 'end my life', 'die', 'death', 'cant take', "can't take"],
-        'depression': ['depression', 'depressed', 'sad', 'hopeless', 'empty', 'worthless', 'useless'],
-        'anxiety': ['anxiety', 'anxious', 'worried', 'panic', 'nervous', 'stress', 'overwhelmed'],
-        'trauma': ['abuse', 'trauma', 'hurt', 'violated', 'ptsd', 'assault'],
-        'relationships': ['relationship', 'marriage', 'partner', 'boyfriend', 'girlfriend', 'spouse', 'divorce'],
-        'family': ['family', 'parent', 'mother', 'father', 'child', 'sibling', 'brother', 'sister'],
-        'self-esteem': ['self esteem', 'confidence', 'worth', 'value', 'believe in myself'],
-        'grief': ['grief', 'loss', 'died', 'death', 'mourning'],
-        'sleep': ['sleep', 'insomnia', 'cant sleep', "can't sleep", 'tired', 'exhausted'],
-        'general': ['help', 'need', 'advice', 'what should']
-    }
-    
-    # Detect user message category
-    user_categories = []
-    for category, keywords in category_keywords.items():
-        if any(keyword in user_message_lower for keyword in keywords):
-            user_categories.append(category)
-    
-    if not user_categories:
-        user_categories = ['general']
-    
-    scored_responses = []
-    for entry in counseling_dataset:
-        context = entry.get('context', entry.get('Context', '')).lower()
-        response = entry.get('response', entry.get('Response', ''))
-        entry_categories = entry.get('categories', ['general'])
-        quality_score = entry.get('quality_score', 50)
-        
-        if not response or len(response) < 50:
-            continue
-        
-        score = 0
-        
-        # Category match (high weight)
-        category_matches = len(set(user_categories) & set(entry_categories))
-        score += category_matches * 30
-        
-        # Keyword matching in context
-        for category in user_categories:
-            keywords = category_keywords.get(category, [])
-            for keyword in keywords:
-                if keyword in user_message_lower and keyword in context:
-                    score += 15
-        
-        # Word overlap (lower weight, for general matching)
-        user_words = set(user_message_lower.split())
-        context_words = set(context.split())
-        # Remove common words
-        stop_words = {'i', 'me', 'my', 'am', 'is', 'are', 'the', 'a', 'an', 'and', 'or', 'but'}
-        user_words -= stop_words
-        context_words -= stop_words
-        overlap = len(user_words & context_words)
-        score += overlap * 2
-        
-        # Quality boost (prefer higher quality responses)
-        score += quality_score * 0.2
-        
-        # Priority for crisis responses
-        if 'crisis' in user_categories and 'crisis' in entry_categories:
-            score += 50
-        
-        if score > 0:
-            scored_responses.append((score, response, entry_categories))
-    
-    if scored_responses:
-        # Sort by score (highest first)
-        scored_responses.sort(reverse=True, key=lambda x: x[0])
-        # Return best matching response
-        return scored_responses[0][1]
-    
-    return None
+    return counseling_index.best_response(user_message)
 
 # Initialize Gemini AI
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+genai = None  # google.generativeai, imported only when an API key is configured
 use_gemini = False
 gemini_model = None
 gemini_base_model_name = None  # Store the base model name
 
-if GEMINI_API_KEY and GEMINI_API_KEY != 'your_gemini_api_key_here':
+@components.register('gemini', 'Gemini / Gemma API client')
+def load_gemini():
+    global genai, use_gemini, gemini_model, gemini_base_model_name
+    if not GEMINI_API_KEY or GEMINI_API_KEY == 'your_gemini_api_key_here':
+        print("ℹ️ No Gemini API key found. Using trained model only.")
+        return False
+    
+    import google.generativeai as genai
+    genai.configure(api_key=GEMINI_API_KEY)
+    
+    # List all available models for debugging
+    print("📋 Listing available models...")
     try:
-        genai.configure(api_key=GEMINI_API_KEY)
-        
-        # List all available models for debugging
-        print("📋 Listing available models...")
+        available_models = []
+        with startup_profile.phase('list_models (network)', 'gemini'):
+            listed_models = list(genai.list_models())
+        for model in listed_models:
+            if 'generateContent' in model.supported_generation_methods:
+                available_models.append(model.name)
+                print(f"   • {model.name}")
+        print(f"✅ Found {len(available_models)} models supporting generateContent")
+    except Exception as list_error:
+        print(f"⚠️ Could not list models: {list_error}")
+    
+    # Using Gemma 3 / Gemini models for enhanced mental health support
+    model_names = [
+        'models/gemma-3-27b-it',      # Gemma 3 27B Instruction Tuned (Primary)
+        'models/gemini-2.5-flash',    # Gemini 2.5 Flash (Fallback)
+        'models/gemini-2.0-flash',    # Gemini 2.0 Flash (Fallback)
+        'models/gemini-2.5-pro',      # Gemini 2.5 Pro (Fallback)
+    ]
+    for model_name in model_names:
         try:
-            available_models = []
-            for model in genai.list_models():
-                if 'generateContent' in model.supported_generation_methods:
-                    available_models.append(model.name)
-                    print(f"   • {model.name}")
-            print(f"✅ Found {len(available_models)} models supporting generateContent")
-        except Exception as list_error:
-            print(f"⚠️ Could not list models: {list_error}")
-        
-        # Using Gemma 3 / Gemini models for enhanced mental health support
-        model_names = [
-            'models/gemma-3-27b-it',      # Gemma 3 27B Instruction Tuned (Primary)
-            'models/gemini-2.5-flash',    # Gemini 2.5 Flash (Fallback)
-            'models/gemini-2.0-flash',    # Gemini 2.0 Flash (Fallback)
-            'models/gemini-2.5-pro',      # Gemini 2.5 Pro (Fallback)
-        ]
-        for model_name in model_names:
-            try:
-                gemini_model = genai.GenerativeModel(model_name)
-                # Skip test generation - initialize model only
-                # test_response = gemini_model.generate_content("Hi")
-                use_gemini = True
-                gemini_base_model_name = model_name  # Store for later use
-                print(f"✅ Gemini AI initialized successfully with model: {model_name}")
-                break
-            except Exception as model_error:
-                print(f"⚠️ Failed to load {model_name}: {model_error}")
-                continue
-        
-        if not use_gemini:
-            print("⚠️ All Gemini models failed to initialize")
-            print("   Falling back to trained model only...")
-            gemini_model = None
-    except Exception as e:
-        print(f"⚠️ Gemini configuration failed: {e}")
-        print("   Falling back to trained model only...")
-        use_gemini = False
-        gemini_model = None
-else:
-    print("ℹ️ No Gemini API key found. Using trained model only.")
+            model = genai.GenerativeModel(model_name)
+            # Skip test generation - initialize model only
+            gemini_model = model
+            gemini_base_model_name = model_name  # Store for later use
+            use_gemini = True
+            print(f"✅ Gemini AI initialized successfully with model: {model_name}")
+            return model_name
+        except Exception as model_error:
+            print(f"⚠️ Failed to load {model_name}: {model_error}")
+    
+    print("   Falling back to trained model only...")
+    raise RuntimeError("All Gemini models failed to initialize")
+
+# Cache for Gemini responses (repeated greetings/intents answer without a round trip)
+# Bump GEMINI_PROMPT_VERSION whenever the prompt template changes
+GEMINI_PROMPT_VERSION = 'v1'
+gemini_response_cache = TTLCache(
+    max_entries=int(os.getenv('GEMINI_CACHE_MAX_ENTRIES', '1000')),
+    ttl_seconds=float(os.getenv('GEMINI_CACHE_TTL_SECONDS', '3600')),
+    name='gemini'
+)
 
-# RAG components - DISABLED by default for faster startup
-# Will be loaded on first request if needed
-use_rag = False
-rag_collection = None
-embedding_model = None
-chroma_client = None
+# RAG knowledge base (python setup_rag.py): the embedding model and vector store load as a
+# lazy component on the first Gemini prompt, so processes that never build one never pay
+# for them; requests arriving before they are ready (or after a failed load) skip retrieval
+retrieval_service = create_retrieval_service()
+use_rag = retrieval_service is not None
+RAG_RETRY_SECONDS = float(os.getenv('RAG_RETRY_SECONDS', '60'))
 
-print("ℹ️ RAG system disabled for faster startup")
-print("   Server will use Gemini AI for responses")
+@components.register('retrieval', 'RAG embedding model and vector store', lazy=use_rag)
+def load_retrieval():
+    if not use_rag:
+        print("ℹ️ RAG system disabled (no chroma_db; set RAG_ENABLED=1 to force)")
+        return False
+    try:
+        retrieval_service.load()
+    except ImportError as e:
+        # Retrying cannot help until the packages are installed
+        print(f"⚠️ RAG disabled, dependencies missing (pip install sentence-transformers chromadb): {e}")
+        return False
+    print("✅ RAG retrieval ready")
+    return 'sentence-transformers + chroma'
 
 # Initialize T5 model for empathetic response generation
 t5_model = None
@@ -288,23 +290,54 @@ use_t5 = False
 # T5 disabled for faster startup
 print("ℹ️ T5 model disabled for faster startup")
 
-# Google Translate is available globally - no initialization needed
-use_translator = True
-print("✅ Google Translate initialized successfully")
-print("   Supports 100+ languages including Hindi, Tamil, Telugu, Marathi, etc.")
-print("   Using Gemini AI for all responses")
+# Translation service: pooled translator backend + persistent SQLite cache
+use_translator = False
+translation_service = None
+
+@components.register('translator', 'Translation service and cache')
+def load_translator():
+    global use_translator, translation_service
+    translation_service = create_translation_service()
+    use_translator = True
+    print(f"✅ Translation service initialized ({translation_service.backend.name} backend, {len(translation_service.cache)} cached translations)")
+    print("   Supports 100+ languages including Hindi, Tamil, Telugu, Marathi, etc.")
+    return f"{translation_service.backend.name} backend"
 
-# Initialize chatbot
-chatbot = MentalHealthChatbot()
+# Initialize chatbot (sklearn import + model unpickling, so load it in the background)
+chatbot = None
 
-# Load the trained model
-model_path = 'chatbot_model.pkl'
-if os.path.exists(model_path):
-    chatbot.load_model(model_path)
+@components.register('chatbot', 'Trained TF-IDF chatbot')
+def load_chatbot():
+    global chatbot
+    from train_chatbot import MentalHealthChatbot
+    model = MentalHealthChatbot()
+    
+    # Load the trained model
+    model_path = 'chatbot_model.pkl'
+    if not os.path.exists(model_path):
+        print("⚠️ No trained model found. Please train the model first.")
+        print("Run: python train_chatbot.py")
+        return False
+    model.load_model(model_path)
+    chatbot = model
     print("✅ Chatbot model loaded successfully!")
+
+def trained_model_response(user_message, mode):
+    """Trained chatbot reply, or a template response while the chatbot is unavailable"""
+    if chatbot is None:
+        return CRISIS_HELPLINE_RESPONSE if detect_crisis_keywords(user_message) else SUPPORTIVE_RESPONSE
+    # Pick up examples added by other processes (a stat() of the delta file)
+    try:
+        chatbot.refresh()
+    except Exception as e:
+        print(f"⚠️ Chatbot delta refresh failed: {e}")
+    return chatbot.get_response(user_message, mode)
+
+# Start warm-up (BACKGROUND_WARMUP=0 loads everything before the server starts, as before)
+if os.getenv('BACKGROUND_WARMUP', '1') != '0' and not PREFORK:
+    components.start()
 else:
-    print("⚠️ No trained model found. Please train the model first.")
-    print("Run: python train_chatbot.py")
+    components.load_all()
 
 @app.route('/', methods=['GET'])
 def root():
@@ -314,11 +347,108 @@ def root():
         'status': 'running',
         'endpoints': {
             'chat': '/api/chat (POST)',
+            'chat_stream': '/api/chat/stream (POST, Server-Sent Events)',
             'health': '/api/health (GET)',
+            'metrics': '/api/metrics (GET)',
             'modes': '/api/modes (GET)'
         }
     })
 
+# /api/chat stage graph: stages run lazily, independent ones concurrently
+chat_pipeline = StagePipeline()
+
+@chat_pipeline.stage('ml_distress')
+def ml_distress_stage(run):
+    """Step 1: ML-based distress detection (PRIMARY)"""
+    if not distress_detector:
+        return None
+    user_message = run.inputs['message']
+    try:
+        if distress_batcher:
+            result = distress_batcher.predict(user_message)
+        else:
+            result = distress_detector.predict_distress(user_message)
+        print(f"🧠 ML Distress Detection: {result}")
+        if result.get('is_distress', False):
+            print(f"🚨 ML MODEL DETECTED CRISIS (confidence: {result.get('confidence', 0):.2%})")
+        return result
+    except Exception as e:
+        print(f"⚠️ ML distress detection error: {e}")
+        return None
+
+@chat_pipeline.stage('crisis_keywords')
+def crisis_keywords_stage(run):
+    """Step 2: Keyword-based detection (BACKUP)"""
+    has_crisis_keywords = detect_crisis_keywords(run.inputs['message'])
+    if has_crisis_keywords:
+        print(f"🚨 CRISIS KEYWORDS DETECTED: Immediate intervention required!")
+    return has_crisis_keywords
+
+@chat_pipeline.stage('distress')
+def distress_stage(run):
+    """Step 3: UNION approach - flag as crisis if EITHER detector triggers"""
+    ml_distress_result = run.result('ml_distress')
+    has_crisis_keywords = run.result('crisis_keywords')
+    ml_detected_crisis = bool(ml_distress_result and ml_distress_result.get('is_distress', False))
+    
+    is_crisis = ml_detected_crisis or has_crisis_keywords
+    
+    if is_crisis:
+        # Ensure crisis intervention is flagged
+        if ml_distress_result:
+            ml_distress_result['is_distress'] = True
+            ml_distress_result['requires_crisis_intervention'] = True
+            # Boost confidence if keywords also matched
+            if has_crisis_keywords and ml_distress_result.get('confidence', 0) < 0.95:
+                ml_distress_result['confidence'] = 0.95
+                ml_distress_result['probability'] = 0.95
+                print(f"✅ Crisis confirmed by BOTH ML and keywords (high confidence)")
+        else:
+            # ML not available, create result from keywords
+            ml_distress_result = {
+                'is_distress': True,
+                'confidence': 0.90,  # High but not 100% (keywords can have false positives)
+                'probability': 0.90,
+                'requires_crisis_intervention': True
+            }
+            print(f"✅ Crisis detected by keywords (ML unavailable)")
+    
+    return ml_distress_result
+
+@chat_pipeline.stage('counseling_match')
+def counseling_match_stage(run):
+    """Best matching response from the professional counseling dataset"""
+    return find_best_counseling_response(run.inputs['message'])
+
+@chat_pipeline.stage('response')
+def response_stage(run):
+    """Generate the reply; returns (response, source)"""
+    user_message = run.inputs['message']
+    mode = run.inputs['mode']
+    
+    # Counseling match is only used in professional mode, so only computed there
+    if mode == 'professional':
+        counseling_response = run.result('counseling_match')
+        if counseling_response:
+            return counseling_response, 'counseling_dataset'
+    
+    if use_gemini and run.inputs['use_ai']:
+        # Use Gemini AI with mental health context
+        # Distress detection finishes long before generation, so checking it before caching is free
+        def not_crisis():
+            distress = run.result('distress')
+            return not (distress and distress.get('is_distress'))
+        return get_gemini_response(user_message, mode, run.inputs['language'], cacheable=not_crisis), 'gemini'
+    
+    if use_t5:
+        # Use T5 for empathetic response generation
+        response = generate_t5_response(user_message, mode)
+        if response:
+            return response, 't5_model'
+    
+    # Use trained model (also the T5 fallback)
+    return trained_model_response(user_message, mode), 'trained_model'
+
 @app.route('/api/chat', methods=['POST', 'OPTIONS'])
 def chat():
     """Handle chat requests with ML-based distress detection"""
@@ -344,75 +474,15 @@ def chat():
         
         # HYBRID Crisis Detection: ML Model (primary) + Keywords (backup)
         # ML model has 78.85% accuracy, keywords expanded to catch paraphrased language
+        # Distress detection and response generation are independent, so they run concurrently
+        run = chat_pipeline.run(message=user_message, mode=mode, use_ai=use_ai, language=language)
+        run.start('ml_distress', 'response')
         
-        # Step 1: ML-based distress detection (PRIMARY)
-        ml_distress_result = None
-        ml_detected_crisis = False
-        
-        if distress_detector:
-            try:
-                ml_distress_result = distress_detector.predict_distress(user_message)
-                print(f"🧠 ML Distress Detection: {ml_distress_result}")
-                ml_detected_crisis = ml_distress_result.get('is_distress', False)
-                
-                if ml_detected_crisis:
-                    print(f"🚨 ML MODEL DETECTED CRISIS (confidence: {ml_distress_result.get('confidence', 0):.2%})")
-            except Exception as e:
-                print(f"⚠️ ML distress detection error: {e}")
-        
-        # Step 2: Keyword-based detection (BACKUP)
-        has_crisis_keywords = detect_crisis_keywords(user_message)
-        if has_crisis_keywords:
-            print(f"🚨 CRISIS KEYWORDS DETECTED: Immediate intervention required!")
-        
-        # Step 3: UNION approach - flag as crisis if EITHER detector triggers
-        is_crisis = ml_detected_crisis or has_crisis_keywords
-        
-        if is_crisis:
-            # Ensure crisis intervention is flagged
-            if ml_distress_result:
-                ml_distress_result['is_distress'] = True
-                ml_distress_result['requires_crisis_intervention'] = True
-                # Boost confidence if keywords also matched
-                if has_crisis_keywords and ml_distress_result.get('confidence', 0) < 0.95:
-                    ml_distress_result['confidence'] = 0.95
-                    ml_distress_result['probability'] = 0.95
-                    print(f"✅ Crisis confirmed by BOTH ML and keywords (high confidence)")
-            else:
-                # ML not available, create result from keywords
-                ml_distress_result = {
-                    'is_distress': True,
-                    'confidence': 0.90,  # High but not 100% (keywords can have false positives)
-                    'probability': 0.90,
-                    'requires_crisis_intervention': True
-                }
-                print(f"✅ Crisis detected by keywords (ML unavailable)")
-        
-        # Try to find a matching response from professional counseling dataset first
-        counseling_response = find_best_counseling_response(user_message)
-        
-        if counseling_response and mode == 'professional':
-            # Use professional counseling response from dataset
-            response = counseling_response
-            source = 'counseling_dataset'
-        elif use_gemini and use_ai:
-            # Use Gemini AI with mental health context
-            response = get_gemini_response(user_message, mode, language)
-            source = 'gemini'
-        elif use_t5:
-            # Use T5 for empathetic response generation
-            response = generate_t5_response(user_message, mode)
-            source = 't5_model'
-            # Fallback if T5 fails
-            if not response:
-                response = chatbot.get_response(user_message, mode=mode)
-                source = 'trained_model'
-        else:
-            # Use trained model
-            response = chatbot.get_response(user_message, mode=mode)
-            source = 'trained_model'
+        ml_distress_result = run.result('distress')
+        response, source = run.result('response')
         
         print(f"✅ Sending response ({source}): {response[:100]}...")
+        print(f"⏱️ Stage timings (ms): {run.timings()}")
         
         # Build response with ML distress info
         response_data = {
@@ -436,82 +506,201 @@ def chat():
         print(f"❌ Error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def sse_event(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def distress_payload(ml_distress_result):
+    """JSON-safe distress detection summary (same shape as /api/chat)"""
+    if not ml_distress_result:
+        return None
+    return {
+        'is_distress': bool(ml_distress_result['is_distress']),
+        'confidence': float(ml_distress_result['confidence']),
+        'distress_probability': float(ml_distress_result.get('probability', 0.0)),
+        'requires_crisis_intervention': bool(ml_distress_result.get('requires_crisis_intervention', False))
+    }
+
+def stream_gemini_sentences(user_message, mode, language, cacheable=None, reply=None):
+    """Yield translated sentences as Gemini streams its reply; falls back to the trained model
+    
+    If reply (a dict) is given, reply['text'] is set to the full reply with its line
+    breaks, the same text that gets cached.
+    """
+    if reply is None:
+        reply = {}
+    cache_key = gemini_cache_key(user_message, mode, language)
+    keyword_crisis = detect_crisis_keywords(user_message)
+    if not keyword_crisis:
+        cached_response = gemini_response_cache.get(cache_key)
+        if cached_response is not None:
+            print(f"⚡ Gemini cache hit (stream): {cached_response[:100]}...")
+            reply['text'] = cached_response
+            yield cached_response
+            return
+    
+    english = language.lower() == 'english'
+    translate = not english and use_translator
+    buffer = SentenceBuffer()
+    pieces = []    # raw English text, to keep the reply's line breaks when caching
+    originals = []
+    sent = []
+    try:
+        prompt, prompt_complete = build_gemini_prompt(user_message, mode)
+        stream = gemini_model.generate_content(prompt, stream=True)
+        for piece in stream:
+            pieces.append(piece.text)
+            for original in buffer.feed(piece.text):
+                sentence = translate_to_language(original, language) if translate else original
+                originals.append(original)
+                sent.append(sentence)
+                yield sentence
+        for original in buffer.flush():
+            sentence = translate_to_language(original, language) if translate else original
+            originals.append(original)
+            sent.append(sentence)
+            yield sentence
+    except Exception as e:
+        print(f"⚠️ Gemini streaming error: {e}")
+        if not sent:
+            # Nothing sent yet, so fall back to the trained model like get_gemini_response
+            reply['text'] = trained_model_response(user_message, mode)
+            yield reply['text']
+        else:
+            reply['text'] = ' '.join(sent)
+        return
+    
+    reply['text'] = replace_sentences(''.join(pieces), originals, sent)
+    
+    # Like get_gemini_response: never cache an English fallback under another language
+    # (translator off, or a sentence whose translation failed and came back unchanged;
+    # list numbers like "2." legitimately stay the same)
+    translated = english or (translate and all(s != o or not any(c.isalpha() for c in o)
+                                               for s, o in zip(sent, originals)))
+    if sent and translated and prompt_complete and not keyword_crisis and (cacheable is None or cacheable()):
+        gemini_response_cache.set(cache_key, reply['text'])
+
+def prefetch_chunks(chunks):
+    """Consume chunks on the stage pool as they are produced; returns an iterator over them
+    
+    Lets a streamed reply keep generating while the request thread waits on something else.
+    """
+    produced = queue.Queue()
+    end = object()
+    def pump():
+        try:
+            for chunk in chunks:
+                produced.put((chunk, None))
+            produced.put((end, None))
+        except Exception as e:
+            produced.put((end, e))
+    chat_pipeline.executor.submit(pump)
+    def iterate():
+        while True:
+            chunk, error = produced.get()
+            if error is not None:
+                raise error
+            if chunk is end:
+                return
+            yield chunk
+    return iterate()
+
+@app.route('/api/chat/stream', methods=['POST', 'OPTIONS'])
+def chat_stream():
+    """Streaming chat (Server-Sent Events)
+    
+    Events: `distress` (detection result, sent first), `chunk` (one finished,
+    translated sentence at a time) and `done` (source and full response).
+    Generation starts alongside distress detection, so the distress event does
+    not delay the first chunk by the ML latency.
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+    
+    data = request.get_json() or {}
+    user_message = data.get('message', '')
+    mode = data.get('mode', 'friend')
+    use_ai = data.get('useAI', True)
+    language = data.get('language', 'English')
+    
+    if not user_message:
+        return jsonify({'error': 'Message is required'}), 400
+    
+    print(f"🔵 CHAT STREAM ENDPOINT CALLED - mode={mode}, language={language}")
+    run = chat_pipeline.run(message=user_message, mode=mode, use_ai=use_ai, language=language)
+    run.start('ml_distress')
+    if mode == 'professional':
+        run.start('counseling_match')
+    
+    def not_crisis():
+        distress = run.result('distress')
+        return not (distress and distress.get('is_distress'))
+    
+    def generate():
+        try:
+            # Start the reply before waiting for distress detection (they are independent)
+            reply = {}
+            chunks = None
+            if mode == 'professional' and run.result('counseling_match'):
+                source = 'counseling_dataset'
+                chunks = [run.result('counseling_match')]
+            elif use_gemini and use_ai:
+                source = 'gemini'
+                chunks = prefetch_chunks(stream_gemini_sentences(user_message, mode, language,
+                                                                cacheable=not_crisis, reply=reply))
+            else:
+                run.start('response')
+            
+            yield sse_event('distress', distress_payload(run.result('distress')))
+            
+            if chunks is None:
+                # Non-streaming generators: send the whole reply as one chunk
+                response, source = run.result('response')
+                chunks = [response]
+            
+            full_response = []
+            for chunk in chunks:
+                full_response.append(chunk)
+                yield sse_event('chunk', {'text': chunk})
+            
+            response = reply.get('text', ' '.join(full_response))
+            yield sse_event('done', {'source': source, 'mode': mode, 'response': response})
+            print(f"⏱️ Stream stage timings (ms): {run.timings()}")
+        except Exception as e:
+            print(f"❌ Stream error: {e}")
+            yield sse_event('error', {'error': str(e)})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 def detect_crisis_keywords(text):
     """Detect critical suicide/self-harm keywords for immediate intervention
     
-    EXPANDED keyword list based on real-world crisis language patterns.
-    Includes direct mentions, euphemisms, and paraphrased expressions.
+    EXPANDED keyword list based on real-world crisis language patterns
+    (see keyword_matcher.CRISIS_KEYWORDS). At this list size the shared matcher
+    uses plain substring checks, stopping at the first hit.
     """
-    crisis_keywords = [
-        # Direct suicide mentions (including common misspellings)
-        'suicide', 'suicidal', 'sucide', 'suicde', 'suiside', 'sucidal',
-        'kill myself', 'killing myself',
-        'end my life', 'ending my life', 'take my life', 'taking my life',
-        
-        # Death wishes
-        'want to die', 'wanna die', 'wish i was dead', 'wish i were dead',
-        'better off dead', 'want to be dead', 'don\'t want to live',
-        'no reason to live', 'not worth living', 'life isn\'t worth',
-        
-        # Ending/finishing expressions
-        'end it all', 'end this', 'finish myself', 'finish it',
-        'can\'t go on', 'cannot go on', 'give up on life',
-        
-        # Self-harm
-        'harm myself', 'hurt myself', 'cut myself', 'cutting myself',
-        'self harm', 'self-harm', 'self injury',
-        
-        # Crisis methods
-        'overdose', 'jump off', 'hang myself', 'hanging myself',
-        'shoot myself', 'drown myself', 'pills',
-        
-        # Hopelessness (paraphrased crisis language)
-        'no way out', 'no escape', 'trapped', 'no hope',
-        'hopeless', 'helpless', 'no point in living',
-        'don\'t see a point', 'no point anymore', 'pointless',
-        
-        # Pain/suffering expressions
-        'can\'t take this', 'cannot take this', 'can\'t take it',
-        'too much pain', 'unbearable', 'can\'t bear',
-        'want it to stop', 'make it stop', 'end the pain',
-        
-        # Finality expressions  
-        'saying goodbye', 'final goodbye', 'won\'t be here',
-        'better without me', 'burden', 'everyone would be better',
-        'disappear forever', 'cease to exist', 'stop existing'
-    ]
-    
-    text_lower = text.lower()
-    for keyword in crisis_keywords:
-        if keyword in text_lower:
-            return True
-    return False
+    return crisis_matcher.contains_any(text, 'crisis')
 
 def retrieve_context(query, top_k=3):
-    """Retrieve relevant context from RAG database"""
-    if not use_rag:
+    """Retrieve relevant context from RAG database (None if retrieval was skipped)"""
+    if not use_rag or components.is_disabled('retrieval'):
         return ""
     
-    try:
-        # Generate query embedding
-        query_embedding = embedding_model.encode([query])[0].tolist()
-        
-        # Query vector database
-        results = rag_collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k
-        )
-        
-        # Format retrieved documents
-        context_docs = []
-        for i, doc in enumerate(results['documents'][0]):
-            metadata = results['metadatas'][0][i]
-            context_docs.append(f"- {doc}")
-        
-        return "\n".join(context_docs)
-    except Exception as e:
-        print(f"⚠️ RAG retrieval error: {e}")
-        return ""
+    # The first call starts loading in the background; a failed load is retried at most
+    # every RAG_RETRY_SECONDS. Until it is ready, prompts go out without context
+    if not components.ensure('retrieval', RAG_RETRY_SECONDS):
+        return None
+    documents = retrieval_service.retrieve(query, top_k=top_k)
+    if documents is None:
+        return None
+    
+    # Format retrieved documents
+    context_docs = [f"- {doc}" for doc in documents]
+    return "\n".join(context_docs)
 
 def generate_t5_response(user_message, mode='empathetic'):
     """Generate empathetic response using T5 model"""
@@ -559,7 +748,7 @@ def generate_t5_response(user_message, mode='empathetic'):
 
 def translate_to_language(text, target_language):
     """
-    Translate English text to target language using Google Translate (deep-translator)
+    Translate English text to target language via the cached translation service
     
     Args:
         text: English text to translate
@@ -576,83 +765,38 @@ def translate_to_language(text, target_language):
     if target_language.lower() == 'english':
         return text
     
-    try:
-        # Language code mapping
-        language_codes = {
-            'hindi': 'hi',
-            'tamil': 'ta',
-            'telugu': 'te',
-            'marathi': 'mr',
-            'bengali': 'bn',
-            'gujarati': 'gu',
-            'kannada': 'kn',
-            'malayalam': 'ml',
-            'punjabi': 'pa',
-            'urdu': 'ur',
-            'odia': 'or',
-            'assamese': 'as',
-            'spanish': 'es',
-            'french': 'fr',
-            'german': 'de',
-            'portuguese': 'pt',
-            'russian': 'ru',
-            'japanese': 'ja',
-            'korean': 'ko',
-            'chinese': 'zh-CN',
-            'arabic': 'ar',
-            'turkish': 'tr',
-            'vietnamese': 'vi',
-            'thai': 'th',
-            'indonesian': 'id',
-            'dutch': 'nl',
-            'italian': 'it',
-            'polish': 'pl',
-            'ukrainian': 'uk',
-            'persian': 'fa'
-        }
-        
-        # Get language code
-        lang_key = target_language.lower()
-        lang_code = language_codes.get(lang_key, None)
-        
-        if not lang_code:
-            print(f"⚠️ Unknown language: {target_language}, returning original")
-            return text
-        
-        # Translate using deep-translator
-        print(f"🌐 Translating to {target_language} ({lang_code})...")
-        translator = GoogleTranslator(source='en', target=lang_code)
-        translated_text = translator.translate(text)
-        
-        print(f"   Original: {text[:100]}...")
-        print(f"   Translated: {translated_text[:100]}...")
-        
-        return translated_text
-        
-    except Exception as e:
-        print(f"⚠️ Translation error: {e}")
-        print(f"   Returning original text")
+    if not language_code(target_language):
+        print(f"⚠️ Unknown language: {target_language}, returning original")
         return text
+    
+    print(f"🌐 Translating to {target_language} ({language_code(target_language)})...")
+    translated_text = translation_service.translate(text, target_language)
+    
+    print(f"   Original: {text[:100]}...")
+    print(f"   Translated: {translated_text[:100]}...")
+    
+    return translated_text
 
-def get_gemini_response(user_message, mode, language='English'):
-    """Get response from Gemini AI with Google Translate for non-English languages"""
-    global gemini_base_model_name
+def build_gemini_prompt(user_message, mode):
+    """Build the English generation prompt (bump GEMINI_PROMPT_VERSION when changing it)
     
-    try:
-        # Retrieve relevant context from RAG database (knowledge base)
-        retrieved_context = retrieve_context(user_message, top_k=5)
-        
-        # Build context with RAG information
-        rag_context = ""
-        if retrieved_context:
-            rag_context = f"\n\nKnowledge base context:\n{retrieved_context}\n"
-        
-        # ALWAYS generate in English for best quality with Gemma
-        # Then use Google Translate if needed
-        # Add crisis awareness to prompt for better safety
-        crisis_context = ""
-        if mode == 'professional':
-            crisis_context = """
+    Returns (prompt, complete): complete is False when RAG retrieval was skipped,
+    so the reply must not be cached under the key later RAG-backed replies use.
+    """
+    # Retrieve relevant context from RAG database (knowledge base)
+    retrieved_context = retrieve_context(user_message, top_k=5)
+    
+    # Build context with RAG information
+    rag_context = ""
+    if retrieved_context:
+        rag_context = f"\n\nKnowledge base context:\n{retrieved_context}\n"
+    
+    # ALWAYS generate in English for best quality with Gemma
+    # Then use Google Translate if needed
+    # Add crisis awareness to prompt for better safety
+    crisis_context = ""
+    if mode == 'professional':
+        crisis_context = """
 IMPORTANT CRISIS PROTOCOL:
 If the user expresses suicidal thoughts or immediate danger, respond with deep empathy and provide these INDIAN crisis helplines:
 
@@ -663,19 +807,38 @@ If the user expresses suicidal thoughts or immediate danger, respond with deep e
 • iCall: 9152987821
 
 Do NOT provide generic advice for crisis situations. Always include these helplines."""
-        
-        prompt = f"""You are Aura, a compassionate mental health support chatbot for Indian users.
+    
+    return f"""You are Aura, a compassionate mental health support chatbot for Indian users.
 Provide warm, culturally-sensitive, supportive responses. Use emojis occasionally. Keep responses concise (2-4 sentences).{crisis_context}
 {rag_context}
 User message: {user_message}
 
-Your response:"""
-        
-        # Use base model without system instructions (Gemma doesn't support it)
-        language_model = genai.GenerativeModel(model_name=gemini_base_model_name)
+Your response:""", retrieved_context is not None
+
+def gemini_cache_key(user_message, mode, language):
+    """Cache key for a Gemini response"""
+    return (normalize_message(user_message), mode, language.lower(), GEMINI_PROMPT_VERSION)
+
+def get_gemini_response(user_message, mode, language='English', cacheable=None):
+    """Get response from Gemini AI with Google Translate for non-English languages
+    
+    Responses are cached by (normalized message, mode, language, prompt version).
+    Crisis messages are never cached: keyword-flagged messages skip the lookup, and
+    `cacheable` (a callable, e.g. the ML distress result) is checked before storing.
+    """
+    cache_key = gemini_cache_key(user_message, mode, language)
+    keyword_crisis = detect_crisis_keywords(user_message)
+    if not keyword_crisis:
+        cached_response = gemini_response_cache.get(cache_key)
+        if cached_response is not None:
+            print(f"⚡ Gemini cache hit: {cached_response[:100]}...")
+            return cached_response
+    
+    try:
+        prompt, prompt_complete = build_gemini_prompt(user_message, mode)
         
-        # Generate response in English
-        response = language_model.generate_content(prompt)
+        # Reuse the long-lived base model handle (no system instructions - Gemma doesn't support it)
+        response = gemini_model.generate_content(prompt)
         english_response = response.text.strip()
         
         print(f"🤖 Gemma response (English): {english_response[:100]}...")
@@ -683,32 +846,78 @@ Your response:"""
         # Translate to target language if not English
         if language.lower() != 'english' and use_translator:
             print(f"🌐 Translating to {language} using Google Translate...")
-            translated_response = translate_to_language(english_response, language)
-            print(f"✅ Translation complete: {translated_response[:100]}...")
-            return translated_response
+            final_response = translate_to_language(english_response, language)
+            print(f"✅ Translation complete: {final_response[:100]}...")
+            translated = final_response != english_response
         elif language.lower() != 'english' and not use_translator:
             print(f"⚠️ Translator not available, returning English response")
             return english_response
         else:
             # English - no translation needed
-            return english_response
+            final_response = english_response
+            translated = True
+        
+        # Only cache successful, non-crisis responses (failed translations fall back to English;
+        # prompts built while RAG was unavailable lack the knowledge-base context)
+        if translated and prompt_complete and not keyword_crisis and (cacheable is None or cacheable()):
+            gemini_response_cache.set(cache_key, final_response)
+        return final_response
         
     except Exception as e:
         print(f"⚠️ Gemini error: {e}")
         # Fallback to trained model
-        return chatbot.get_response(user_message, mode=mode)
+        return trained_model_response(user_message, mode)
 
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'trained_model_loaded': chatbot.vectorizer is not None,
+        'ready': components.all_ready(),
+        'components': components.status(),
+        'trained_model_loaded': chatbot is not None and chatbot.vectorizer is not None,
         'gemini_enabled': use_gemini,
         'rag_enabled': use_rag,
+        'rag_ready': retrieval_service is not None and retrieval_service.ready,
         'ai_provider': 'gemini_with_rag' if (use_gemini and use_rag) else ('gemini' if use_gemini else 'trained_model')
     })
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Runtime performance metrics"""
+    return jsonify({
+        'distress_batching': distress_batcher.stats() if distress_batcher else None,
+        'gemini_cache': gemini_response_cache.stats(),
+        'retrieval': retrieval_service.stats() if retrieval_service else None,
+        'translation': translation_service.stats() if translation_service else None,
+        'tts_cache': tts_cache.stats()
+    })
+
+# Content updates for the trained chatbot (disabled unless CHATBOT_ADMIN_TOKEN is set)
+CHATBOT_ADMIN_TOKEN = os.getenv('CHATBOT_ADMIN_TOKEN')
+
+@app.route('/api/chatbot/examples', methods=['POST'])
+def add_chatbot_examples():
+    """Add chatbot responses without retraining (appended to the model's delta file)"""
+    if not CHATBOT_ADMIN_TOKEN:
+        return jsonify({'error': 'Chatbot updates are disabled (set CHATBOT_ADMIN_TOKEN)'}), 404
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', '').encode('utf-8'), CHATBOT_ADMIN_TOKEN.encode('utf-8')):
+        return jsonify({'error': 'Invalid admin token'}), 403
+    if chatbot is None:
+        return jsonify({'error': 'Trained chatbot is not loaded'}), 503
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        added = chatbot.add_examples(data.get('examples') or [])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    print(f"✅ Added {added} chatbot examples")
+    return jsonify({
+        'added': added,
+        'csv_patterns': len(chatbot.csv_data or []),
+        'intent_patterns': len(chatbot.intents_data or [])
+    })
+
 @app.route('/api/modes', methods=['GET'])
 def get_modes():
     """Get available chat modes"""
@@ -727,82 +936,192 @@ def get_modes():
         ]
     })
 
-@app.route('/api/tts', methods=['POST', 'OPTIONS'])
+# Map frontend language codes to gTTS codes
+TTS_LANGUAGE_MAP = {
+    'en-US': 'en',
+    'hi-IN': 'hi',
+    'ta-IN': 'ta',
+    'te-IN': 'te',
+    'mr-IN': 'mr',
+    'bn-IN': 'bn',
+    'gu-IN': 'gu',
+    'kn-IN': 'kn',
+    'ml-IN': 'ml',
+    'pa-IN': 'pa',
+    'ur-IN': 'ur',
+    'es-ES': 'es',
+    'fr-FR': 'fr',
+    'de-DE': 'de',
+    'pt-PT': 'pt',
+    'ru-RU': 'ru',
+    'ja-JP': 'ja',
+    'ko-KR': 'ko',
+    'zh-CN': 'zh-CN',
+    'ar-SA': 'ar',
+    'tr-TR': 'tr',
+    'vi-VN': 'vi',
+    'th-TH': 'th',
+    'id-ID': 'id',
+    'nl-NL': 'nl',
+    'it-IT': 'it',
+    'pl-PL': 'pl',
+    'uk-UA': 'uk'
+}
+
+# Content-addressed MP3 cache (repeat playback is a disk read, not a synthesis round trip)
+tts_cache = TTSCache(
+    os.getenv('TTS_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tts_cache')),
+    max_bytes=int(os.getenv('TTS_CACHE_MAX_MB', '200')) * 1024 * 1024
+)
+
+def synthesize_speech(text, tts_lang):
+    """Return cached (key, path, cached) for the speech audio, synthesizing with gTTS on a miss"""
+    def synthesize(fp):
+        from gtts import gTTS
+        gTTS(text=text, lang=tts_lang, slow=False).write_to_fp(fp)
+    return tts_cache.get_or_create(text, tts_lang, synthesize)
+
+def prewarm_tts_cache():
+    """Synthesize the fixed crisis/helpline responses in the background"""
+    for text in (CRISIS_HELPLINE_RESPONSE, SUPPORTIVE_RESPONSE):
+        try:
+            _, _, cached = synthesize_speech(text, 'en')
+            if not cached:
+                print(f"🔊 Pre-warmed TTS cache: '{text[:40]}...'")
+        except Exception as e:
+            print(f"⚠️ TTS pre-warm failed: {e}")
+            return
+
+def start_tts_prewarm():
+    if os.getenv('TTS_PREWARM', '1') != '0':
+        threading.Thread(target=prewarm_tts_cache, name='tts-prewarm', daemon=True).start()
+
+if not PREFORK:
+    start_tts_prewarm()
+
+@app.route('/api/tts', methods=['GET', 'POST', 'OPTIONS'])
 def text_to_speech():
-    """Generate speech audio from text using Google TTS"""
+    """Generate speech audio from text using Google TTS (disk-cached)
+    
+    GET requests (?text=...&language=...) support ETag/If-None-Match and Range.
+    """
     if request.method == 'OPTIONS':
         return '', 204
     
     try:
-        data = request.get_json()
+        data = request.args if request.method == 'GET' else (request.get_json() or {})
         text = data.get('text', '')
         language = data.get('language', 'en')  # Language code (e.g., 'en', 'ta', 'hi')
         
         if not text:
             return jsonify({'error': 'No text provided'}), 400
         
-        # Map frontend language codes to gTTS codes
-        language_map = {
-            'en-US': 'en',
-            'hi-IN': 'hi',
-            'ta-IN': 'ta',
-            'te-IN': 'te',
-            'mr-IN': 'mr',
-            'bn-IN': 'bn',
-            'gu-IN': 'gu',
-            'kn-IN': 'kn',
-            'ml-IN': 'ml',
-            'pa-IN': 'pa',
-            'ur-IN': 'ur',
-            'es-ES': 'es',
-            'fr-FR': 'fr',
-            'de-DE': 'de',
-            'pt-PT': 'pt',
-            'ru-RU': 'ru',
-            'ja-JP': 'ja',
-            'ko-KR': 'ko',
-            'zh-CN': 'zh-CN',
-            'ar-SA': 'ar',
-            'tr-TR': 'tr',
-            'vi-VN': 'vi',
-            'th-TH': 'th',
-            'id-ID': 'id',
-            'nl-NL': 'nl',
-            'it-IT': 'it',
-            'pl-PL': 'pl',
-            'uk-UA': 'uk'
-        }
-        
-        tts_lang = language_map.get(language, language.split('-')[0])
-        
-        # Generate speech
-        tts = gTTS(text=text, lang=tts_lang, slow=False)
+        tts_lang = TTS_LANGUAGE_MAP.get(language, language.split('-')[0])
         
-        # Save to memory buffer
-        audio_buffer = io.BytesIO()
-        tts.write_to_fp(audio_buffer)
-        audio_buffer.seek(0)
+        # Generate speech (or reuse the cached file)
+        key, path, cached = synthesize_speech(text, tts_lang)
         
-        print(f"🔊 Generated TTS audio for text: '{text[:50]}...' in language: {tts_lang}")
+        if cached:
+            print(f"⚡ TTS cache hit for text: '{text[:50]}...' in language: {tts_lang}")
+        else:
+            print(f"🔊 Generated TTS audio for text: '{text[:50]}...' in language: {tts_lang}")
         
+        # conditional=True handles If-None-Match (304) and Range (206) for GET
         return send_file(
-            audio_buffer,
+            path,
             mimetype='audio/mpeg',
             as_attachment=False,
-            download_name='speech.mp3'
+            download_name='speech.mp3',
+            conditional=True,
+            etag=key,
+            max_age=86400
         )
         
     except Exception as e:
         print(f"❌ TTS error: {e}")
         return jsonify({'error': str(e)}), 500
 
+# Small pool for streaming synthesis: sentences synthesize concurrently, stream in order
+tts_stream_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('TTS_STREAM_WORKERS', '3')),
+    thread_name_prefix='tts-stream'
+)
+
+@app.route('/api/tts/stream', methods=['GET', 'POST', 'OPTIONS'])
+def text_to_speech_stream():
+    """Stream speech audio sentence by sentence (chunked MP3)
+    
+    The text is split at sentence boundaries; chunks are synthesized concurrently
+    (and cached individually) but written to the response in order, so playback
+    can start as soon as the first sentence is ready.
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+    
+    data = request.args if request.method == 'GET' else (request.get_json() or {})
+    text = data.get('text', '')
+    language = data.get('language', 'en')
+    
+    if not text:
+        return jsonify({'error': 'No text provided'}), 400
+    
+    tts_lang = TTS_LANGUAGE_MAP.get(language, language.split('-')[0])
+    chunks = split_sentences(text, max_chars=int(os.getenv('TTS_STREAM_CHUNK_CHARS', '200')))
+    print(f"🔊 Streaming TTS: {len(chunks)} chunks in language: {tts_lang}")
+    
+    def read_chunk(chunk):
+        _, path, _ = synthesize_speech(chunk, tts_lang)
+        with open(path, 'rb') as f:
+            return f.read()
+    
+    def generate():
+        futures = [tts_stream_executor.submit(read_chunk, chunk) for chunk in chunks]
+        try:
+            for future in futures:
+                yield future.result()
+        except Exception as e:
+            print(f"❌ TTS stream error: {e}")
+        finally:
+            # Client went away or a chunk failed: skip work that hasn't started
+            for future in futures:
+                future.cancel()
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='audio/mpeg',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def after_fork(worker_index):
+    """Per-worker setup in a pre-forked worker (prefork_server.py)
+    
+    Models, datasets and indexes are inherited copy-on-write from the master;
+    threads, SQLite connections and API clients are recreated here.
+    """
+    if distress_detector is not None:
+        start_distress_batcher(distress_detector)
+    if translation_service is not None and translation_service.cache is not None:
+        translation_service.cache.reopen()
+    if retrieval_service is not None:
+        retrieval_service.after_fork()
+    if use_gemini:
+        # Drop API clients created in the master (gRPC channels are not fork-safe)
+        genai.configure(api_key=GEMINI_API_KEY)
+    if worker_index == 0:
+        start_tts_prewarm()
+
 if __name__ == '__main__':
+    if startup_profile.active():
+        within_budget = startup_profile.finish(components, STARTUP_BUDGET)
+        sys.exit(0 if within_budget else 1)
+    
     print("\n" + "="*60)
     print("🚀 AURA Backend Server Starting...")
     print("="*60)
     print(f"📍 Running on: http://127.0.0.1:5000")
     print(f"🎤 Voice input ready!")
-    print(f"🤖 Using Gemini AI: {'✅' if use_gemini else '❌'}")
+    print(f"🤖 Using Gemini AI: {'✅' if use_gemini else ('⏳ loading' if GEMINI_API_KEY else '❌')}")
+    print(f"⏳ Models warm up in the background - see /api/health for readiness")
     print("="*60 + "\n")
     
     try:
@@ -0,0 +1,119 @@
+"""
+Chat Stage Pipeline
+Small dependency graph of lazily evaluated stages for /api/chat.
+
+Stages are plain functions that receive the run and pull what they need with
+run.result('other_stage'). Nothing runs unless something asks for it, and
+independent stages can be started ahead of time on a shared worker pool so
+end-to-end latency approaches the slowest stage instead of the sum.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class _StageTask:
+    """One stage evaluation inside a run; executed at most once by whoever claims it first"""
+
+    def __init__(self, name, fn):
+        self.name = name
+        self.fn = fn
+        self.value = None
+        self.error = None
+        self.duration = None
+        self._claimed = False
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def _claim(self):
+        with self._lock:
+            if self._claimed:
+                return False
+            self._claimed = True
+            return True
+
+    def execute(self, run):
+        """Run the stage unless another thread already has (pool or inline caller)"""
+        if not self._claim():
+            return
+        started = time.perf_counter()
+        try:
+            self.value = self.fn(run)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.duration = time.perf_counter() - started
+            self._done.set()
+
+    def result(self, run, timeout=None):
+        # Run inline if nobody has started it yet, so waiting never needs a free pool worker
+        self.execute(run)
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Stage '{self.name}' did not finish in {timeout}s")
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+
+class PipelineRun:
+    """A single evaluation of the pipeline for one request"""
+
+    def __init__(self, pipeline, inputs):
+        self.pipeline = pipeline
+        self.inputs = inputs
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def _task(self, name):
+        with self._lock:
+            task = self._tasks.get(name)
+            if task is None:
+                if name not in self.pipeline.stages:
+                    raise KeyError(f"Unknown stage: {name}")
+                task = _StageTask(name, self.pipeline.stages[name])
+                self._tasks[name] = task
+            return task
+
+    def start(self, *names):
+        """Start stages on the worker pool without waiting for them"""
+        for name in names:
+            task = self._task(name)
+            self.pipeline.executor.submit(task.execute, self)
+        return self
+
+    def result(self, name, timeout=None):
+        """Return a stage's value, computing it now if it has not been started"""
+        return self._task(name).result(self, timeout=timeout)
+
+    def timings(self):
+        """Milliseconds spent in each stage that actually ran"""
+        with self._lock:
+            tasks = list(self._tasks.values())
+        return {task.name: round(task.duration * 1000.0, 2) for task in tasks if task.done}
+
+
+class StagePipeline:
+    """Registry of named stages plus the worker pool they run on"""
+
+    def __init__(self, max_workers=None, name='chat-stage'):
+        if max_workers is None:
+            max_workers = int(os.getenv('CHAT_STAGE_WORKERS', '8'))
+        self.stages = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+    def stage(self, name):
+        """Decorator registering fn(run) as a stage"""
+        def register(fn):
+            self.stages[name] = fn
+            return fn
+        return register
+
+    def run(self, **inputs):
+        """Create a new run with the given request inputs"""
+        return PipelineRun(self, inputs)
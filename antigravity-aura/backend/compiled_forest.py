@@ -0,0 +1,127 @@
+"""
+Compiled Random Forest Inference
+Flattens a fitted sklearn RandomForestClassifier into a handful of numpy arrays
+and walks every tree at once, level by level, for a whole batch of rows.
+
+Avoids sklearn's per-tree input validation and thread dispatch, which dominate
+the cost of scoring one chat message against a 200-tree forest.
+"""
+
+import numpy as np
+from scipy import sparse
+
+
+class CompiledForest:
+    """
+    Array-only representation of a fitted random forest.
+
+    Arrays (all trees concatenated, node ids are global):
+        left, right: child node ids (leaves point to themselves)
+        feature:     split feature per node (0 for leaves)
+        threshold:   split threshold per node (+inf for leaves, so leaves stay put)
+        leaf_proba:  per-node class distribution (only meaningful for leaves)
+        roots:       root node id of every tree
+    """
+
+    ARRAY_NAMES = ('left', 'right', 'feature', 'threshold', 'leaf_proba', 'roots', 'classes')
+
+    def __init__(self, left, right, feature, threshold, leaf_proba, roots, classes, max_depth):
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.left)
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """Compile a fitted RandomForestClassifier (single-output)"""
+        lefts, rights, features, thresholds, probas, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left).astype(np.int32) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right).astype(np.int32) + offset)
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold).astype(np.float64))
+
+            value = tree.value[:, 0, :].astype(np.float64)
+            totals = value.sum(axis=1, keepdims=True)
+            totals[totals == 0] = 1.0
+            probas.append(value / totals)
+
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            leaf_proba=np.concatenate(probas),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=np.asarray(forest.classes_),
+            max_depth=max_depth
+        )
+
+    def arrays(self):
+        """Return the raw arrays by name (for saving)"""
+        return {
+            'left': self.left,
+            'right': self.right,
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'leaf_proba': self.leaf_proba,
+            'roots': self.roots,
+            'classes': self.classes_,
+        }
+
+    def predict_proba(self, X, block_size=256):
+        """
+        Average leaf class distributions over all trees (same as sklearn's predict_proba)
+
+        X may be a scipy sparse matrix or a dense array. Rows are densified in blocks
+        of block_size, cast to float32 exactly like sklearn's tree input.
+        """
+        n_rows = X.shape[0]
+        output = np.empty((n_rows, self.leaf_proba.shape[1]), dtype=np.float64)
+        for start in range(0, n_rows, block_size):
+            block = X[start:start + block_size]
+            if sparse.issparse(block):
+                block = block.toarray()
+            block = np.asarray(block, dtype=np.float32)
+            output[start:start + block_size] = self._predict_block(block)
+        return output
+
+    def _predict_block(self, X):
+        """Walk all trees for a dense block, one tree level per step"""
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+        left, right, feature, threshold = self.left, self.right, self.feature, self.threshold
+
+        for _ in range(self.max_depth):
+            go_left = X[rows, feature[nodes]] <= threshold[nodes]
+            nodes = np.where(go_left, left[nodes], right[nodes])
+
+        return self.leaf_proba[nodes].sum(axis=1) / len(self.roots)
+
+    def predict(self, X):
+        """Class label per row (argmax of predict_proba)"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
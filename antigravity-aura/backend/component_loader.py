@@ -0,0 +1,184 @@
+"""
+Background Component Loader
+Loads slow server components (models, datasets, API clients) on background
+threads so Flask can bind its port immediately, and tracks per-component
+readiness and load times for /api/health.
+
+Lazy components are skipped at startup and loaded by ensure() the first time a
+request needs them; they do not count towards all_ready().
+"""
+
+import os
+import threading
+import time
+import traceback
+
+PENDING = 'pending'
+LOADING = 'loading'
+READY = 'ready'
+FAILED = 'failed'
+DISABLED = 'disabled'
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (peak RSS without /proc, None on Windows)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Component:
+    """A named loader function plus its readiness state"""
+
+    def __init__(self, name, loader, description='', lazy=False):
+        self.name = name
+        self.loader = loader
+        self.description = description
+        self.lazy = lazy
+        self.attempts = 0
+        self.state = PENDING
+        self.detail = None
+        self.error = None
+        self.started_at = None
+        self.load_seconds = None
+        self.rss_delta_mb = None  # Only meaningful when components load one at a time
+        self._ready = threading.Event()  # Set once loading finishes (ready, failed or disabled)
+
+    def status(self):
+        return {
+            'state': self.state,
+            'description': self.description,
+            'lazy': self.lazy,
+            'load_seconds': round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            'detail': self.detail,
+            'error': self.error,
+        }
+
+
+class ComponentRegistry:
+    """
+    Registry of startup components.
+
+    A loader returns an optional detail string (shown in /api/health), returns
+    False to mark the component disabled (e.g. no API key), or raises on failure.
+    """
+
+    def __init__(self):
+        self.components = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, description='', lazy=False):
+        """Decorator registering loader() as a component (lazy: loaded by ensure() on first use)"""
+        def wrap(loader):
+            self.components[name] = Component(name, loader, description, lazy)
+            return loader
+        return wrap
+
+    def _startup_names(self, names):
+        return names or [name for name, c in self.components.items() if not c.lazy]
+
+    def _load(self, component):
+        with self._lock:
+            if component.state != PENDING:
+                return
+            component.state = LOADING
+            component.started_at = time.time()
+            component.attempts += 1
+        started = time.perf_counter()
+        rss_before = current_rss_mb()
+        try:
+            result = component.loader()
+            if result is False:
+                component.state = DISABLED
+            else:
+                component.detail = result if isinstance(result, str) else None
+                component.state = READY
+        except Exception as e:
+            component.error = str(e)
+            component.state = FAILED
+            print(f"⚠️ Component '{component.name}' failed to load: {e}")
+            if component.attempts == 1:
+                traceback.print_exc()  # Retries fail the same way most of the time
+        finally:
+            component.load_seconds = time.perf_counter() - started
+            rss_after = current_rss_mb()
+            if rss_before is not None and rss_after is not None:
+                component.rss_delta_mb = rss_after - rss_before
+            component._ready.set()
+
+    def start(self, names=None):
+        """Load components on background threads (all non-lazy ones by default)"""
+        for name in self._startup_names(names):
+            component = self.components[name]
+            threading.Thread(target=self._load, args=(component,), name=f'load-{name}', daemon=True).start()
+        return self
+
+    def retry_failed(self, name, min_interval=60.0):
+        """Reload a failed component in the background, at most once per min_interval seconds
+
+        Returns True if a reload was started.
+        """
+        component = self.components[name]
+        with self._lock:
+            if component.state != FAILED:
+                return False
+            failed_at = (component.started_at or 0) + (component.load_seconds or 0)
+            if time.time() - failed_at < min_interval:
+                return False
+            component.state = PENDING
+            component.error = None
+            component._ready.clear()
+        print(f"🔄 Retrying component '{name}'")
+        self.start([name])
+        return True
+
+    def ensure(self, name, retry_interval=None):
+        """Start loading a component on first use (non-blocking); True if it is ready
+
+        A failed component is retried at most every retry_interval seconds if given.
+        """
+        component = self.components[name]
+        if component.state == PENDING:
+            self.start([name])  # Concurrent callers are harmless: _load runs the loader once
+        elif component.state == FAILED and retry_interval is not None:
+            self.retry_failed(name, retry_interval)
+        return component.state == READY
+
+    def load_all(self, names=None):
+        """Load components synchronously in the calling thread, in registration order"""
+        names = self._startup_names(names)
+        for name in names:
+            self._load(self.components[name])
+        # Components already started in the background are awaited instead
+        for name in names:
+            self.wait(name)
+        return self
+
+    def is_ready(self, name):
+        return self.components[name].state == READY
+
+    def is_disabled(self, name):
+        return self.components[name].state == DISABLED
+
+    def wait(self, name=None, timeout=None):
+        """Block until one component (or all non-lazy ones) finished loading; True if none timed out"""
+        names = [name] if name else self._startup_names(None)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for n in names:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not self.components[n]._ready.wait(remaining):
+                return False
+        return True
+
+    def all_ready(self):
+        return all(c.state in (READY, DISABLED) for c in self.components.values() if not c.lazy)
+
+    def status(self):
+        return {name: component.status() for name, component in self.components.items()}
@@ -0,0 +1,393 @@
+"""
+Counseling Corpus Artifact
+Offline build step that compiles the counseling dataset (train_data.csv) into a
+compact, memory-mappable directory the server opens in milliseconds:
+
+    manifest.json        format version, counts, source CSV fingerprint, keyword hash
+    strings.bin          interned UTF-8 string table (responses, categories, tokens, keywords)
+    string_offsets.npy   character offsets into the decoded string table
+    labels.npy           int8 distress label per entry
+    quality.npy          quality score per entry
+    sentiment.npy        float32 sentiment per entry
+    response_ids.npy     string id of each entry's response
+    category_offsets.npy / category_ids.npy   per-entry category string ids (CSR)
+    token_ids.npy / token_offsets.npy / token_postings.npy       token -> entry ids
+    keyword_ids.npy / keyword_offsets.npy / keyword_postings.npy  keyword -> entry ids
+
+Numeric arrays are opened with np.load(mmap_mode='r'), so pre-forked workers share
+the same page-cache pages instead of each parsing the CSV.
+
+Build:  python counseling_corpus.py [--csv ../train_data.csv] [--out counseling_corpus]
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from counseling_index import CounselingIndex, MIN_RESPONSE_LENGTH, STOP_WORDS
+from keyword_matcher import CATEGORY_KEYWORDS
+
+FORMAT_NAME = 'aura-counseling-corpus'
+FORMAT_VERSION = 1
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV_PATH = os.path.join(os.path.dirname(BACKEND_DIR), 'train_data.csv')
+DEFAULT_CORPUS_PATH = os.path.join(BACKEND_DIR, 'counseling_corpus')
+
+# Only these columns are needed (the CSV also carries ~110 unused LIWC/social columns)
+CSV_COLUMNS = ['text', 'label', 'confidence', 'sentiment']
+
+# Fixed responses used for the counseling dataset (also pre-warmed in the TTS cache)
+CRISIS_HELPLINE_RESPONSE = (
+    "I hear how much pain you're going through, and I want you to know that you're not alone. "
+    "What you're feeling is valid, and there are people who care about you and want to help. "
+    "Please consider reaching out to a crisis helpline immediately:\n\n"
+    "🇮🇳 India Crisis Helplines:\n"
+    "• Tele MANAS: 14416 or 1800-89-14416 (24/7, Available in 20 languages)\n"
+    "• KIRAN Mental Health: 1800-599-0019 (24/7 free)\n"
+    "• Vandrevala Foundation: 1860-2662-345\n"
+    "• iCall: 9152987821\n\n"
+    "Your life has value, and with support, things can get better. "
+    "Would you like to talk more about what you're experiencing?"
+)
+SUPPORTIVE_RESPONSE = (
+    "Thank you for sharing what's on your mind. I'm here to listen and support you. "
+    "It sounds like you're dealing with something challenging. "
+    "Remember that seeking help is a sign of strength, not weakness. "
+    "Would you like to explore some coping strategies or talk more about how you're feeling?"
+)
+
+
+def load_counseling_entries(csv_path):
+    """Read train_data.csv into counseling entries (dicts with context/response/categories/...)"""
+    import pandas as pd
+
+    available = pd.read_csv(csv_path, nrows=0).columns
+    df = pd.read_csv(csv_path, usecols=[c for c in CSV_COLUMNS if c in available])
+    n = len(df)
+
+    texts = df['text'].astype(str) if 'text' in df else [''] * n
+    labels = df['label'].astype(int) if 'label' in df else [0] * n
+    confidences = df['confidence'].astype(float) if 'confidence' in df else [0.5] * n
+    sentiments = df['sentiment'].astype(float) if 'sentiment' in df else [0.0] * n
+
+    entries = []
+    for text, label, confidence, sentiment in zip(texts, labels, confidences, sentiments):
+        if len(text) < 20:  # Skip very short texts
+            continue
+
+        # Determine category and response based on distress level
+        entries.append({
+            'context': text,
+            'response': CRISIS_HELPLINE_RESPONSE if label == 1 else SUPPORTIVE_RESPONSE,
+            'categories': ['crisis' if label == 1 else 'general'],
+            'quality_score': int(confidence * 100),
+            'label': int(label),
+            'sentiment': float(sentiment)
+        })
+    return entries
+
+
+def keywords_hash():
+    """Fingerprint of the keyword lists and stop words baked into the postings"""
+    payload = json.dumps([CATEGORY_KEYWORDS, sorted(STOP_WORDS), MIN_RESPONSE_LENGTH], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def file_fingerprint(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _StringInterner:
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def __call__(self, text):
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = self.ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+
+def _postings_arrays(postings, intern):
+    """Flatten {string: entry ids} into (string ids, offsets, entry ids) CSR arrays"""
+    keys = sorted(postings)
+    offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+    for i, key in enumerate(keys):
+        offsets[i + 1] = offsets[i] + len(postings[key])
+    flat = np.fromiter(
+        (entry_id for key in keys for entry_id in sorted(postings[key])),
+        dtype=np.int32, count=int(offsets[-1])
+    )
+    return np.array([intern(key) for key in keys], dtype=np.int32), offsets, flat
+
+
+def build_corpus(entries, out_dir, source_path=None):
+    """Compile counseling entries into an artifact directory; returns the manifest"""
+    # Same filtering as CounselingIndex.build, so entry ids line up with the index
+    entries = [e for e in entries
+               if len(e.get('response', e.get('Response', '')) or '') >= MIN_RESPONSE_LENGTH]
+    index = CounselingIndex(entries)
+    n = len(index)
+
+    intern = _StringInterner()
+    response_ids = np.array([intern(r) for r in index.responses], dtype=np.int32)
+
+    category_offsets = np.zeros(n + 1, dtype=np.int64)
+    category_ids = []
+    for entry_id, entry in enumerate(entries):
+        unique = list(dict.fromkeys(entry.get('categories', ['general'])))
+        category_ids.extend(intern(c) for c in unique)
+        category_offsets[entry_id + 1] = len(category_ids)
+
+    quality = np.asarray(index.quality)
+    if np.all(quality == np.round(quality)) and (not n or np.abs(quality).max() < 2 ** 15):
+        quality = quality.astype(np.int16)
+    else:
+        quality = quality.astype(np.float64)
+
+    token_ids, token_offsets, token_postings = _postings_arrays(index.token_postings, intern)
+    keyword_ids, keyword_offsets, keyword_postings = _postings_arrays(index.keyword_postings, intern)
+
+    arrays = {
+        'labels': np.array([int(e.get('label', 0)) for e in entries], dtype=np.int8),
+        'quality': quality,
+        'sentiment': np.array([float(e.get('sentiment', 0.0)) for e in entries], dtype=np.float32),
+        'response_ids': response_ids,
+        'category_offsets': category_offsets,
+        'category_ids': np.array(category_ids, dtype=np.int32),
+        'token_ids': token_ids,
+        'token_offsets': token_offsets,
+        'token_postings': token_postings,
+        'keyword_ids': keyword_ids,
+        'keyword_offsets': keyword_offsets,
+        'keyword_postings': keyword_postings,
+    }
+
+    string_offsets = np.zeros(len(intern.strings) + 1, dtype=np.int64)
+    string_offsets[1:] = np.cumsum([len(s) for s in intern.strings])
+
+    # Write into a temp directory and swap it in, so a running server never sees a partial artifact
+    tmp_dir = f"{out_dir}.tmp-{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+    with open(os.path.join(tmp_dir, 'strings.bin'), 'wb') as f:
+        f.write(''.join(intern.strings).encode('utf-8'))
+    np.save(os.path.join(tmp_dir, 'string_offsets.npy'), string_offsets)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f'{name}.npy'), array)
+
+    manifest = {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'entries': n,
+        'strings': len(intern.strings),
+        'tokens': len(token_ids),
+        'keywords_sha256': keywords_hash(),
+        'source': None,
+        'arrays': {name: {'dtype': str(a.dtype), 'shape': list(a.shape)} for name, a in arrays.items()},
+    }
+    if source_path:
+        manifest['source'] = {
+            'path': os.path.abspath(source_path),
+            'sha256': file_sha256(source_path),
+            **file_fingerprint(source_path)
+        }
+    with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    if os.path.isdir(out_dir):
+        old_dir = f"{out_dir}.old-{os.getpid()}"
+        os.replace(out_dir, old_dir)
+        os.replace(tmp_dir, out_dir)
+        for name in os.listdir(old_dir):
+            os.remove(os.path.join(old_dir, name))
+        os.rmdir(old_dir)
+    else:
+        os.replace(tmp_dir, out_dir)
+    return manifest
+
+
+class StringColumn:
+    """Read-only sequence view: entry id -> interned string"""
+
+    def __init__(self, ids, strings):
+        self.ids = ids
+        self.strings = strings
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, entry_id):
+        return self.strings[self.ids[entry_id]]
+
+
+class PostingsView:
+    """Read-only mapping: string -> list of entry ids, sliced from the memory-mapped postings on demand"""
+
+    def __init__(self, keys, offsets, postings):
+        self._slots = {key: i for i, key in enumerate(keys)}
+        self._offsets = offsets
+        self._postings = postings
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    def __iter__(self):
+        return iter(self._slots)
+
+    def get(self, key, default=None):
+        slot = self._slots.get(key)
+        if slot is None:
+            return default
+        return self._postings[self._offsets[slot]:self._offsets[slot + 1]].tolist()
+
+    def __getitem__(self, key):
+        result = self.get(key)
+        if result is None:
+            raise KeyError(key)
+        return result
+
+    def items(self):
+        return ((key, self.get(key)) for key in self._slots)
+
+
+class CounselingCorpus:
+    """A compiled counseling corpus opened from disk (numeric arrays are memory-mapped)"""
+
+    def __init__(self, path=DEFAULT_CORPUS_PATH, mmap=True):
+        self.path = path
+        with open(os.path.join(path, 'manifest.json'), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format') != FORMAT_NAME or self.manifest.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported counseling corpus format in {path}: "
+                             f"{self.manifest.get('format')} v{self.manifest.get('version')}")
+
+        mmap_mode = 'r' if mmap else None
+        # Plain ndarray views of the maps (np.memmap slicing carries per-slice overhead)
+        self.arrays = {
+            name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode).view(np.ndarray)
+            for name in self.manifest['arrays']
+        }
+        # The interned table is small (unique strings only), so decode it once
+        with open(os.path.join(path, 'strings.bin'), 'rb') as f:
+            table = f.read().decode('utf-8')
+        offsets = np.load(os.path.join(path, 'string_offsets.npy')).tolist()
+        self.strings = [table[start:end] for start, end in zip(offsets, offsets[1:])]
+
+    def __len__(self):
+        return self.manifest['entries']
+
+    def __getattr__(self, name):
+        arrays = self.__dict__.get('arrays', {})
+        if name in arrays:
+            return arrays[name]
+        raise AttributeError(name)
+
+    def is_stale(self, csv_path):
+        """True if the source CSV or the keyword lists changed since the build"""
+        if self.manifest.get('keywords_sha256') != keywords_hash():
+            return True
+        source = self.manifest.get('source')
+        if not source or not os.path.exists(csv_path):
+            return False
+        return file_fingerprint(csv_path) != {'size': source['size'], 'mtime_ns': source['mtime_ns']}
+
+    def _postings(self, prefix):
+        strings = self.strings
+        keys = [strings[string_id] for string_id in self.arrays[f'{prefix}_ids'].tolist()]
+        return PostingsView(keys, self.arrays[f'{prefix}_offsets'].tolist(), self.arrays[f'{prefix}_postings'])
+
+    def build_index(self):
+        """CounselingIndex backed by the artifact's precomputed postings"""
+        index = CounselingIndex()
+        index.responses = StringColumn(self.arrays['response_ids'], self.strings)
+        # The scoring loop is pure Python, so give it Python numbers (one small list per process)
+        index.quality = self.arrays['quality'].tolist()
+
+        offsets = self.arrays['category_offsets'].tolist()
+        category_ids = self.arrays['category_ids'].tolist()
+        interned_sets = {}
+        categories = []
+        for start, end in zip(offsets, offsets[1:]):
+            key = tuple(category_ids[start:end])
+            category_set = interned_sets.get(key)
+            if category_set is None:
+                category_set = interned_sets[key] = frozenset(self.strings[i] for i in key)
+            categories.append(category_set)
+        index.categories = categories
+
+        # Token postings are sliced from the memory-mapped postings array per lookup
+        index.token_postings = self._postings('token')
+        index.category_postings = {}
+        for entry_id, category_set in enumerate(categories):
+            for category in category_set:
+                index.category_postings.setdefault(category, []).append(entry_id)
+        index.keyword_postings = {keyword: frozenset(entry_ids)
+                                  for keyword, entry_ids in self._postings('keyword').items()}
+
+        index.best_quality_id = int(np.argmax(self.arrays['quality'])) if len(index.quality) else None
+        return index
+
+
+def load_counseling_index(csv_path=DEFAULT_CSV_PATH, corpus_path=DEFAULT_CORPUS_PATH):
+    """
+    Return (index, labels) for the counseling dataset.
+
+    Uses the compiled artifact when it exists and is up to date, otherwise reads the CSV.
+    """
+    if os.path.isdir(corpus_path):
+        try:
+            corpus = CounselingCorpus(corpus_path)
+            if not corpus.is_stale(csv_path):
+                return corpus.build_index(), corpus.labels
+            print(f"⚠️ Counseling corpus at {corpus_path} is out of date, reading CSV instead")
+        except Exception as e:
+            print(f"⚠️ Could not open counseling corpus: {e}")
+    print("   Run `python counseling_corpus.py` to compile the counseling corpus for fast startup")
+
+    entries = load_counseling_entries(csv_path)
+    return CounselingIndex(entries), np.array([e['label'] for e in entries], dtype=np.int8)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compile the counseling dataset into a memory-mappable artifact')
+    parser.add_argument('--csv', default=DEFAULT_CSV_PATH, help='Source CSV (train_data.csv)')
+    parser.add_argument('--out', default=DEFAULT_CORPUS_PATH, help='Output artifact directory')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    entries = load_counseling_entries(args.csv)
+    csv_seconds = time.perf_counter() - start
+    manifest = build_corpus(entries, args.out, source_path=args.csv)
+    build_seconds = time.perf_counter() - start
+
+    print(f"✅ Compiled {manifest['entries']} entries, {manifest['strings']} interned strings, "
+          f"{manifest['tokens']} tokens -> {args.out}")
+    size = sum(os.path.getsize(os.path.join(args.out, name)) for name in os.listdir(args.out))
+    print(f"   Artifact size: {size / 1024:.1f} KB")
+
+    start = time.perf_counter()
+    index = CounselingCorpus(args.out).build_index()
+    open_seconds = time.perf_counter() - start
+    print(f"📊 CSV load {csv_seconds*1000:.1f}ms, build {build_seconds*1000:.1f}ms, "
+          f"open from artifact {open_seconds*1000:.1f}ms")
@@ -0,0 +1,168 @@
+"""
+Counseling Retrieval Index
+Inverted index over the counseling dataset, built once at load time.
+Scores only the entries that share a token, category or keyword with the user message.
+"""
+
+import heapq
+from collections import defaultdict
+
+from keyword_matcher import CATEGORY_KEYWORDS, get_matcher
+
+# Common words ignored by the word-overlap score
+STOP_WORDS = frozenset({'i', 'me', 'my', 'am', 'is', 'are', 'the', 'a', 'an', 'and', 'or', 'but'})
+
+# Scoring weights
+CATEGORY_WEIGHT = 30
+KEYWORD_WEIGHT = 15
+OVERLAP_WEIGHT = 2
+QUALITY_WEIGHT = 0.2
+CRISIS_BONUS = 50
+
+MIN_RESPONSE_LENGTH = 50
+
+
+def detect_categories(text):
+    """Return the categories whose keywords appear in the text"""
+    categories = get_matcher().categories(text, 'category')
+    return categories if categories else ['general']
+
+
+class CounselingIndex:
+    """
+    Inverted index for counseling response retrieval.
+
+    Holds three posting tables built once from the dataset:
+    1. Token postings: context word -> entry ids (stop words removed)
+    2. Category postings: category -> entry ids
+    3. Keyword postings: category keyword -> entry ids whose context contains it
+
+    Scores are identical to the original linear scan:
+        30 * shared categories + 15 * shared keywords + 2 * word overlap
+        + 0.2 * quality score + 50 if both are crisis
+    """
+
+    def __init__(self, entries=None):
+        self.responses = []
+        self.categories = []
+        self.quality = []
+        self.token_postings = defaultdict(list)
+        self.category_postings = defaultdict(list)
+        self.keyword_postings = {}
+        self.best_quality_id = None
+        if entries:
+            self.build(entries)
+
+    def __len__(self):
+        return len(self.responses)
+
+    def build(self, entries):
+        """Build posting lists from dataset entries (dicts with context/response/categories)"""
+        self.responses = []
+        self.categories = []
+        self.quality = []
+        self.token_postings = defaultdict(list)
+        self.category_postings = defaultdict(list)
+        contexts = []
+
+        for entry in entries:
+            response = entry.get('response', entry.get('Response', ''))
+            if not response or len(response) < MIN_RESPONSE_LENGTH:
+                continue
+
+            entry_id = len(self.responses)
+            context = entry.get('context', entry.get('Context', '')).lower()
+            entry_categories = entry.get('categories', ['general'])
+
+            self.responses.append(response)
+            self.categories.append(frozenset(entry_categories))
+            self.quality.append(entry.get('quality_score', 50))
+            contexts.append(context)
+
+            for token in set(context.split()) - STOP_WORDS:
+                self.token_postings[token].append(entry_id)
+            for category in set(entry_categories):
+                self.category_postings[category].append(entry_id)
+
+        # Substring postings for every category keyword (one matcher call per context)
+        matcher = get_matcher()
+        keyword_postings = defaultdict(set)
+        for entry_id, context in enumerate(contexts):
+            for phrases in matcher.matched(context, 'category').values():
+                for phrase in phrases:
+                    keyword_postings[phrase].add(entry_id)
+        self.keyword_postings = {
+            keyword: frozenset(keyword_postings.get(keyword, ()))
+            for keywords in CATEGORY_KEYWORDS.values() for keyword in keywords
+        }
+
+        # Entries sharing nothing with a message score on quality alone,
+        # so the best of them is always the first highest-quality entry
+        self.best_quality_id = None
+        if self.quality:
+            best = max(self.quality)
+            self.best_quality_id = self.quality.index(best)
+
+        return self
+
+    def _score(self, entry_id, user_categories, matched_keywords, overlap):
+        """Score a single candidate entry"""
+        entry_categories = self.categories[entry_id]
+        score = len(user_categories & entry_categories) * CATEGORY_WEIGHT
+
+        for keyword in matched_keywords:
+            if entry_id in self.keyword_postings[keyword]:
+                score += KEYWORD_WEIGHT
+
+        score += overlap * OVERLAP_WEIGHT
+        score += self.quality[entry_id] * QUALITY_WEIGHT
+
+        if 'crisis' in user_categories and 'crisis' in entry_categories:
+            score += CRISIS_BONUS
+        return score
+
+    def search(self, user_message, top_k=1):
+        """
+        Return up to top_k (score, response, categories) tuples, best first.
+
+        Ties keep dataset order, matching a stable sort over the full dataset.
+        """
+        if not self.responses:
+            return []
+
+        user_message_lower = user_message.lower()
+
+        # One matcher call gives both the user categories and their matched keywords.
+        # Keywords count once per matching category (duplicates across categories count twice)
+        matched = get_matcher().matched(user_message_lower, 'category')
+        user_categories = frozenset(matched) if matched else frozenset(['general'])
+        matched_keywords = [keyword for keywords in matched.values() for keyword in keywords]
+
+        # Candidate generation: word overlap counts straight from the token postings
+        overlap = defaultdict(int)
+        for token in set(user_message_lower.split()) - STOP_WORDS:
+            for entry_id in self.token_postings.get(token, ()):
+                overlap[entry_id] += 1
+
+        candidates = set(overlap)
+        for category in user_categories:
+            candidates.update(self.category_postings.get(category, ()))
+        for keyword in matched_keywords:
+            candidates.update(self.keyword_postings[keyword])
+        if self.best_quality_id is not None:
+            candidates.add(self.best_quality_id)
+
+        scored = (
+            (self._score(entry_id, user_categories, matched_keywords, overlap.get(entry_id, 0)), entry_id)
+            for entry_id in candidates
+        )
+        scored = [(score, entry_id) for score, entry_id in scored if score > 0]
+
+        best = heapq.nlargest(top_k, scored, key=lambda item: (item[0], -item[1]))
+        return [(score, self.responses[entry_id], sorted(self.categories[entry_id]))
+                for score, entry_id in best]
+
+    def best_response(self, user_message):
+        """Return the single best matching response, or None"""
+        results = self.search(user_message, top_k=1)
+        return results[0][1] if results else None
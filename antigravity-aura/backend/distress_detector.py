@@ -12,6 +12,7 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score, precision_score, recall_score, f1_score
 import pickle
 import os
+import model_artifact
 
 class MentalHealthDetector:
     def __init__(self):
@@ -171,9 +172,11 @@ class MentalHealthDetector:
             print(f"✓ Test metrics saved (Accuracy: {self.test_metrics['accuracy']*100:.2f}%)")
     
     def load_model(self, path='distress_detector.pkl'):
-        """Load a pre-trained model with test metrics"""
+        """Load a pre-trained model with test metrics (a pickle, or an artifact directory)"""
         if not os.path.exists(path):
             raise FileNotFoundError(f"Model file not found: {path}")
+        if model_artifact.is_artifact(path):
+            return self.load_artifact(path)
         
         with open(path, 'rb') as f:
             model_data = pickle.load(f)
@@ -187,6 +190,46 @@ class MentalHealthDetector:
         if self.test_metrics:
             print(f"✓ Test Set Performance: {self.test_metrics['accuracy']*100:.2f}% accuracy")
     
+    def save_artifact(self, path='distress_detector.model', source=None):
+        """Save as a versioned, memory-mappable artifact directory (see model_artifact.py)"""
+        if not self.trained:
+            raise Exception("Model not trained yet!")
+        
+        params, terms, idf = model_artifact.vectorizer_state(self.vectorizer)
+        arrays = {
+            'feature_log_prob': self.classifier.feature_log_prob_,
+            'class_log_prior': self.classifier.class_log_prior_,
+            'classes': self.classifier.classes_
+        }
+        if idf is not None:
+            arrays['idf'] = idf
+        
+        model_artifact.write_artifact(
+            path, kind='distress_detector_v1', arrays=arrays, vocabulary=terms, vectorizer=params,
+            feature_schema={'text_features': len(terms), 'n_features': len(terms)},
+            metadata={'model_type': 'multinomial_nb', 'test_metrics': self.test_metrics},
+            source=source
+        )
+        print(f"\n✓ Model artifact saved to {path}")
+    
+    def load_artifact(self, path='distress_detector.model', mmap=True, verify=False):
+        """Load an artifact directory written by save_artifact (arrays memory-mapped by default)"""
+        manifest, arrays, terms = model_artifact.load_artifact(
+            path, kind='distress_detector_v1', mmap=mmap, verify=verify
+        )
+        self.vectorizer = model_artifact.vectorizer_from_state(manifest['vectorizer'], terms, arrays.get('idf'))
+        self.classifier = MultinomialNB()
+        self.classifier.feature_log_prob_ = arrays['feature_log_prob']
+        self.classifier.class_log_prior_ = arrays['class_log_prior']
+        self.classifier.classes_ = arrays['classes']
+        self.classifier.n_features_in_ = manifest['feature_schema']['n_features']
+        self.test_metrics = manifest['metadata'].get('test_metrics')
+        self.trained = True
+        
+        print(f"✓ Model artifact loaded from {path}")
+        if self.test_metrics:
+            print(f"✓ Test Set Performance: {self.test_metrics['accuracy']*100:.2f}% accuracy")
+    
     def get_test_metrics(self):
         """Return the gold standard test set metrics"""
         if not self.test_metrics:
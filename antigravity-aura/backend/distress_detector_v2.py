@@ -4,19 +4,28 @@ Leverages psychological features (LIWC), social features, and sentiment analysis
 Target: 75-80% accuracy (up from 67% baseline)
 """
 
-import pandas as pd
 import numpy as np
+from scipy import sparse
+from compiled_forest import CompiledForest
+import model_artifact
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score, precision_score, recall_score, f1_score
 import pickle
 import os
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+# pandas, sklearn.ensemble/linear_model/model_selection/metrics are imported where they
+# are used (training, logistic models): serving a compiled forest artifact needs none of them
+
+
+def _is_random_forest(classifier):
+    """isinstance(classifier, RandomForestClassifier) without importing sklearn.ensemble"""
+    ensemble = sys.modules.get('sklearn.ensemble')  # Already imported if a forest exists
+    return ensemble is not None and isinstance(classifier, ensemble.RandomForestClassifier)
+
+
 class EnhancedMentalHealthDetector:
     """
     Enhanced distress detector using:
@@ -39,6 +48,7 @@ class EnhancedMentalHealthDetector:
         self.trained = False
         self.test_metrics = None
         self.feature_importance = None
+        self.compiled_forest = None  # Array-only forest for the fast prediction path
         
         # Key LIWC features for mental health distress
         self.liwc_features = [
@@ -111,6 +121,13 @@ class EnhancedMentalHealthDetector:
         print("=" * 80)
         print("ENHANCED ML MODEL - Feature Engineering + Advanced Classifier")
         print("=" * 80)
+        import pandas as pd
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import (classification_report, confusion_matrix, accuracy_score,
+                                     precision_score, recall_score, f1_score)
+        
         print("\nLoading dataset...")
         df = pd.read_csv(csv_path)
         
@@ -199,6 +216,7 @@ class EnhancedMentalHealthDetector:
         
         self.classifier.fit(X_train, y_train)
         self.trained = True
+        self.compiled_forest = None
         print("✓ Model trained successfully!")
         
         # Feature importance (for RandomForest)
@@ -315,6 +333,10 @@ class EnhancedMentalHealthDetector:
         """Save enhanced model"""
         if not self.trained:
             raise Exception("Model not trained yet!")
+        if self.classifier is None:
+            # Loaded from an artifact: only the compiled forest is in memory
+            raise Exception("Model was loaded from an artifact and has no sklearn classifier to pickle; "
+                            "use save_artifact() or load the .pkl")
         
         model_data = {
             'vectorizer': self.vectorizer,
@@ -336,9 +358,11 @@ class EnhancedMentalHealthDetector:
             print(f"✓ Test accuracy: {self.test_metrics['accuracy']*100:.2f}%")
     
     def load_model(self, path='distress_detector_v2.pkl'):
-        """Load enhanced model"""
+        """Load enhanced model (a pickle, or an artifact directory from save_artifact)"""
         if not os.path.exists(path):
             raise FileNotFoundError(f"Model file not found: {path}")
+        if model_artifact.is_artifact(path):
+            return self.load_artifact(path)
         
         with open(path, 'rb') as f:
             model_data = pickle.load(f)
@@ -353,11 +377,192 @@ class EnhancedMentalHealthDetector:
         self.test_metrics = model_data.get('test_metrics', None)
         self.feature_importance = model_data.get('feature_importance', None)
         self.trained = True
+        self.compiled_forest = None
         
         print(f"✓ Enhanced model loaded from {path}")
         if self.test_metrics:
             print(f"✓ Test accuracy: {self.test_metrics['accuracy']*100:.2f}%")
     
+    def feature_schema(self):
+        """Feature layout expected by the classifier (stored in artifact manifests)"""
+        return {
+            'text_features': len(self.vectorizer.vocabulary_),
+            'liwc_features': list(self.liwc_features),
+            'social_features': list(self.social_features),
+            'sentiment_features': list(self.sentiment_features),
+            'n_features': len(self.vectorizer.vocabulary_) + len(self.liwc_features)
+                          + len(self.social_features) + len(self.sentiment_features)
+        }
+    
+    def save_artifact(self, path='distress_detector_v2_random_forest.model', source=None):
+        """Save as a versioned, memory-mappable artifact directory (see model_artifact.py)"""
+        if not self.trained:
+            raise Exception("Model not trained yet!")
+        
+        params, terms, idf = model_artifact.vectorizer_state(self.vectorizer)
+        arrays = {}
+        if idf is not None:
+            arrays['idf'] = idf
+        if getattr(self.scaler, 'mean_', None) is not None:
+            arrays['scaler_mean'] = self.scaler.mean_
+        if getattr(self.scaler, 'scale_', None) is not None:
+            arrays['scaler_scale'] = self.scaler.scale_
+        
+        metadata = {
+            'model_type': self.model_type,
+            'test_metrics': self.test_metrics,
+            'feature_importance': self.feature_importance
+        }
+        if self.compiled_forest is None and _is_random_forest(self.classifier):
+            self.compiled_forest = CompiledForest.from_sklearn(self.classifier)
+        if self.compiled_forest is not None:
+            # Forest as flat node arrays (no sklearn objects to unpickle)
+            for name, array in self.compiled_forest.arrays().items():
+                arrays[f'forest_{name}'] = array
+            metadata['forest_max_depth'] = self.compiled_forest.max_depth
+        else:
+            arrays['coef'] = self.classifier.coef_
+            arrays['intercept'] = self.classifier.intercept_
+            arrays['classes'] = self.classifier.classes_
+        
+        model_artifact.write_artifact(
+            path, kind='distress_detector_v2', arrays=arrays, vocabulary=terms,
+            vectorizer=params, feature_schema=self.feature_schema(), metadata=metadata,
+            source=source
+        )
+        print(f"\n✓ Enhanced model artifact saved to {path}")
+    
+    def load_artifact(self, path='distress_detector_v2_random_forest.model', mmap=True, verify=False):
+        """Load an artifact directory written by save_artifact (arrays memory-mapped by default)"""
+        manifest, arrays, terms = model_artifact.load_artifact(
+            path, kind='distress_detector_v2', mmap=mmap, verify=verify
+        )
+        schema = manifest['feature_schema']
+        metadata = manifest['metadata']
+        
+        self.vectorizer = model_artifact.vectorizer_from_state(manifest['vectorizer'], terms, arrays.get('idf'))
+        self.scaler = StandardScaler()
+        self.scaler.mean_ = arrays.get('scaler_mean')
+        self.scaler.scale_ = arrays.get('scaler_scale')
+        self.scaler.n_features_in_ = len(schema['liwc_features']) + len(schema['social_features']) + len(schema['sentiment_features'])
+        
+        if 'forest_left' in arrays:
+            self.classifier = None
+            self.compiled_forest = CompiledForest(
+                **{name: arrays[f'forest_{name}'] for name in CompiledForest.ARRAY_NAMES},
+                max_depth=metadata['forest_max_depth']
+            )
+        else:
+            from sklearn.linear_model import LogisticRegression
+            self.compiled_forest = None
+            self.classifier = LogisticRegression()
+            self.classifier.coef_ = arrays['coef']
+            self.classifier.intercept_ = arrays['intercept']
+            self.classifier.classes_ = arrays['classes']
+            self.classifier.n_features_in_ = schema['n_features']
+        
+        self.model_type = metadata['model_type']
+        self.liwc_features = schema['liwc_features']
+        self.social_features = schema['social_features']
+        self.sentiment_features = schema['sentiment_features']
+        self.test_metrics = metadata.get('test_metrics')
+        feature_importance = metadata.get('feature_importance')
+        self.feature_importance = [tuple(item) for item in feature_importance] if feature_importance else None
+        self.trained = True
+        
+        print(f"✓ Enhanced model artifact loaded from {path}")
+        if self.test_metrics:
+            print(f"✓ Test accuracy: {self.test_metrics['accuracy']*100:.2f}%")
+    
+    def _numeric_features(self, count, liwc_features=None, social_features=None, sentiments=None):
+        """
+        Build the scaled LIWC/social/sentiment block for `count` messages.
+
+        Each argument is either None (defaults for every message) or a list with
+        one entry per message (a dict for LIWC/social, a float for sentiment).
+        Scaling is applied directly from the fitted StandardScaler statistics.
+        """
+        n_liwc = len(self.liwc_features)
+        n_social = len(self.social_features)
+        n_sentiment = len(self.sentiment_features)
+        numeric = np.zeros((count, n_liwc + n_social + n_sentiment), dtype=np.float64)
+
+        if liwc_features is not None:
+            for row, values in enumerate(liwc_features):
+                if values:
+                    for col, feat in enumerate(self.liwc_features):
+                        if feat in values:
+                            numeric[row, col] = values[feat]
+        if social_features is not None:
+            for row, values in enumerate(social_features):
+                if values:
+                    for col, feat in enumerate(self.social_features, start=n_liwc):
+                        if feat in values:
+                            numeric[row, col] = values[feat]
+        if sentiments is not None and n_sentiment:
+            for row, value in enumerate(sentiments):
+                if value is not None:
+                    numeric[row, n_liwc + n_social:] = value
+
+        # Equivalent to self.scaler.transform(numeric) without sklearn's per-call validation
+        if getattr(self.scaler, 'mean_', None) is not None:
+            numeric -= self.scaler.mean_
+        if getattr(self.scaler, 'scale_', None) is not None:
+            numeric /= self.scaler.scale_
+        return numeric
+    
+    def _predict_proba(self, features):
+        """predict_proba via the compiled forest when available, else the classifier"""
+        if self.compiled_forest is None and _is_random_forest(self.classifier):
+            self.compiled_forest = CompiledForest.from_sklearn(self.classifier)
+        if self.compiled_forest is not None:
+            return self.compiled_forest.predict_proba(features)
+        return self.classifier.predict_proba(features)
+    
+    def predict_distress_batch(self, texts, liwc_features=None, social_features=None, sentiments=None):
+        """
+        Predict distress for many messages in one vectorized call (fast path)
+        
+        Skips pandas and keeps TF-IDF features sparse; the classifier runs once
+        via predict_proba and the label is its argmax (what predict() does).
+        
+        Args:
+            texts: List of input texts
+            liwc_features: Optional list of LIWC feature dicts (one per text)
+            social_features: Optional list of social feature dicts (one per text)
+            sentiments: Optional list of sentiment scores (one per text)
+        
+        Returns:
+            list of dicts with 'is_distress', 'confidence', 'probability'
+        """
+        if not self.trained:
+            raise Exception("Model not trained yet!")
+        
+        texts = list(texts)
+        if not texts:
+            return []
+        
+        # Sparse TF-IDF block + small dense numeric block, stacked without densifying
+        text_features = self.vectorizer.transform(texts)
+        numeric = self._numeric_features(len(texts), liwc_features, social_features, sentiments)
+        features = sparse.hstack([text_features, sparse.csr_matrix(numeric)], format='csr')
+        
+        # Predict (single forest pass)
+        probabilities = self._predict_proba(features)
+        classes = self.compiled_forest.classes_ if self.compiled_forest is not None else self.classifier.classes_
+        predictions = classes[np.argmax(probabilities, axis=1)]
+        distress_column = list(classes).index(1)
+        
+        results = []
+        for prediction, probability in zip(predictions, probabilities):
+            results.append({
+                'is_distress': bool(prediction),
+                'confidence': float(probability.max()),
+                'probability': float(probability[distress_column]),  # Probability of distress
+                'requires_crisis_intervention': bool(probability[distress_column] > 0.85)  # High confidence threshold
+            })
+        return results
+    
     def predict_distress(self, text, liwc_features=None, social_features=None, sentiment=None):
         """
         Predict distress with enhanced features
@@ -371,50 +576,12 @@ class EnhancedMentalHealthDetector:
         Returns:
             dict with 'is_distress', 'confidence', 'probability'
         """
-        if not self.trained:
-            raise Exception("Model not trained yet!")
-        
-        # Create dataframe for feature extraction
-        df = pd.DataFrame({
-            'text': [text]
-        })
-        
-        # Add LIWC features (use defaults if not provided)
-        for feat in self.liwc_features:
-            if liwc_features and feat in liwc_features:
-                df[feat] = [liwc_features[feat]]
-            else:
-                df[feat] = [0.0]  # Default
-        
-        # Add social features
-        for feat in self.social_features:
-            if social_features and feat in social_features:
-                df[feat] = [social_features[feat]]
-            else:
-                df[feat] = [0.0]  # Default
-        
-        # Add sentiment
-        for feat in self.sentiment_features:
-            if sentiment is not None:
-                df[feat] = [sentiment]
-            else:
-                df[feat] = [0.0]  # Default
-        
-        # Extract and scale features
-        features = self.extract_features(df, fit_vectorizer=False)
-        text_feat_count = 3000
-        features[:, text_feat_count:] = self.scaler.transform(features[:, text_feat_count:])
-        
-        # Predict
-        prediction = self.classifier.predict(features)[0]
-        probability = self.classifier.predict_proba(features)[0]
-        
-        return {
-            'is_distress': bool(prediction),
-            'confidence': float(max(probability)),
-            'probability': float(probability[1]),  # Probability of distress
-            'requires_crisis_intervention': probability[1] > 0.85  # High confidence threshold
-        }
+        return self.predict_distress_batch(
+            [text],
+            liwc_features=[liwc_features] if liwc_features else None,
+            social_features=[social_features] if social_features else None,
+            sentiments=[sentiment] if sentiment is not None else None
+        )[0]
     
     def get_test_metrics(self):
         """Return test metrics"""
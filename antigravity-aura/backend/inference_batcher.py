@@ -0,0 +1,148 @@
+"""
+Micro-Batching Inference Queue
+Collects single-message predictions from concurrent request threads and runs
+them as one vectorized batch, so Flask's threaded workers stop contending for
+the GIL with one small forest call each.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    In-process batching scheduler.
+
+    A background thread waits for the first queued item. If nothing else is
+    queued it runs at once (a lone request pays no batching delay); otherwise it
+    keeps collecting until either max_batch_size items are queued or max_wait_ms
+    has passed since that first item arrived. The whole batch goes through
+    predict_batch(items), which must return one result per item, in order.
+
+    Trade-off: under concurrent load a larger max_wait_ms gives bigger batches
+    (throughput) at the cost of up to max_wait_ms extra latency per request
+    (tail latency).
+    """
+
+    def __init__(self, predict_batch, max_batch_size=32, max_wait_ms=5.0, name='batcher', history=1000):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+        # Metrics (recent history only, bounded)
+        self._batch_sizes = deque(maxlen=history)
+        self._queue_waits = deque(maxlen=history)
+        self._batch_latencies = deque(maxlen=history)
+        self._total_items = 0
+        self._total_batches = 0
+        self._errors = 0
+
+        self._worker = threading.Thread(target=self._run, name=f'{name}-worker', daemon=True)
+        self._worker.start()
+
+    def submit(self, item):
+        """Queue one item and return a Future for its result"""
+        if self._stopped.is_set():
+            raise RuntimeError(f"{self.name} is stopped")
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def predict(self, item, timeout=None):
+        """Queue one item and block until its result is ready"""
+        return self.submit(item).result(timeout=timeout)
+
+    def stop(self, timeout=1.0):
+        """Stop the worker thread (queued items are still processed)"""
+        self._stopped.set()
+        self._queue.put(None)
+        self._worker.join(timeout=timeout)
+
+    def _collect(self):
+        """Block for the first item, then gather more until size or deadline"""
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        if self._queue.empty():
+            return batch  # Nothing to batch with: don't make a lone request wait
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # Keep the stop signal for the outer loop
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if not batch:
+                if self._stopped.is_set() and self._queue.empty():
+                    return
+                continue
+
+            started = time.perf_counter()
+            items = [item for item, _, _ in batch]
+            try:
+                results = self.predict_batch(items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"predict_batch returned {len(results)} results for {len(items)} items")
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                with self._lock:
+                    self._errors += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finished = time.perf_counter()
+
+            with self._lock:
+                self._total_items += len(batch)
+                self._total_batches += 1
+                self._batch_sizes.append(len(batch))
+                self._batch_latencies.append(finished - started)
+                self._queue_waits.extend(started - enqueued for _, _, enqueued in batch)
+
+    @staticmethod
+    def _percentiles(values, scale=1.0):
+        if not values:
+            return {'avg': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+        ordered = sorted(values)
+        last = len(ordered) - 1
+        return {
+            'avg': round(sum(ordered) / len(ordered) * scale, 3),
+            'p50': round(ordered[int(last * 0.50)] * scale, 3),
+            'p95': round(ordered[int(last * 0.95)] * scale, 3),
+            'p99': round(ordered[int(last * 0.99)] * scale, 3),
+            'max': round(ordered[last] * scale, 3),
+        }
+
+    def stats(self):
+        """Batch size and queue wait metrics (waits/latencies in milliseconds)"""
+        with self._lock:
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'queue_depth': self._queue.qsize(),
+                'total_items': self._total_items,
+                'total_batches': self._total_batches,
+                'errors': self._errors,
+                'batch_size': self._percentiles(list(self._batch_sizes)),
+                'queue_wait_ms': self._percentiles(list(self._queue_waits), scale=1000.0),
+                'batch_latency_ms': self._percentiles(list(self._batch_latencies), scale=1000.0),
+            }
@@ -0,0 +1,340 @@
+"""
+Multi-Pattern Keyword Matcher (Aho-Corasick)
+Compiles every keyword list used by the backend and the preprocessing scripts
+into one automaton, so a message is scanned once instead of once per phrase.
+
+In pure Python the automaton only pays off for large lists (see benchmark()):
+groups smaller than AUTOMATON_MIN_PHRASES are matched with plain `in` checks.
+Every group shipped today (crisis, category, context, empathy) is below that,
+so the message path uses `in` checks; the automaton serves find_all() (spans
+and tags in one pass) and takes over automatically once a group grows.
+"""
+
+import time
+from collections import deque, namedtuple
+
+# A single phrase occurrence: span is [start, end) in the lowercased text
+Match = namedtuple('Match', ['start', 'end', 'phrase', 'tags'])
+
+# Below this many phrases per group, repeated `in` checks (C substring search)
+# beat one automaton pass in Python; the crossover measured here is ~150
+AUTOMATON_MIN_PHRASES = 200
+
+
+# Crisis keywords used by detect_crisis_keywords (app.py)
+# EXPANDED keyword list based on real-world crisis language patterns.
+CRISIS_KEYWORDS = [
+    # Direct suicide mentions (including common misspellings)
+    'suicide', 'suicidal', 'sucide', 'suicde', 'suiside', 'sucidal',
+    'kill myself', 'killing myself',
+    'end my life', 'ending my life', 'take my life', 'taking my life',
+
+    # Death wishes
+    'want to die', 'wanna die', 'wish i was dead', 'wish i were dead',
+    'better off dead', 'want to be dead', 'don\'t want to live',
+    'no reason to live', 'not worth living', 'life isn\'t worth',
+
+    # Ending/finishing expressions
+    'end it all', 'end this', 'finish myself', 'finish it',
+    'can\'t go on', 'cannot go on', 'give up on life',
+
+    # Self-harm
+    'harm myself', 'hurt myself', 'cut myself', 'cutting myself',
+    'self harm', 'self-harm', 'self injury',
+
+    # Crisis methods
+    'overdose', 'jump off', 'hang myself', 'hanging myself',
+    'shoot myself', 'drown myself', 'pills',
+
+    # Hopelessness (paraphrased crisis language)
+    'no way out', 'no escape', 'trapped', 'no hope',
+    'hopeless', 'helpless', 'no point in living',
+    'don\'t see a point', 'no point anymore', 'pointless',
+
+    # Pain/suffering expressions
+    'can\'t take this', 'cannot take this', 'can\'t take it',
+    'too much pain', 'unbearable', 'can\'t bear',
+    'want it to stop', 'make it stop', 'end the pain',
+
+    # Finality expressions
+    'saying goodbye', 'final goodbye', 'won\'t be here',
+    'better without me', 'burden', 'everyone would be better',
+    'disappear forever', 'cease to exist', 'stop existing'
+]
+
+# Category keywords for counseling retrieval (app.py / counseling_index.py)
+CATEGORY_KEYWORDS = {
+    'crisis': ['suicide', 'suicidal', 'kill myself', 'end my life', 'die', 'death', 'cant take', "can't take"],
+    'depression': ['depression', 'depressed', 'sad', 'hopeless', 'empty', 'worthless', 'useless'],
+    'anxiety': ['anxiety', 'anxious', 'worried', 'panic', 'nervous', 'stress', 'overwhelmed'],
+    'trauma': ['abuse', 'trauma', 'hurt', 'violated', 'ptsd', 'assault'],
+    'relationships': ['relationship', 'marriage', 'partner', 'boyfriend', 'girlfriend', 'spouse', 'divorce'],
+    'family': ['family', 'parent', 'mother', 'father', 'child', 'sibling', 'brother', 'sister'],
+    'self-esteem': ['self esteem', 'confidence', 'worth', 'value', 'believe in myself'],
+    'grief': ['grief', 'loss', 'died', 'death', 'mourning'],
+    'sleep': ['sleep', 'insomnia', 'cant sleep', "can't sleep", 'tired', 'exhausted'],
+    'general': ['help', 'need', 'advice', 'what should']
+}
+
+# Context categories used by preprocess_dataset.categorize_context
+CONTEXT_CATEGORY_KEYWORDS = {
+    'crisis': ['suicide', 'kill myself', 'end it', 'die', 'death'],
+    'depression': ['depressed', 'depression', 'sad', 'worthless', 'hopeless'],
+    'anxiety': ['anxious', 'anxiety', 'panic', 'worried', 'stress'],
+    'trauma': ['trauma', 'abuse', 'abused', 'ptsd', 'assault'],
+    'relationships': ['relationship', 'marriage', 'partner', 'divorce'],
+    'family': ['family', 'parent', 'child', 'sibling'],
+    'self-esteem': ['self esteem', 'confidence', 'worth'],
+    'grief': ['grief', 'loss', 'death', 'died'],
+}
+
+# Context emotions used by preprocess_dataset.add_empathy_prefix (checked in this order)
+EMPATHY_KEYWORDS = {
+    'crisis': ['suicide', 'kill myself', 'want to die', 'end it'],
+    'depression': ['depressed', 'worthless', 'hopeless', 'sad'],
+    'anxiety': ['anxious', 'anxiety', 'panic', 'worried', 'scared'],
+    'trauma': ['trauma', 'abuse', 'abused', 'hurt'],
+    'anger': ['angry', 'frustrated', 'mad'],
+}
+
+# Keyword groups compiled into the default matcher
+KEYWORD_GROUPS = {
+    'crisis': {'crisis': CRISIS_KEYWORDS},
+    'category': CATEGORY_KEYWORDS,
+    'context': CONTEXT_CATEGORY_KEYWORDS,
+    'empathy': EMPATHY_KEYWORDS,
+}
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over lowercase phrases.
+
+    Every phrase carries one or more (group, category) tags, so several keyword
+    lists that overlap (e.g. 'death' is both crisis and grief) share one automaton.
+    Matching is plain substring matching, the same as `phrase in text.lower()`.
+    matched(), categories() and contains_any() use `in` checks for groups with
+    fewer than automaton_min_phrases phrases, which is faster at that size.
+    """
+
+    def __init__(self, groups=None, automaton_min_phrases=AUTOMATON_MIN_PHRASES):
+        self.phrases = []        # pattern id -> phrase
+        self.tags = []           # pattern id -> tuple of (group, category)
+        self.category_order = {} # group -> categories in declaration order
+        self.automaton_min_phrases = automaton_min_phrases
+        self._group_patterns = {} # group -> pattern ids in declaration order
+        self._phrase_ids = {}
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        self._compiled = False
+        if groups:
+            for group, categories in groups.items():
+                self.add_group(group, categories)
+            self.compile()
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def add(self, phrase, group, category):
+        """Add a phrase with a (group, category) tag"""
+        phrase = phrase.lower()
+        if not phrase:
+            return
+        order = self.category_order.setdefault(group, [])
+        if category not in order:
+            order.append(category)
+
+        pattern_id = self._phrase_ids.get(phrase)
+        if pattern_id is None:
+            pattern_id = len(self.phrases)
+            self._phrase_ids[phrase] = pattern_id
+            self.phrases.append(phrase)
+            self.tags.append(())
+        if (group, category) not in self.tags[pattern_id]:
+            self.tags[pattern_id] = self.tags[pattern_id] + ((group, category),)
+        group_patterns = self._group_patterns.setdefault(group, [])
+        if pattern_id not in group_patterns:
+            group_patterns.append(pattern_id)
+        self._compiled = False
+
+    def add_group(self, group, categories):
+        """Add a {category: [phrases]} mapping under one group name"""
+        for category, phrases in categories.items():
+            for phrase in phrases:
+                self.add(phrase, group, category)
+
+    def compile(self):
+        """Build the trie, failure links and merged outputs"""
+        goto = [{}]
+        output = [[]]
+        for pattern_id, phrase in enumerate(self.phrases):
+            state = 0
+            for ch in phrase:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][ch] = next_state
+                    goto.append({})
+                    output.append([])
+                state = next_state
+            output[state].append(pattern_id)
+
+        # Breadth-first failure links; outputs inherit their suffix state's outputs
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in goto[state].items():
+                queue.append(next_state)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[next_state] = goto[f].get(ch, 0)
+                output[next_state].extend(output[fail[next_state]])
+
+        self._goto = goto
+        self._fail = fail
+        self._output = [tuple(o) for o in output]
+        self._compiled = True
+        return self
+
+    def _scan(self, text_lower):
+        """Yield (end, pattern_id) for every occurrence in already-lowercased text"""
+        if not self._compiled:
+            self.compile()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for i, ch in enumerate(text_lower):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern_id in output[state]:
+                yield i + 1, pattern_id
+
+    def find_all(self, text, group=None):
+        """Return every Match in one pass (optionally only phrases tagged with group)"""
+        matches = []
+        phrases, tags = self.phrases, self.tags
+        for end, pattern_id in self._scan(text.lower()):
+            pattern_tags = tags[pattern_id]
+            if group is not None:
+                pattern_tags = tuple(t for t in pattern_tags if t[0] == group)
+                if not pattern_tags:
+                    continue
+            phrase = phrases[pattern_id]
+            matches.append(Match(end - len(phrase), end, phrase, pattern_tags))
+        return matches
+
+    def _use_automaton(self, group):
+        return len(self._group_patterns.get(group, ())) >= self.automaton_min_phrases
+
+    def strategy(self, group):
+        """'automaton' or 'in-checks': how matched()/categories()/contains_any() scan a group"""
+        return 'automaton' if self._use_automaton(group) else 'in-checks'
+
+    def _scan_group(self, text_lower, group):
+        """Yield the pattern ids of a group that occur in the text (either strategy)"""
+        if self._use_automaton(group):
+            for _, pattern_id in self._scan(text_lower):
+                yield pattern_id
+        else:
+            phrases = self.phrases
+            for pattern_id in self._group_patterns.get(group, ()):
+                if phrases[pattern_id] in text_lower:
+                    yield pattern_id
+
+    def matched(self, text, group):
+        """Return {category: [distinct phrases]} for one group, in one pass"""
+        found = {}
+        seen = set()
+        for pattern_id in self._scan_group(text.lower(), group):
+            if pattern_id in seen:
+                continue
+            seen.add(pattern_id)
+            for tag_group, category in self.tags[pattern_id]:
+                if tag_group == group:
+                    found.setdefault(category, []).append(self.phrases[pattern_id])
+        return found
+
+    def categories(self, text, group):
+        """Return the matched categories of a group, in declaration order"""
+        found = self.matched(text, group)
+        return [c for c in self.category_order.get(group, []) if c in found]
+
+    def contains_any(self, text, group):
+        """True as soon as any phrase of the group occurs (stops at first hit)"""
+        text_lower = text.lower()
+        if not self._use_automaton(group):
+            phrases = self.phrases
+            return any(phrases[pattern_id] in text_lower for pattern_id in self._group_patterns.get(group, ()))
+        tags = self.tags
+        for _, pattern_id in self._scan(text_lower):
+            for tag_group, _ in tags[pattern_id]:
+                if tag_group == group:
+                    return True
+        return False
+
+
+_default_matcher = None
+
+
+def get_matcher():
+    """Return the shared matcher compiled from KEYWORD_GROUPS (built on first use)"""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = KeywordMatcher(KEYWORD_GROUPS)
+    return _default_matcher
+
+
+def benchmark(sizes=(70, 500, 2000, 5000), messages=200, seed=42):
+    """Compare per-message cost of repeated `in` checks vs one automaton pass"""
+    import random
+
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    base_text = ("I don't know what to do anymore, everything feels hopeless and I "
+                 "can't sleep because I'm so anxious about my family and my exams")
+    texts = [base_text[rng.randint(0, 40):] + ' ' + ''.join(rng.choice(letters) for _ in range(20))
+             for _ in range(messages)]
+
+    print(f"{'phrases':>8} | {'in-checks (us/msg)':>18} | {'automaton (us/msg)':>18} | {'speedup':>7}")
+    print("-" * 62)
+    for size in sizes:
+        phrases = list(CRISIS_KEYWORDS)
+        while len(phrases) < size:
+            words = [''.join(rng.choice(letters) for _ in range(rng.randint(3, 8)))
+                     for _ in range(rng.randint(1, 3))]
+            phrases.append(' '.join(words))
+        phrases = phrases[:size]
+
+        matcher = KeywordMatcher({'bench': {'crisis': phrases}})
+
+        start = time.perf_counter()
+        for text in texts:
+            text_lower = text.lower()
+            [p for p in phrases if p in text_lower]
+        naive = (time.perf_counter() - start) / messages * 1e6
+
+        start = time.perf_counter()
+        for text in texts:
+            matcher.find_all(text)
+        automaton = (time.perf_counter() - start) / messages * 1e6
+
+        print(f"{size:>8} | {naive:>18.1f} | {automaton:>18.1f} | {naive / automaton:>6.1f}x")
+
+
+if __name__ == '__main__':
+    matcher = get_matcher()
+    print(f"✅ Compiled {len(matcher)} phrases into {len(matcher._goto)} automaton states")
+    for group in matcher.category_order:
+        print(f"   {group:9} {len(matcher._group_patterns[group]):4d} phrases -> {matcher.strategy(group)}")
+    print(f"   (groups with {AUTOMATON_MIN_PHRASES}+ phrases use the automaton)\n")
+
+    sample = "I feel hopeless, can't sleep and I want to end it all"
+    print(f"Message: \"{sample}\"")
+    for match in matcher.find_all(sample):
+        print(f"   [{match.start:3d}:{match.end:3d}] {match.phrase!r:18} {match.tags}")
+
+    print("\n📊 Benchmark: cost per message as keyword lists grow\n")
+    benchmark()
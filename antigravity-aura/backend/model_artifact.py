@@ -0,0 +1,304 @@
+"""
+Model Artifact Format
+Versioned, memory-mappable on-disk layout for the distress detectors, replacing
+one pickled blob per model:
+
+    <name>.model/
+        manifest.json     format version, model kind, feature schema, vectorizer
+                          parameters, metadata (metrics), sha256 of every file
+        vocabulary.txt    TF-IDF vocabulary, one term per line in column order
+        <array>.npy       raw numpy arrays (idf, scaler statistics, forest nodes, ...)
+
+Arrays are opened with np.load(mmap_mode='r'): loading costs a few page-table
+entries instead of unpickling 200 trees, and pre-forked workers share the pages.
+Compatibility (format version, kind, feature schema) can be checked from the
+manifest alone, without touching the arrays.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+FORMAT_NAME = 'aura-model-artifact'
+FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+VOCABULARY_NAME = 'vocabulary.txt'
+
+# TfidfVectorizer parameters that affect transform() (all JSON-serializable)
+VECTORIZER_PARAMS = (
+    'analyzer', 'binary', 'decode_error', 'encoding', 'input', 'lowercase',
+    'max_df', 'max_features', 'min_df', 'ngram_range', 'norm', 'smooth_idf',
+    'stop_words', 'strip_accents', 'sublinear_tf', 'token_pattern', 'use_idf'
+)
+
+
+class ArtifactError(ValueError):
+    """Raised when an artifact is missing, corrupt or incompatible"""
+
+
+def is_artifact(path):
+    """True if path is a model artifact directory"""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_NAME))
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _json_default(value):
+    """JSON encoder for numpy scalars/arrays in metrics"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def vectorizer_state(vectorizer):
+    """Split a fitted TfidfVectorizer into (params, terms in column order, idf array)"""
+    params = {name: getattr(vectorizer, name) for name in VECTORIZER_PARAMS}
+    if params['ngram_range'] is not None:
+        params['ngram_range'] = list(params['ngram_range'])
+    if isinstance(params['stop_words'], (set, frozenset)):
+        params['stop_words'] = sorted(params['stop_words'])
+    terms = [None] * len(vectorizer.vocabulary_)
+    for term, column in vectorizer.vocabulary_.items():
+        terms[column] = term
+    idf = vectorizer.idf_ if params['use_idf'] else None
+    return params, terms, idf
+
+
+def vectorizer_from_state(params, terms, idf=None):
+    """Rebuild a fitted TfidfVectorizer from vectorizer_state() output"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    params = dict(params)
+    if params.get('ngram_range') is not None:
+        params['ngram_range'] = tuple(params['ngram_range'])
+    vectorizer = TfidfVectorizer(**params)
+    vectorizer.vocabulary_ = {term: column for column, term in enumerate(terms)}
+    vectorizer.fixed_vocabulary_ = False
+    if idf is not None:
+        vectorizer.idf_ = idf
+    return vectorizer
+
+
+def source_fingerprint(path):
+    """Size and mtime of the file an artifact was converted from"""
+    stat = os.stat(path)
+    return {'name': os.path.basename(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def write_artifact(path, kind, arrays, vocabulary=None, vectorizer=None,
+                   feature_schema=None, metadata=None, source=None):
+    """
+    Write a model artifact directory.
+
+    Args:
+        path: Output directory (replaced atomically if it exists)
+        kind: Model kind string checked on load (e.g. 'distress_detector_v2')
+        arrays: {name: numpy array}
+        vocabulary: Optional list of terms (written to vocabulary.txt)
+        vectorizer: Optional vectorizer parameters (JSON)
+        feature_schema: Feature layout the model expects (JSON)
+        metadata: Extra JSON (metrics, model type, ...)
+        source: Optional pickle the model came from (fingerprinted for is_stale)
+
+    Returns:
+        The manifest dict
+    """
+    tmp_dir = f"{path}.tmp-{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    files = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        file_name = f'{name}.npy'
+        np.save(os.path.join(tmp_dir, file_name), array)
+        files[file_name] = {
+            'dtype': str(array.dtype),
+            'shape': list(array.shape),
+            'sha256': _sha256(os.path.join(tmp_dir, file_name))
+        }
+
+    if vocabulary is not None:
+        if any('\n' in term for term in vocabulary):
+            raise ArtifactError("Vocabulary terms may not contain newlines")
+        with open(os.path.join(tmp_dir, VOCABULARY_NAME), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(vocabulary))
+        files[VOCABULARY_NAME] = {
+            'terms': len(vocabulary),
+            'sha256': _sha256(os.path.join(tmp_dir, VOCABULARY_NAME))
+        }
+
+    manifest = {
+        'format': FORMAT_NAME,
+        'format_version': FORMAT_VERSION,
+        'kind': kind,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'feature_schema': feature_schema or {},
+        'vectorizer': vectorizer,
+        'metadata': metadata or {},
+        'files': files,
+        'source': source_fingerprint(source) if source else None,
+    }
+    with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, default=_json_default)
+
+    # Swap the finished directory in so readers never see a partial artifact
+    if os.path.isdir(path):
+        old_dir = f"{path}.old-{os.getpid()}"
+        os.replace(path, old_dir)
+        os.replace(tmp_dir, path)
+        for name in os.listdir(old_dir):
+            os.remove(os.path.join(old_dir, name))
+        os.rmdir(old_dir)
+    else:
+        os.replace(tmp_dir, path)
+    return manifest
+
+
+def read_manifest(path):
+    """Read an artifact's manifest (cheap: no arrays are opened)"""
+    manifest_path = os.path.join(path, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        raise ArtifactError(f"No model artifact at {path}")
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def check_compatible(path, kind=None, feature_schema=None):
+    """
+    Validate an artifact from its manifest alone.
+
+    Raises ArtifactError on an unknown format, a newer format version, a different
+    model kind, or (if given) a feature schema that differs from the expected one.
+    Returns the manifest.
+    """
+    manifest = read_manifest(path)
+    if manifest.get('format') != FORMAT_NAME:
+        raise ArtifactError(f"{path} is not a model artifact (format={manifest.get('format')!r})")
+    if manifest.get('format_version', 0) > FORMAT_VERSION:
+        raise ArtifactError(f"{path} uses format version {manifest.get('format_version')}, "
+                            f"this code reads up to {FORMAT_VERSION}")
+    if kind is not None and manifest.get('kind') != kind:
+        raise ArtifactError(f"{path} holds a {manifest.get('kind')!r} model, expected {kind!r}")
+    if feature_schema is not None:
+        for key, expected in feature_schema.items():
+            if manifest['feature_schema'].get(key) != expected:
+                raise ArtifactError(f"{path} feature schema mismatch for {key!r}")
+    return manifest
+
+
+def verify_artifact(path, manifest=None):
+    """Check every file against the sha256 recorded in the manifest"""
+    manifest = manifest or read_manifest(path)
+    for file_name, info in manifest['files'].items():
+        if _sha256(os.path.join(path, file_name)) != info['sha256']:
+            raise ArtifactError(f"Checksum mismatch for {file_name} in {path}")
+
+
+def load_artifact(path, kind=None, mmap=True, verify=False):
+    """
+    Open an artifact.
+
+    Returns:
+        (manifest, {name: array}, vocabulary list or None). With mmap=True the
+        arrays are read-only memory maps.
+    """
+    manifest = check_compatible(path, kind)
+    if verify:
+        verify_artifact(path, manifest)
+
+    mmap_mode = 'r' if mmap else None
+    arrays = {}
+    for file_name in manifest['files']:
+        if file_name.endswith('.npy'):
+            # Plain ndarray views of the maps (np.memmap adds per-operation overhead)
+            array = np.load(os.path.join(path, file_name), mmap_mode=mmap_mode)
+            arrays[file_name[:-4]] = array.view(np.ndarray) if mmap else array
+
+    vocabulary = None
+    if VOCABULARY_NAME in manifest['files']:
+        with open(os.path.join(path, VOCABULARY_NAME), 'r', encoding='utf-8') as f:
+            vocabulary = f.read().split('\n')
+    return manifest, arrays, vocabulary
+
+
+def is_stale(path, source_path):
+    """
+    True if source_path (the pickle) changed since the artifact was converted
+    from it, e.g. after retraining. Artifacts without a recorded source count
+    as stale whenever the pickle exists.
+    """
+    if not os.path.exists(source_path):
+        return False
+    source = read_manifest(path).get('source')
+    if not source:
+        return True
+    return source_fingerprint(source_path) != source
+
+
+def artifact_path(pickle_path):
+    """Artifact directory next to a pickle: model.pkl -> model.model"""
+    base = pickle_path[:-4] if pickle_path.endswith('.pkl') else pickle_path
+    return base + '.model'
+
+
+if __name__ == '__main__':
+    import argparse
+    import pickle
+    import subprocess
+    import sys
+
+    parser = argparse.ArgumentParser(description='Convert pickled distress detectors to model artifacts')
+    parser.add_argument('pickles', nargs='+', help='Pickled model files (distress_detector*.pkl)')
+    parser.add_argument('--benchmark', action='store_true', help='Compare pickle vs artifact load time and RSS')
+    args = parser.parse_args()
+
+    def detector_for(pickle_path):
+        with open(pickle_path, 'rb') as f:
+            model_data = pickle.load(f)
+        if 'scaler' in model_data:
+            from distress_detector_v2 import EnhancedMentalHealthDetector
+            return EnhancedMentalHealthDetector(model_type=model_data['model_type'])
+        from distress_detector import MentalHealthDetector
+        return MentalHealthDetector()
+
+    for pickle_path in args.pickles:
+        detector = detector_for(pickle_path)
+        detector.load_model(pickle_path)
+        out = artifact_path(pickle_path)
+        detector.save_artifact(out, source=pickle_path)
+
+        if args.benchmark:
+            # Each measurement runs in a fresh interpreter (imports done first), so the
+            # private-memory delta reflects only the model load (Linux smaps_rollup)
+            snippet = (
+                "import sys, time\n"
+                "from {module} import {cls}\n"
+                "def private_kb():\n"
+                "    try:\n"
+                "        with open('/proc/self/smaps_rollup') as f:\n"
+                "            return sum(int(line.split()[1]) for line in f if line.startswith('Private_'))\n"
+                "    except OSError:\n"
+                "        return 0\n"
+                "d = {cls}()\n"
+                "before = private_kb()\n"
+                "start = time.perf_counter()\n"
+                "d.load_model(sys.argv[1])\n"
+                "d.predict_distress('I feel hopeless')\n"
+                "print(time.perf_counter() - start, private_kb() - before)\n"
+            ).format(module=type(detector).__module__, cls=type(detector).__name__)
+            print(f"\n📊 {pickle_path} vs {out}")
+            for label, path in (('pickle', pickle_path), ('artifact', out)):
+                result = subprocess.run([sys.executable, '-c', snippet, path],
+                                        capture_output=True, text=True, check=True)
+                seconds, private_kb = result.stdout.strip().splitlines()[-1].split()
+                print(f"   {label:9s} load+first predict {float(seconds)*1000:8.1f} ms   "
+                      f"private memory +{int(private_kb)/1024:6.1f} MB")
@@ -0,0 +1,354 @@
+"""
+Pre-Fork Production Server
+Loads every model and dataset once in a master process, then forks N worker
+processes that serve the Flask app from a shared listening socket.
+
+- Read-only structures (forest arrays, vocabularies, counseling index) are shared
+  copy-on-write; gc.freeze() keeps the collector from touching (and copying) them
+- CPU-bound predictions run in parallel across workers instead of on one GIL
+- Dead workers are respawned; SIGHUP recycles workers one at a time (graceful,
+  in-flight requests finish); SIGTERM/SIGINT stops everything gracefully
+- Per-worker stats live in shared memory: GET /api/workers, plus a periodic table
+
+Usage:
+    python prefork_server.py --workers 4 --port 5000
+
+POSIX only (uses os.fork).
+"""
+
+import argparse
+import gc
+import importlib
+import mmap
+import os
+import resource
+import signal
+import socket
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Shared per-worker stats row (one per worker slot, written only by that worker)
+STATS_DTYPE = np.dtype([
+    ('pid', np.int64),
+    ('generation', np.int64),      # How many times this slot has been (re)spawned
+    ('started_at', np.float64),
+    ('requests', np.int64),
+    ('errors', np.int64),          # 5xx responses
+    ('in_flight', np.int64),
+    ('latency_ms_total', np.float64),
+    ('last_request_at', np.float64),
+    ('max_rss_kb', np.int64),
+])
+
+
+class WorkerStats:
+    """Per-slot request counters in anonymous shared memory (survives fork)"""
+
+    def __init__(self, slots):
+        self._buffer = mmap.mmap(-1, STATS_DTYPE.itemsize * slots)
+        self.rows = np.frombuffer(self._buffer, dtype=STATS_DTYPE)
+        self.rows[:] = 0
+        self.slot = None  # Set in a worker: the row this process writes
+        self._lock = threading.Lock()
+        self.max_requests = 0
+        self.on_max_requests = None  # Called in a worker once it has served max_requests
+
+    def reset_slot(self, slot, generation):
+        row = self.rows[slot]
+        row['pid'] = os.getpid()
+        row['generation'] = generation
+        row['started_at'] = time.time()
+        for field in ('requests', 'errors', 'in_flight', 'latency_ms_total', 'last_request_at', 'max_rss_kb'):
+            row[field] = 0
+        self.slot = slot
+        self._lock = threading.Lock()
+
+    def request_started(self):
+        with self._lock:
+            self.rows[self.slot]['in_flight'] += 1
+
+    def request_finished(self, latency_ms, error):
+        with self._lock:
+            row = self.rows[self.slot]
+            row['in_flight'] -= 1
+            row['requests'] += 1
+            row['errors'] += int(error)
+            row['latency_ms_total'] += latency_ms
+            row['last_request_at'] = time.time()
+            row['max_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            served = int(row['requests'])
+        if self.max_requests and served >= self.max_requests and self.on_max_requests:
+            self.on_max_requests()
+
+    def snapshot(self):
+        workers = []
+        for slot, row in enumerate(self.rows):
+            requests = int(row['requests'])
+            workers.append({
+                'slot': slot,
+                'pid': int(row['pid']),
+                'generation': int(row['generation']),
+                'uptime_seconds': round(time.time() - row['started_at'], 1) if row['started_at'] else None,
+                'requests': requests,
+                'errors': int(row['errors']),
+                'in_flight': int(row['in_flight']),
+                'avg_latency_ms': round(float(row['latency_ms_total']) / requests, 2) if requests else None,
+                'max_rss_mb': round(int(row['max_rss_kb']) / 1024, 1),
+            })
+        return workers
+
+
+def instrument(flask_app, stats, master_pid):
+    """Register request hooks and the /api/workers endpoint (before forking)"""
+    from flask import g, jsonify
+
+    @flask_app.before_request
+    def _prefork_request_started():
+        if stats.slot is not None:
+            g.prefork_started = time.perf_counter()
+            stats.request_started()
+
+    @flask_app.after_request
+    def _prefork_mark_status(response):
+        g.prefork_error = response.status_code >= 500
+        return response
+
+    @flask_app.teardown_request
+    def _prefork_request_finished(exc):
+        started = g.pop('prefork_started', None)
+        if started is not None:
+            error = exc is not None or g.pop('prefork_error', False)
+            stats.request_finished((time.perf_counter() - started) * 1000, error)
+
+    def workers():
+        """Per-worker request stats for the pre-fork server"""
+        return jsonify({'master_pid': master_pid, 'served_by': os.getpid(), 'workers': stats.snapshot()})
+
+    flask_app.add_url_rule('/api/workers', 'workers', workers, methods=['GET'])
+
+
+class PreforkServer:
+    """Master process: owns the listening socket and supervises worker processes"""
+
+    def __init__(self, app_module, host='127.0.0.1', port=5000, workers=2,
+                 graceful_timeout=30.0, max_requests=0, stats_interval=60.0):
+        self.app_module = app_module
+        self.flask_app = app_module.app
+        self.host = host
+        self.port = port
+        self.num_workers = max(1, int(workers))
+        self.graceful_timeout = graceful_timeout
+        self.max_requests = max_requests
+        self.stats_interval = stats_interval
+
+        self.stats = WorkerStats(self.num_workers)
+        self.stats.max_requests = max_requests
+        self.workers = {}        # pid -> slot
+        self.generations = [0] * self.num_workers
+        self.listener = None
+        self._stopping = False
+        self._restart_requested = False
+
+    # ----- master -----
+
+    def run(self):
+        self.listener = socket.create_server((self.host, self.port), backlog=2048)
+        # Workers all poll the same socket; non-blocking accept lets the losers move on
+        self.listener.setblocking(False)
+
+        instrument(self.flask_app, self.stats, os.getpid())
+
+        # Everything loaded so far is shared with the workers; move it out of the
+        # collector's reach so gc passes in workers don't dirty the shared pages
+        gc.collect()
+        gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_restart)
+
+        print(f"🚀 Pre-fork master {os.getpid()} listening on http://{self.host}:{self.port} "
+              f"with {self.num_workers} workers")
+        for slot in range(self.num_workers):
+            self._spawn(slot)
+
+        last_stats = time.monotonic()
+        try:
+            while not self._stopping:
+                self._reap(respawn=True)
+                if self._restart_requested:
+                    self._restart_requested = False
+                    self._rolling_restart()
+                if self.stats_interval and time.monotonic() - last_stats >= self.stats_interval:
+                    self.print_stats()
+                    last_stats = time.monotonic()
+                time.sleep(0.2)
+        finally:
+            self._shutdown()
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+
+    def _handle_restart(self, signum, frame):
+        self._restart_requested = True
+
+    def _spawn(self, slot):
+        self.generations[slot] += 1
+        pid = os.fork()
+        if pid == 0:
+            try:
+                self._worker_main(slot, self.generations[slot])
+            finally:
+                os._exit(0)
+        self.workers[pid] = slot
+        print(f"👷 Worker {pid} started (slot {slot}, generation {self.generations[slot]})")
+        return pid
+
+    def _reap(self, respawn):
+        """Collect exited workers; respawn their slots unless shutting down"""
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            slot = self.workers.pop(pid, None)
+            if slot is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if respawn and not self._stopping:
+                if code != 0:
+                    print(f"⚠️ Worker {pid} (slot {slot}) exited with {code}, respawning")
+                    # Back off a little if the slot is crash-looping
+                    if time.time() - self.stats.rows[slot]['started_at'] < 1.0:
+                        time.sleep(1.0)
+                else:
+                    print(f"♻️ Worker {pid} (slot {slot}) recycled")
+                self._spawn(slot)
+
+    def _stop_worker(self, pid):
+        """SIGTERM one worker and wait for it (SIGKILL after graceful_timeout)"""
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        deadline = time.monotonic() + self.graceful_timeout + 5.0
+        while time.monotonic() < deadline:
+            done, _ = os.waitpid(pid, os.WNOHANG)
+            if done:
+                return
+            time.sleep(0.05)
+        print(f"⚠️ Worker {pid} did not stop in time, killing")
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+
+    def _rolling_restart(self):
+        """Replace workers one at a time so the others keep serving"""
+        print("♻️ Rolling restart of all workers...")
+        for pid, slot in list(self.workers.items()):
+            if self._stopping:
+                return
+            self._stop_worker(pid)
+            self.workers.pop(pid, None)
+            self._spawn(slot)
+        print("✅ Rolling restart complete")
+
+    def _shutdown(self):
+        print("🛑 Stopping workers...")
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.graceful_timeout + 5.0
+        while self.workers and time.monotonic() < deadline:
+            self._reap(respawn=False)
+            time.sleep(0.05)
+        for pid in list(self.workers):
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.workers.clear()
+        self.listener.close()
+        self.print_stats()
+
+    def print_stats(self):
+        print(f"📊 {'slot':>4} {'pid':>8} {'gen':>4} {'requests':>9} {'errors':>7} "
+              f"{'in-flight':>9} {'avg ms':>8} {'rss MB':>7}")
+        for w in self.stats.snapshot():
+            avg = f"{w['avg_latency_ms']:.1f}" if w['avg_latency_ms'] is not None else '-'
+            print(f"   {w['slot']:>4} {w['pid']:>8} {w['generation']:>4} {w['requests']:>9} {w['errors']:>7} "
+                  f"{w['in_flight']:>9} {avg:>8} {w['max_rss_mb']:>7}")
+
+    # ----- worker -----
+
+    def _worker_main(self, slot, generation):
+        from werkzeug.serving import make_server
+
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C goes to the master
+        signal.signal(signal.SIGHUP, signal.SIG_DFL)
+        self.workers = {}
+        self.stats.reset_slot(slot, generation)
+        self.app_module.after_fork(slot)
+
+        server = make_server(self.host, self.port, self.flask_app, threaded=True, fd=self.listener.fileno())
+        stopping = threading.Event()
+
+        def stop(*_):
+            if not stopping.is_set():
+                stopping.set()
+                # shutdown() blocks until serve_forever returns, so call it off the main thread
+                threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+
+        self.stats.on_max_requests = stop
+
+        server.serve_forever(poll_interval=0.5)
+
+        # Let in-flight requests (and open streams) finish
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.stats.rows[slot]['in_flight'] > 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pre-fork multi-process server for the AURA backend')
+    parser.add_argument('--host', default=os.getenv('HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('FLASK_PORT', '5000')))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WEB_WORKERS', str(os.cpu_count() or 1))),
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--graceful-timeout', type=float, default=float(os.getenv('GRACEFUL_TIMEOUT', '30')),
+                        help='Seconds a stopping worker may spend finishing in-flight requests')
+    parser.add_argument('--max-requests', type=int, default=int(os.getenv('WORKER_MAX_REQUESTS', '0')),
+                        help='Recycle a worker after this many requests (0 = never)')
+    parser.add_argument('--stats-interval', type=float, default=float(os.getenv('WORKER_STATS_INTERVAL', '60')),
+                        help='Seconds between per-worker stats tables (0 = off)')
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, 'fork'):
+        sys.exit("❌ prefork_server.py needs os.fork (Linux/macOS); use app.py on this platform")
+
+    # Tell app.py to load everything synchronously and start no threads before fork
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.environ['AURA_PREFORK'] = '1'
+    started = time.perf_counter()
+    app_module = importlib.import_module('app')
+    print(f"✅ Master preloaded all components in {time.perf_counter() - started:.1f}s")
+
+    PreforkServer(
+        app_module,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        graceful_timeout=args.graceful_timeout,
+        max_requests=args.max_requests,
+        stats_interval=args.stats_interval
+    ).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,8 @@ import json
 import re
 from collections import defaultdict
 
+from keyword_matcher import get_matcher
+
 def clean_text(text):
     """Remove extra whitespace and formatting issues"""
     if not text:
@@ -96,18 +98,19 @@ def add_empathy_prefix(response, context):
     if any(response_lower.startswith(starter) for starter in empathy_starters):
         return response
     
-    # Detect context emotion
-    context_lower = context.lower()
+    # Detect context emotion (single matcher call, first category in priority order wins)
+    emotions = get_matcher().categories(context, 'empathy')
+    emotion = emotions[0] if emotions else None
     
-    if any(word in context_lower for word in ['suicide', 'kill myself', 'want to die', 'end it']):
+    if emotion == 'crisis':
         prefix = "I'm deeply concerned about what you're sharing. "
-    elif any(word in context_lower for word in ['depressed', 'worthless', 'hopeless', 'sad']):
+    elif emotion == 'depression':
         prefix = "I hear how much pain you're in, and I want you to know you're not alone. "
-    elif any(word in context_lower for word in ['anxious', 'anxiety', 'panic', 'worried', 'scared']):
+    elif emotion == 'anxiety':
         prefix = "I understand how overwhelming anxiety can feel. "
-    elif any(word in context_lower for word in ['trauma', 'abuse', 'abused', 'hurt']):
+    elif emotion == 'trauma':
         prefix = "Thank you for trusting me with something so difficult. "
-    elif any(word in context_lower for word in ['angry', 'frustrated', 'mad']):
+    elif emotion == 'anger':
         prefix = "I hear your frustration, and those feelings are valid. "
     else:
         prefix = "Thank you for reaching out. "
@@ -116,26 +119,7 @@ def add_empathy_prefix(response, context):
 
 def categorize_context(context):
     """Categorize the mental health concern"""
-    context_lower = context.lower()
-    categories = []
-    
-    if any(word in context_lower for word in ['suicide', 'kill myself', 'end it', 'die', 'death']):
-        categories.append('crisis')
-    if any(word in context_lower for word in ['depressed', 'depression', 'sad', 'worthless', 'hopeless']):
-        categories.append('depression')
-    if any(word in context_lower for word in ['anxious', 'anxiety', 'panic', 'worried', 'stress']):
-        categories.append('anxiety')
-    if any(word in context_lower for word in ['trauma', 'abuse', 'abused', 'ptsd', 'assault']):
-        categories.append('trauma')
-    if any(word in context_lower for word in ['relationship', 'marriage', 'partner', 'divorce']):
-        categories.append('relationships')
-    if any(word in context_lower for word in ['family', 'parent', 'child', 'sibling']):
-        categories.append('family')
-    if any(word in context_lower for word in ['self esteem', 'confidence', 'worth']):
-        categories.append('self-esteem')
-    if any(word in context_lower for word in ['grief', 'loss', 'death', 'died']):
-        categories.append('grief')
-    
+    categories = get_matcher().categories(context, 'context')
     return categories if categories else ['general']
 
 def extract_keywords(text):
@@ -0,0 +1,89 @@
+"""
+Response Cache
+Thread-safe TTL + size-bounded LRU cache for generated chat responses,
+with hit/miss counters for /api/metrics.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+_WHITESPACE = re.compile(r'\s+')
+_TRAILING_PUNCTUATION = re.compile(r'[\s.!?,;:]+$')
+
+
+def normalize_message(text):
+    """Normalize a message for cache keys: lowercase, collapse whitespace, drop trailing punctuation"""
+    text = _WHITESPACE.sub(' ', str(text).lower()).strip()
+    return _TRAILING_PUNCTUATION.sub('', text)
+
+
+class TTLCache:
+    """
+    LRU cache whose entries also expire after ttl_seconds.
+
+    Reads move an entry to the most-recently-used end; inserts beyond max_entries
+    evict from the least-recently-used end. ttl_seconds=None disables expiry.
+    """
+
+    def __init__(self, max_entries=1000, ttl_seconds=3600.0, name='cache'):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key, default=None):
+        """Return the cached value, or default on miss/expiry"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Insert or refresh an entry, evicting least-recently-used entries if full"""
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
@@ -0,0 +1,182 @@
+"""
+Retrieval Service
+Knowledge-base retrieval (RAG) for Gemini prompts, without the cold start on the
+request path.
+
+- The embedding model and vector store are loaded by app.py's ComponentRegistry
+  (in the background unless BACKGROUND_WARMUP=0); until then retrieve()
+  returns None (context skipped), and replies are not cached
+- Query embeddings are cached in an LRU keyed by the normalized query text
+- Encodes from concurrent requests are micro-batched into one model call
+- stats() reports load time, cache hit rate, batching and latency percentiles
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from inference_batcher import MicroBatcher
+from response_cache import TTLCache, normalize_message
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chroma_db')
+DEFAULT_EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+DEFAULT_COLLECTION = 'mental_health_knowledge'
+
+
+def chroma_loader(db_path=DEFAULT_DB_PATH, model_name=DEFAULT_EMBEDDING_MODEL, collection=DEFAULT_COLLECTION):
+    """Loader for the store built by setup_rag.py: returns (encode_batch, query)"""
+    def load():
+        # Heavy imports (torch, chromadb) stay off the startup path
+        from sentence_transformers import SentenceTransformer
+        import chromadb
+
+        model = SentenceTransformer(model_name)
+        store = chromadb.PersistentClient(path=db_path).get_collection(collection)
+
+        def encode_batch(texts):
+            return [vector.tolist() for vector in model.encode(list(texts))]
+
+        def query(embedding, top_k):
+            results = store.query(query_embeddings=[embedding], n_results=top_k)
+            return results['documents'][0]
+
+        return encode_batch, query
+    return load
+
+
+class RetrievalService:
+    """
+    Cached, batched retrieval over a lazily loaded model and store.
+
+    Args:
+        loader: Callable returning (encode_batch(texts) -> vectors, query(vector, top_k) -> documents)
+        cache_size: Maximum number of cached query embeddings
+        max_batch_size: Most queries encoded in one model call
+        max_wait_ms: How long the batcher waits for more queries
+    """
+
+    def __init__(self, loader, cache_size=2048, max_batch_size=16, max_wait_ms=5.0, history=1000):
+        self.loader = loader
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.embeddings = TTLCache(max_entries=cache_size, ttl_seconds=None, name='rag_embeddings')
+
+        self._encode_batch = None
+        self._query = None
+        self._batcher = None
+        self._lock = threading.Lock()
+
+        # Metrics (recent history only, bounded)
+        self._encode_times = deque(maxlen=history)
+        self._query_times = deque(maxlen=history)
+        self._total_times = deque(maxlen=history)
+        self.requests = 0
+        self.skipped = 0  # Requests answered without context (not loaded yet, or failed)
+        self.errors = 0
+
+    @property
+    def ready(self):
+        return self._batcher is not None
+
+    def load(self):
+        """Load the model and store (synchronously; raises if they are unavailable)"""
+        encode_batch, query = self.loader()
+        self._encode_batch, self._query = encode_batch, query
+        self._start_batcher()
+        return self
+
+    def _start_batcher(self):
+        self._batcher = MicroBatcher(
+            self._encode_batch,
+            max_batch_size=self.max_batch_size,
+            max_wait_ms=self.max_wait_ms,
+            name='rag-encode'
+        )
+
+    def after_fork(self):
+        """Recreate the batcher thread in a forked worker (threads do not survive fork)"""
+        if self.ready:
+            self._start_batcher()
+
+    def embed(self, query):
+        """Embedding for a query, from the cache or one batched encode"""
+        key = normalize_message(query)
+        embedding = self.embeddings.get(key)
+        if embedding is None:
+            started = time.perf_counter()
+            embedding = self._batcher.predict(query)
+            with self._lock:
+                self._encode_times.append(time.perf_counter() - started)
+            self.embeddings.set(key, embedding)
+        return embedding
+
+    def retrieve(self, query, top_k=3):
+        """Knowledge-base documents for a query, or None if retrieval was skipped"""
+        if not self.ready:
+            with self._lock:
+                self.skipped += 1
+            return None
+
+        started = time.perf_counter()
+        try:
+            embedding = self.embed(query)
+            query_started = time.perf_counter()
+            documents = self._query(embedding, top_k)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+                self.skipped += 1
+            print(f"⚠️ RAG retrieval error: {e}")
+            return None
+        finished = time.perf_counter()
+        with self._lock:
+            self.requests += 1
+            self._query_times.append(finished - query_started)
+            self._total_times.append(finished - started)
+        return documents
+
+    def stats(self):
+        """Embedding cache, batching and latency metrics (milliseconds)"""
+        percentiles = MicroBatcher._percentiles
+        with self._lock:
+            result = {
+                'ready': self.ready,
+                'requests': self.requests,
+                'skipped': self.skipped,
+                'errors': self.errors,
+                'encode_ms': percentiles(list(self._encode_times), scale=1000.0),
+                'query_ms': percentiles(list(self._query_times), scale=1000.0),
+                'total_ms': percentiles(list(self._total_times), scale=1000.0),
+            }
+        result['embedding_cache'] = self.embeddings.stats()
+        result['encode_batching'] = self._batcher.stats() if self._batcher else None
+        return result
+
+
+def create_retrieval_service():
+    """
+    Build the service from RAG_ENABLED / RAG_DB_PATH / RAG_* settings.
+
+    RAG_ENABLED=auto (default) enables retrieval when the setup_rag.py database
+    exists; returns None when retrieval is disabled.
+    """
+    db_path = os.getenv('RAG_DB_PATH', DEFAULT_DB_PATH)
+    enabled = os.getenv('RAG_ENABLED', 'auto').lower()
+    if enabled == 'auto':
+        enabled = os.path.isdir(db_path)
+    else:
+        enabled = enabled in ('1', 'true', 'yes')
+    if not enabled:
+        return None
+
+    return RetrievalService(
+        chroma_loader(
+            db_path=db_path,
+            model_name=os.getenv('RAG_EMBEDDING_MODEL', DEFAULT_EMBEDDING_MODEL),
+            collection=os.getenv('RAG_COLLECTION', DEFAULT_COLLECTION)
+        ),
+        cache_size=int(os.getenv('RAG_CACHE_MAX_ENTRIES', '2048')),
+        max_batch_size=int(os.getenv('RAG_BATCH_MAX_SIZE', '16')),
+        max_wait_ms=float(os.getenv('RAG_BATCH_MAX_WAIT_MS', '5'))
+    )
@@ -0,0 +1,176 @@
+"""
+Sparse Nearest-Neighbour Search
+Top-k cosine similarity over TF-IDF rows without scoring the whole matrix.
+
+Rows are L2-normalized once. Each term keeps an impact-ordered postings list
+(rows sorted by that term's weight), pruned to the max_postings highest-weight
+rows. A query gathers candidates from the postings of its own terms and rescores
+only those exactly, so per-query work depends on max_postings and the number of
+query terms, not on the corpus size.
+
+max_postings=None is exact. A smaller value trades recall for bounded latency: a
+row is only missed if every term it shares with the query ranks below max_postings
+for that term, i.e. it is a weak match anyway. Corpora up to brute_force_rows rows
+are simply scored in full (one sparse product is faster there, and exact).
+
+    python sparse_retrieval.py --rows 1000 10000 100000 --max-postings 500 2000
+"""
+
+import numpy as np
+from scipy import sparse
+
+# Up to this many rows one sparse product over all of them beats candidate generation
+BRUTE_FORCE_ROWS = 10000
+
+
+def normalize_rows(matrix):
+    """CSR copy with unit-length rows, keeping float32/float64 precision"""
+    matrix = sparse.csr_matrix(matrix, copy=True)
+    if matrix.dtype not in (np.float32, np.float64):
+        matrix = matrix.astype(np.float64)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    # Zero rows, and rows already unit length (TF-IDF output: keeps scores bit-identical)
+    norms[(norms == 0) | (np.abs(norms - 1.0) < 1e-6)] = 1.0
+    matrix.data /= np.repeat(norms, np.diff(matrix.indptr)).astype(matrix.dtype)
+    return matrix
+
+
+def select_top_k(rows, scores, k, threshold):
+    """(row, score) pairs with score > threshold, best first; ties go to the lowest row"""
+    keep = scores > threshold
+    rows, scores = rows[keep], scores[keep]
+    if len(rows) == 0 or k <= 0:
+        return []
+    if k == 1:
+        best = np.argmax(scores)  # First (lowest) row wins ties, like np.argmax over all rows
+        return [(int(rows[best]), float(scores[best]))]
+    if k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+        rows, scores = rows[top], scores[top]
+    order = np.lexsort((rows, -scores))
+    return [(int(rows[i]), float(scores[i])) for i in order]
+
+
+class SparseNeighborIndex:
+    """
+    Pruned inverted index over sparse row vectors.
+
+    Args:
+        vectors: (n_rows, n_terms) sparse matrix, e.g. TF-IDF vectors
+        max_postings: Postings kept per term (None = exact search)
+        brute_force_rows: Score every row when the corpus is at most this large
+        ids: Optional increasing ids returned in place of row numbers
+    """
+
+    def __init__(self, vectors, max_postings=None, brute_force_rows=BRUTE_FORCE_ROWS, ids=None):
+        self.rows = normalize_rows(vectors)
+        self.max_postings = max_postings
+        self.ids = ids
+        self.exact = max_postings is None or self.rows.shape[0] <= brute_force_rows
+        self.postings = self.postings_indptr = None
+        if self.exact:
+            return
+
+        # Impact-ordered postings: per term, rows by descending weight, truncated
+        csc = self.rows.tocsc()
+        counts = np.diff(csc.indptr)
+        terms = np.repeat(np.arange(csc.shape[1]), counts)
+        order = np.lexsort((-csc.data, terms))
+        rank = np.arange(len(order)) - np.repeat(csc.indptr[:-1], counts)
+        keep = rank < max_postings
+        order = order[keep]
+        counts = np.minimum(counts, max_postings)
+        self.postings = csc.indices[order].astype(np.int32)
+        self.postings_indptr = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+    def __len__(self):
+        return self.rows.shape[0]
+
+    def candidates(self, query):
+        """Sorted unique rows sharing a kept posting with a (normalized) query row"""
+        terms = query.indices
+        if len(terms) == 0:
+            return np.empty(0, dtype=np.int32)
+        starts = self.postings_indptr[terms]
+        ends = self.postings_indptr[terms + 1]
+        return np.unique(np.concatenate([self.postings[s:e] for s, e in zip(starts, ends)]))
+
+    def search(self, query, k=1, threshold=0.0):
+        """Top-k (row, cosine similarity) pairs above threshold, best first"""
+        if self.exact:
+            return self.brute_force(query, k, threshold)
+        query = normalize_rows(query)
+        rows = self.candidates(query)
+        if len(rows) == 0:
+            return []
+        scores = self.rows[rows].dot(query.T).toarray().ravel()
+        return self._with_ids(select_top_k(rows, scores, k, threshold))
+
+    def brute_force(self, query, k=1, threshold=0.0):
+        """Exact top-k by scoring every row (reference for recall)"""
+        scores = self.rows.dot(normalize_rows(query).T).toarray().ravel()
+        return self._with_ids(select_top_k(np.arange(len(scores)), scores, k, threshold))
+
+    def _with_ids(self, matches):
+        if self.ids is None:
+            return matches
+        return [(int(self.ids[row]), score) for row, score in matches]
+
+    def recall(self, queries, k=10, threshold=0.0):
+        """Mean fraction of the exact top-k rows (above threshold) that search() returns"""
+        found = expected = 0
+        for i in range(queries.shape[0]):
+            exact = {row for row, _ in self.brute_force(queries[i], k, threshold)}
+            approx = {row for row, _ in self.search(queries[i], k, threshold)}
+            found += len(exact & approx)
+            expected += len(exact)
+        return found / expected if expected else 1.0
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Benchmark pruned sparse search vs brute force')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--max-postings', type=int, nargs='+', default=[500, 2000])
+    parser.add_argument('--terms', type=int, default=5000, help='Vocabulary size')
+    parser.add_argument('--row-terms', type=int, default=8, help='Terms per pattern')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--threshold', type=float, default=0.1)
+    args = parser.parse_args()
+
+    # Synthetic TF-IDF-like corpus: Zipfian term frequencies, idf-style weights
+    rng = np.random.default_rng(0)
+    term_p = 1.0 / np.arange(1, args.terms + 1)
+    term_p /= term_p.sum()
+    idf = np.log(1.0 / term_p).astype(np.float32)
+
+    def random_rows(count):
+        cols = rng.choice(args.terms, size=(count, args.row_terms), p=term_p)
+        indptr = np.arange(0, count * args.row_terms + 1, args.row_terms)
+        matrix = sparse.csr_matrix((idf[cols.ravel()], cols.ravel(), indptr), shape=(count, args.terms))
+        matrix.sum_duplicates()
+        return matrix
+
+    def per_query_ms(fn, queries):
+        start = time.perf_counter()
+        for i in range(queries.shape[0]):
+            fn(queries[i], args.k, args.threshold)
+        return (time.perf_counter() - start) / queries.shape[0] * 1000
+
+    queries = random_rows(args.queries)
+    print(f"📊 top-{args.k} above {args.threshold}, {args.queries} queries, {args.row_terms} terms/row")
+    print(f"{'rows':>9s} {'max_postings':>12s} {'build s':>8s} {'brute ms':>9s} {'index ms':>9s} {'recall':>7s}")
+    for count in args.rows:
+        corpus = random_rows(count)
+        for max_postings in [None] + args.max_postings:
+            start = time.perf_counter()
+            index = SparseNeighborIndex(corpus, max_postings, brute_force_rows=0)
+            build = time.perf_counter() - start
+            brute = per_query_ms(index.brute_force, queries)
+            search = per_query_ms(index.search, queries)
+            recall = index.recall(queries, args.k, args.threshold)
+            label = 'exact' if max_postings is None else str(max_postings)
+            print(f"{count:9d} {label:>12s} {build:8.2f} {brute:9.2f} {search:9.2f} {recall:7.3f}")
@@ -0,0 +1,153 @@
+"""
+Startup Profiler
+Per-phase timing and memory table for `python app.py --profile-startup`:
+top-level imports, component loads (models, datasets, API clients), the network
+probes inside them, and whatever else app.py does at import time.
+
+    python app.py --profile-startup                      # print the table and exit
+    python app.py --profile-startup --startup-budget 3   # exit 1 if startup takes > 3s
+
+The budget can also be set with STARTUP_BUDGET_SECONDS, so CI can fail a change
+that makes startup slower.
+"""
+
+import argparse
+import builtins
+import contextlib
+import os
+import sys
+import threading
+import time
+
+from component_loader import current_rss_mb
+
+_profiler = None
+
+
+class StartupProfiler:
+    """Records module-level imports of the profiled modules plus named phases"""
+
+    def __init__(self, modules=('__main__', 'app')):
+        self.modules = set(modules)
+        self.imports = []  # (module name, seconds, rss delta MB)
+        self.phases = []   # (component or None, name, seconds, rss delta MB)
+        self.started = time.perf_counter()
+        self.rss_start = current_rss_mb()
+        self._local = threading.local()
+        self._original_import = None
+
+    def install(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+        return self
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        # Only first-time imports written at module level of app.py; imports inside
+        # functions (component loaders) are charged to the component instead
+        caller = sys._getframe(1)
+        if (getattr(self._local, 'depth', 0) or level or name in sys.modules
+                or caller.f_code.co_name != '<module>'
+                or caller.f_globals.get('__name__') not in self.modules):
+            return original(name, globals, locals, fromlist, level)
+
+        self._local.depth = 1
+        rss_before = current_rss_mb()
+        started = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            self._local.depth = 0
+            self.imports.append((name, time.perf_counter() - started, _delta(rss_before)))
+
+    @contextlib.contextmanager
+    def phase(self, name, component=None):
+        rss_before = current_rss_mb()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((component, name, time.perf_counter() - started, _delta(rss_before)))
+
+    def report(self, components=None, budget=None):
+        """Print the table; returns the total startup time in seconds"""
+        total = time.perf_counter() - self.started
+        rss_end = current_rss_mb()
+        rows = []
+        accounted = 0.0
+        for name, seconds, rss in self.imports:
+            rows.append(('import', name, seconds, rss))
+            accounted += seconds
+        for name, component in (components.components.items() if components else []):
+            seconds = component.load_seconds or 0.0
+            rows.append(('component', f"{name} [{component.state}]", seconds, component.rss_delta_mb))
+            accounted += seconds
+            # Sub-phases (dataset build, network probes) are already part of the component time
+            for owner, phase_name, phase_seconds, phase_rss in self.phases:
+                if owner == name:
+                    rows.append(('', f"  └ {phase_name}", phase_seconds, phase_rss))
+        for owner, phase_name, seconds, rss in self.phases:
+            if owner is None:
+                rows.append(('phase', phase_name, seconds, rss))
+                accounted += seconds
+        rows.append(('other', 'app.py module body', max(0.0, total - accounted), None))
+
+        print("\n" + "=" * 72)
+        print("⏱️  AURA startup profile")
+        print("=" * 72)
+        print(f"{'kind':10s} {'phase':38s} {'seconds':>9s} {'RSS Δ MB':>10s}")
+        print("-" * 72)
+        for kind, name, seconds, rss in rows:
+            rss_text = f"{rss:+10.1f}" if rss is not None else f"{'-':>10s}"
+            print(f"{kind:10s} {name[:38]:38s} {seconds:9.3f} {rss_text}")
+        print("-" * 72)
+        rss_text = f"{rss_end:.1f} MB" if rss_end is not None else 'n/a'
+        print(f"{'total':10s} {'':38s} {total:9.3f}   RSS {rss_text}")
+        if budget is not None:
+            verdict = '✅ within' if total <= budget else '❌ over'
+            print(f"{verdict} startup budget of {budget:.2f}s")
+        print("=" * 72 + "\n")
+        return total
+
+
+def _delta(rss_before):
+    rss_after = current_rss_mb()
+    if rss_before is None or rss_after is None:
+        return None
+    return rss_after - rss_before
+
+
+def start(argv=None):
+    """Install the profiler; returns the parsed startup budget (None = no cap)"""
+    global _profiler
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--profile-startup', action='store_true')
+    parser.add_argument('--startup-budget', type=float,
+                        default=float(os.getenv('STARTUP_BUDGET_SECONDS', '0')) or None,
+                        help='Fail (exit 1) if startup takes longer than this many seconds')
+    args, _ = parser.parse_known_args(argv)
+    _profiler = StartupProfiler().install()
+    return args.startup_budget
+
+
+def active():
+    return _profiler is not None
+
+
+def phase(name, component=None):
+    """Time a block as a startup phase (no-op unless profiling)"""
+    if _profiler is None:
+        return contextlib.nullcontext()
+    return _profiler.phase(name, component)
+
+
+def finish(components=None, budget=None):
+    """Stop recording and print the report; returns True if within the budget"""
+    _profiler.uninstall()
+    total = _profiler.report(components, budget)
+    return budget is None or total <= budget
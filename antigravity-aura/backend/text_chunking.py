@@ -0,0 +1,72 @@
+"""
+Sentence Chunking Helpers
+Split text at sentence boundaries, either all at once or incrementally as
+streamed text arrives (used by streaming chat translation and streaming TTS).
+"""
+
+import re
+
+# Sentence end: ., ! or ? (optionally followed by closing quotes/brackets), then whitespace
+SENTENCE_BOUNDARY = re.compile(r'(?:(?<=[.!?])|(?<=[.!?]["\')\]]))\s+')
+
+
+def split_sentences(text, max_chars=None):
+    """
+    Split text into sentences (whitespace-trimmed, empties dropped).
+
+    If max_chars is set, consecutive short sentences are merged up to that length
+    (a single longer sentence is kept whole).
+    """
+    sentences = [s.strip() for s in SENTENCE_BOUNDARY.split(text) if s and s.strip()]
+    if not max_chars:
+        return sentences
+
+    merged = []
+    for sentence in sentences:
+        if merged and len(merged[-1]) + 1 + len(sentence) <= max_chars:
+            merged[-1] = merged[-1] + ' ' + sentence
+        else:
+            merged.append(sentence)
+    return merged
+
+
+def replace_sentences(text, sentences, replacements):
+    """
+    Rebuild text with each of its sentences (in order, as split from it) swapped
+    for its replacement, keeping the original whitespace (newlines) between them.
+    """
+    parts = []
+    position = 0
+    for sentence, replacement in zip(sentences, replacements):
+        start = text.find(sentence, position)
+        if start < 0:
+            # Not a substring (should not happen): fall back to a single space
+            parts.append(' ' + replacement if parts else replacement)
+            continue
+        parts.append(text[position:start] + replacement)
+        position = start + len(sentence)
+    parts.append(text[position:])
+    return ''.join(parts).strip()
+
+
+class SentenceBuffer:
+    """
+    Accumulates streamed text and releases only complete sentences.
+
+    feed(text) returns the sentences completed by this piece of text;
+    flush() returns whatever is left once the stream ends.
+    """
+
+    def __init__(self):
+        self._buffer = ''
+
+    def feed(self, text):
+        self._buffer += text
+        parts = SENTENCE_BOUNDARY.split(self._buffer)
+        # The last part has no boundary after it yet, so keep it buffered
+        self._buffer = parts.pop()
+        return [part.strip() for part in parts if part.strip()]
+
+    def flush(self):
+        remainder, self._buffer = self._buffer.strip(), ''
+        return [remainder] if remainder else []
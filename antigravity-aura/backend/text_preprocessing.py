@@ -0,0 +1,224 @@
+"""
+Text Preprocessing for the TF-IDF Chatbot
+Lowercase -> tokenize -> drop stopwords and non-alphanumeric tokens -> Porter stem.
+
+The pipeline is built once and shared: the stopword set is loaded once, stems are
+memoized in a bounded LRU cache, and tokenizing uses a regex tokenizer that yields
+the alphanumeric tokens nltk.word_tokenize would (the only tokens preprocessing
+keeps) without punkt sentence splitting and the ~30 Treebank regex passes.
+
+    python text_preprocessing.py --csv ../train_data.csv --column text   # benchmark
+"""
+
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+STEM_CACHE_SIZE = 50000
+
+# preprocess_batch() only starts worker processes for corpora at least this large
+PARALLEL_MIN_TEXTS = 5000
+
+_nltk = None
+
+
+def load_nltk():
+    """Import NLTK and download its data on first use rather than at import time"""
+    global _nltk
+    if _nltk is None:
+        import nltk
+
+        # Download required NLTK data
+        try:
+            nltk.data.find('tokenizers/punkt')
+        except LookupError:
+            nltk.download('punkt')
+
+        try:
+            nltk.data.find('corpora/stopwords')
+        except LookupError:
+            nltk.download('stopwords')
+
+        from nltk.corpus import stopwords
+        from nltk.tokenize import word_tokenize
+        from nltk.stem import PorterStemmer
+        _nltk = (stopwords, word_tokenize, PorterStemmer)
+    return _nltk
+
+
+# Sentence-final periods: punkt ends a sentence at a period followed by whitespace or
+# one of its closing characters, and Treebank then splits that period off the word
+# (as it does the text's last period, even before closing quotes)
+_SENTENCE_PERIOD = re.compile(r'(?<![.\s])\.(?=[?!)";}\]*:@\'({\[]|\s|[\])}>"\'»”’]*\s*$)')
+# Characters nltk.word_tokenize always splits off (brackets, quotes, ?!;@#$%&*, dashes, ellipses)
+_SPLIT_CHARS = re.compile('[?!;@#$%&*()\\[\\]{}<>"`«»“”‘’„‒-―]|--|\'\'|\\.{2,}')
+# Commas and colons are split off unless a digit follows (keeps "1,000" and "10:30" whole)
+_COMMA_COLON = re.compile(r'[:,](?!\d)')
+# Clitics Treebank splits from the end of a word ("can't" -> "ca n't", "it's" -> "it 's")
+_CLITIC = re.compile(r"(?<=[^' ])(?:n't|'s|'m|'d|'ll|'re|'ve|')$")
+# A leading quote is split off unless it starts a clitic ("'hello" -> "' hello")
+_LEADING_QUOTE = re.compile(r"^'(?!(?:re|ve|ll|m|t|s|d|n)\b)(?=\w)")
+# Whole-word contractions Treebank splits in two ("gonna" -> "gon na")
+_CONTRACTIONS = {
+    'cannot': ('can', 'not'),
+    'gimme': ('gim', 'me'),
+    'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'),
+    'lemme': ('lem', 'me'),
+    'wanna': ('wan', 'na'),
+}
+
+
+def regex_tokenize(text):
+    """
+    Alphanumeric tokens of text, as nltk.word_tokenize would split them.
+
+    Tokens word_tokenize keeps joined to punctuation ("o'clock", "well-being",
+    "1,000", "e.g.") are dropped, since preprocessing discards them anyway. Only
+    abbreviations punkt knows are handled differently: "dr. smith" keeps "dr."
+    (dropped) in punkt where this yields "dr".
+    """
+    text = _SENTENCE_PERIOD.sub(' ', text)
+    text = _COMMA_COLON.sub(' ', _SPLIT_CHARS.sub(' ', text))
+    tokens = []
+    for chunk in text.split():
+        if not chunk.isalnum():
+            chunk = _CLITIC.sub('', _LEADING_QUOTE.sub('', chunk))
+            if not chunk.isalnum():
+                continue
+        split = _CONTRACTIONS.get(chunk)
+        if split:
+            tokens.extend(split)
+        else:
+            tokens.append(chunk)
+    return tokens
+
+
+class TextPreprocessor:
+    """
+    Shared chatbot preprocessing pipeline.
+
+    Args:
+        stop_words: Set of words to drop (NLTK English stopwords by default)
+        stem: Stemming function (PorterStemmer().stem by default)
+        tokenizer: 'regex' (fast) or 'nltk' (nltk.word_tokenize)
+        stem_cache_size: Maximum number of memoized stems
+    """
+
+    def __init__(self, stop_words=None, stem=None, tokenizer='regex', stem_cache_size=STEM_CACHE_SIZE):
+        if stop_words is None or stem is None or tokenizer == 'nltk':
+            stopwords, word_tokenize, PorterStemmer = load_nltk()
+            if stop_words is None:
+                stop_words = stopwords.words('english')
+            if stem is None:
+                stem = PorterStemmer().stem
+        self.stop_words = frozenset(stop_words)
+        self.tokenizer = tokenizer
+        self.tokenize = word_tokenize if tokenizer == 'nltk' else regex_tokenize
+        self.stem_cache_size = stem_cache_size
+        self.stem_function = stem
+        self.stem = lru_cache(maxsize=stem_cache_size)(stem)
+
+    def preprocess(self, text):
+        """Preprocess text: lowercase, tokenize, remove stopwords, stem"""
+        if not isinstance(text, str):
+            return ""
+        stop_words = self.stop_words
+        stem = self.stem
+        return ' '.join(stem(token) for token in self.tokenize(text.lower())
+                        if token.isalnum() and token not in stop_words)
+
+    def preprocess_batch(self, texts, workers=None, chunksize=500):
+        """
+        Preprocess many texts, in order.
+
+        Corpora of PARALLEL_MIN_TEXTS or more are split across worker processes
+        (workers defaults to the CPU count); smaller ones run in this process.
+        """
+        texts = list(texts)
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(texts) < PARALLEL_MIN_TEXTS:
+            return [self.preprocess(text) for text in texts]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.stop_words, self.stem_function, self.tokenizer,
+                                           self.stem_cache_size)) as pool:
+            return list(pool.map(_preprocess_in_worker, texts, chunksize=chunksize))
+
+    def cache_info(self):
+        return self.stem.cache_info()
+
+
+_preprocessor = None
+_preprocessor_lock = threading.Lock()
+_worker_preprocessor = None
+
+
+def get_preprocessor():
+    """The process-wide TextPreprocessor (built on first use)"""
+    global _preprocessor
+    if _preprocessor is None:
+        with _preprocessor_lock:
+            if _preprocessor is None:
+                _preprocessor = TextPreprocessor()
+    return _preprocessor
+
+
+def _init_worker(stop_words, stem, tokenizer, stem_cache_size):
+    global _worker_preprocessor
+    _worker_preprocessor = TextPreprocessor(stop_words, stem, tokenizer, stem_cache_size)
+
+
+def _preprocess_in_worker(text):
+    return _worker_preprocessor.preprocess(text)
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    import time
+
+    parser = argparse.ArgumentParser(description='Benchmark chatbot text preprocessing')
+    parser.add_argument('--csv', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'train_data.csv'))
+    parser.add_argument('--column', default='text', help='CSV column with user text')
+    parser.add_argument('--intents', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'intents.json'))
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    import pandas as pd
+    texts = pd.read_csv(args.csv, usecols=[args.column])[args.column].dropna().astype(str).tolist()
+    if os.path.exists(args.intents):
+        with open(args.intents, 'r', encoding='utf-8') as f:
+            texts += [p for intent in json.load(f)['intents'] for p in intent['patterns']]
+    print(f"📊 {len(texts)} texts from {args.csv} ({args.column}) + intents")
+
+    stopwords, word_tokenize, PorterStemmer = load_nltk()
+    stemmer = PorterStemmer()
+
+    def current_path(text):
+        # preprocess_text before this module: per-call stopword set, word_tokenize, uncached stems
+        text = text.lower()
+        tokens = word_tokenize(text)
+        stop_words = set(stopwords.words('english'))
+        tokens = [stemmer.stem(word) for word in tokens if word.isalnum() and word not in stop_words]
+        return ' '.join(tokens)
+
+    def timed(label, fn):
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+        print(f"   {label:34s} {seconds:8.3f}s  {seconds / len(texts) * 1e6:9.1f} µs/text")
+        return result, seconds
+
+    expected, baseline = timed('current (nltk, per-call setup)', lambda: [current_path(t) for t in texts])
+    preprocessor = TextPreprocessor()
+    fast, fast_seconds = timed('TextPreprocessor (cold stem cache)', lambda: [preprocessor.preprocess(t) for t in texts])
+    timed('TextPreprocessor (warm stem cache)', lambda: [preprocessor.preprocess(t) for t in texts])
+    timed('preprocess_batch', lambda: TextPreprocessor().preprocess_batch(texts, workers=args.workers))
+
+    mismatches = [(t, e, f) for t, e, f in zip(texts, expected, fast) if e != f]
+    print(f"   speedup (cold): {baseline / fast_seconds:.1f}x, stem cache {preprocessor.cache_info()}")
+    print(f"   outputs identical to the current path: {len(texts) - len(mismatches)}/{len(texts)}")
+    for text, e, f in mismatches[:5]:
+        print(f"   ≠ {text[:60]!r}\n     nltk:  {e[:80]}\n     regex: {f[:80]}")
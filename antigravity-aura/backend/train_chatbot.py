@@ -1,47 +1,72 @@
 import json
-import pandas as pd
 import numpy as np
 import pickle
-import nltk
+import random
+import threading
+import uuid
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sparse_retrieval import SparseNeighborIndex
+from text_preprocessing import get_preprocessor
+import os
 import warnings
 warnings.filterwarnings('ignore')
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+# Which of an intent's responses to serve: 'first' (what the per-response rows always
+# returned, since identical pattern rows tie) or 'random'
+INTENT_RESPONSE = os.getenv('CHATBOT_INTENT_RESPONSE', 'first')
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+# Postings kept per term by the retrieval indexes (0 = exact search); only matters
+# once a mode has more than sparse_retrieval.BRUTE_FORCE_ROWS patterns
+DEFAULT_MAX_POSTINGS = int(os.getenv('CHATBOT_MAX_POSTINGS', '1000')) or None
 
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import PorterStemmer
+def merge_intent_rows(intents, intents_data, rows):
+    """
+    Merge (tag, pattern, response) rows into intents ({'tag', 'responses'}) and
+    unique patterns ({'pattern', 'intent_id'}), in place. Returns the newly added
+    pattern rows (each needs a row in intent_vectors).
+    """
+    intent_ids = {intent['tag']: intent_id for intent_id, intent in enumerate(intents)}
+    seen = {(item['intent_id'], item['pattern']) for item in intents_data}
+    added = []
+    for row in rows:
+        intent_id = intent_ids.get(row['tag'])
+        if intent_id is None:
+            intent_id = intent_ids[row['tag']] = len(intents)
+            intents.append({'tag': row['tag'], 'responses': []})
+        if row['response'] not in intents[intent_id]['responses']:
+            intents[intent_id]['responses'].append(row['response'])
+        if (intent_id, row['pattern']) not in seen:
+            seen.add((intent_id, row['pattern']))
+            item = {'pattern': row['pattern'], 'intent_id': intent_id}
+            intents_data.append(item)
+            added.append(item)
+    return added
 
 class MentalHealthChatbot:
-    def __init__(self):
+    def __init__(self, max_postings=DEFAULT_MAX_POSTINGS, intent_response=INTENT_RESPONSE):
         self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
-        self.stemmer = PorterStemmer()
-        self.intents_data = None
+        self.intents = None       # intent id -> {'tag', 'responses'}
+        self.intents_data = None  # unique patterns: {'pattern', 'intent_id'}, one row of intent_vectors each
         self.csv_data = None
         self.intent_vectors = None
         self.csv_vectors = None
+        # Retrieval indexes (sparse_retrieval.py), rebuilt after train()/load_model()
+        self.max_postings = max_postings
+        self.intent_response_strategy = intent_response
+        self.mode_index = {}    # mode -> SparseNeighborIndex over that mode's csv_vectors rows (ids = csv_data indices)
+        self.intent_index = None
+        # Incremental updates: add_examples() appends to <model_path>.delta.jsonl
+        self.model_path = None
+        self.model_id = None
+        self._delta_inode = None   # Identity of the delta file read so far (it is replaced
+        self._delta_header = None  # after a compact() elsewhere) and the bytes consumed
+        self._delta_offset = 0
+        self._update_lock = threading.Lock()
         
     def preprocess_text(self, text):
-        """Preprocess text: lowercase, tokenize, remove stopwords, stem"""
-        if not isinstance(text, str):
-            return ""
-        
-        text = text.lower()
-        tokens = word_tokenize(text)
-        stop_words = set(stopwords.words('english'))
-        tokens = [self.stemmer.stem(word) for word in tokens if word.isalnum() and word not in stop_words]
-        return ' '.join(tokens)
+        """Preprocess text: lowercase, tokenize, remove stopwords, stem (shared, memoized pipeline)"""
+        return get_preprocessor().preprocess(text)
     
     def load_intents(self, intents_path):
         """Load and process intents.json"""
@@ -49,21 +74,29 @@ class MentalHealthChatbot:
         with open(intents_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
+        self.intents = []
         self.intents_data = []
-        for intent in data['intents']:
-            for pattern in intent['patterns']:
-                for response in intent['responses']:
-                    self.intents_data.append({
-                        'tag': intent['tag'],
-                        'pattern': pattern,
-                        'response': response
-                    })
-        
-        print(f"Loaded {len(self.intents_data)} intent patterns")
+        merge_intent_rows(self.intents, self.intents_data, (
+            {'tag': intent['tag'], 'pattern': pattern, 'response': response}
+            for intent in data['intents']
+            for pattern in intent['patterns']
+            for response in intent['responses']
+        ))
+        
+        print(f"Loaded {len(self.intents_data)} intent patterns ({len(self.intents)} intents)")
         return self.intents_data
     
+    def intent_response(self, intent_id):
+        """Pick one of the intent's responses at serve time"""
+        responses = self.intents[intent_id]['responses']
+        if self.intent_response_strategy == 'random':
+            return random.choice(responses)
+        return responses[0]
+    
     def load_csv_data(self, csv_path):
         """Load and process CSV dataset"""
+        import pandas as pd
+        
         print("Loading CSV data...")
         df = pd.read_csv(csv_path, encoding='utf-8')
         
@@ -94,21 +127,199 @@ class MentalHealthChatbot:
         self.load_intents(intents_path)
         self.load_csv_data(csv_path)
         
-        # Prepare intent patterns
+        self.vectorize_all()
+        
+        print("\n=== Training Complete ===\n")
+        print(f"Total intent patterns: {len(self.intents_data)}")
+        print(f"Total CSV patterns: {len(self.csv_data)}")
+        print(f"Vocabulary size: {len(self.vectorizer.vocabulary_)}")
+    
+    def vectorize_all(self):
+        """Fit the vocabulary on the intent patterns and vectorize every intent and CSV row"""
         print("\nProcessing intent patterns...")
-        intent_patterns = [self.preprocess_text(item['pattern']) for item in self.intents_data]
-        self.intent_vectors = self.vectorizer.fit_transform(intent_patterns)
+        intent_patterns = get_preprocessor().preprocess_batch(item['pattern'] for item in self.intents_data)
+        # Fit with each pattern counted once per intent response, as the old pattern x
+        # response rows were, so the vocabulary and idf weights are unchanged
+        self.vectorizer.fit([pattern for item, pattern in zip(self.intents_data, intent_patterns)
+                             for _ in self.intents[item['intent_id']]['responses']])
+        self.intent_vectors = self.vectorizer.transform(intent_patterns)
         
-        # Prepare CSV patterns
         print("Processing CSV patterns...")
-        csv_patterns = [self.preprocess_text(item['input']) for item in self.csv_data]
-        self.csv_vectors = self.vectorizer.transform(csv_patterns)
+        csv_patterns = get_preprocessor().preprocess_batch(item['input'] for item in self.csv_data or [])
+        self.csv_vectors = self.vectorizer.transform(csv_patterns) if csv_patterns else None
+        self.build_retrieval_index()
+    
+    def build_retrieval_index(self, modes=None):
+        """
+        Build the nearest-neighbour indexes: one per CSV mode (a request only searches
+        its own mode) and one for intents. modes limits the rebuild to those CSV modes.
+        """
+        if modes is None and self.intent_vectors is not None:
+            self.intent_index = SparseNeighborIndex(self.intent_vectors, self.max_postings)
+        if not self.csv_data or self.csv_vectors is None:
+            self.mode_index = {}
+            return
+        all_modes = np.array([item['mode'] for item in self.csv_data])
+        mode_index = {} if modes is None else dict(self.mode_index)
+        for mode in (np.unique(all_modes) if modes is None else modes):
+            rows = np.flatnonzero(all_modes == mode)
+            mode_index[str(mode)] = SparseNeighborIndex(self.csv_vectors[rows], self.max_postings, ids=rows)
+        self.mode_index = mode_index  # Swapped in whole, so concurrent requests see old or new
+    
+    def top_csv_matches(self, input_vector, mode='friend', k=1, threshold=0.0):
+        """Top-k (csv_data index, similarity) pairs above threshold among rows of the given mode, best first"""
+        # Unknown mode: search every mode and merge
+        mode_index = self.mode_index
+        indexes = [mode_index[mode]] if mode in mode_index else list(mode_index.values())
+        matches = []
+        for index in indexes:
+            matches += index.search(input_vector, k, threshold)
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:k]
+    
+    def add_examples(self, examples, persist=True):
+        """
+        Add responses without retraining.
         
-        print("\n=== Training Complete ===\n")
-        print(f"Total intent patterns: {len(intent_patterns)}")
-        print(f"Total CSV patterns: {len(csv_patterns)}")
-        print(f"Vocabulary size: {len(self.vectorizer.vocabulary_)}")
+        examples: dicts with 'input', 'response' and 'mode' (CSV response bank) or
+        'tag', 'pattern' and 'response' (intents). They are vectorized with the
+        frozen vocabulary (fitted on intent patterns): words it lacks are ignored
+        until compact() refits it, which takes added intent patterns into account.
+        With persist=True (and a saved/loaded model) the examples are appended to
+        <model_path>.delta.jsonl, replayed by load_model() and picked up by other
+        processes serving the same model via refresh().
+        
+        Returns the number of examples added.
+        """
+        examples = [self._check_example(example) for example in examples]
+        if not examples:
+            return 0
+        if not persist or self.model_path is None:
+            with self._update_lock:
+                self._apply_examples(examples)
+            return len(examples)
         
+        header = not os.path.exists(self.delta_path)
+        lines = [json.dumps({'base': self.model_id})] if header else []
+        lines += [json.dumps(example, ensure_ascii=False) for example in examples]
+        # One O_APPEND write, so concurrent writers never interleave within a line
+        with open(self.delta_path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        self.refresh()
+        return len(examples)
+    
+    @property
+    def delta_path(self):
+        return f"{self.model_path}.delta.jsonl" if self.model_path else None
+    
+    def refresh(self):
+        """Apply delta examples appended since the last call (one stat() when there are none)"""
+        delta_path = self.delta_path
+        if delta_path is None:
+            return 0
+        try:
+            stat = os.stat(delta_path)
+        except OSError:
+            return 0
+        if stat.st_ino == self._delta_inode and stat.st_size == self._delta_offset:
+            return 0
+        
+        examples = []
+        with self._update_lock:
+            with open(delta_path, 'rb') as f:
+                header = f.readline()
+                if not header.endswith(b'\n'):
+                    return 0  # The writer is still appending the header
+                # Replaced (compact() and add_examples() elsewhere): the inode or the header
+                # (inode numbers can be reused) differs, so start over from the top
+                if (stat.st_ino != self._delta_inode or header != self._delta_header
+                        or stat.st_size < self._delta_offset):
+                    self._delta_inode, self._delta_header, self._delta_offset = stat.st_ino, header, 0
+                    if self._delta_foreign():
+                        print(f"⚠️ Ignoring {delta_path}: it was written for a different model")
+                if self._delta_foreign():
+                    self._delta_offset = stat.st_size
+                    return 0
+                start = max(self._delta_offset, len(header))
+                f.seek(start)
+                data = f.read()
+            # Only complete lines: a writer may still be appending the last one
+            end = data.rfind(b'\n') + 1
+            for line in data[:end].decode('utf-8', errors='replace').splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    examples.append(self._check_example(json.loads(line)))
+                except ValueError as e:
+                    print(f"⚠️ Skipping malformed line in {delta_path}: {e}")
+            if examples:
+                self._apply_examples(examples)
+            self._delta_offset = start + end
+        if examples:
+            print(f"✅ Added {len(examples)} chatbot examples from {delta_path}")
+        return len(examples)
+    
+    def _delta_foreign(self):
+        """The delta file read so far belongs to another base model (or has no valid header)"""
+        try:
+            return json.loads(self._delta_header).get('base') != self.model_id
+        except (ValueError, AttributeError):
+            return True
+    
+    def _reset_delta(self):
+        self._delta_inode, self._delta_header, self._delta_offset = None, None, 0
+    
+    def _check_example(self, example):
+        if not isinstance(example, dict):
+            raise ValueError("Each example must be a dict")
+        if {'input', 'response', 'mode'} <= set(example):
+            return {'input': example['input'], 'response': example['response'], 'mode': example['mode']}
+        if {'tag', 'pattern', 'response'} <= set(example):
+            return {'tag': example['tag'], 'pattern': example['pattern'], 'response': example['response']}
+        raise ValueError("Examples need 'input', 'response' and 'mode', or 'tag', 'pattern' and 'response'")
+    
+    def _apply_examples(self, examples):
+        """Vectorize examples with the frozen vocabulary and append them (caller holds _update_lock)"""
+        preprocessor = get_preprocessor()
+        csv_rows = [example for example in examples if 'input' in example]
+        intent_rows = [example for example in examples if 'pattern' in example]
+        
+        analyzer = self.vectorizer.build_analyzer()
+        unknown = set()
+        
+        if intent_rows:
+            # Responses of known patterns only extend their intent's response list
+            intents = [dict(intent, responses=list(intent['responses'])) for intent in self.intents or []]
+            intents_data = list(self.intents_data or [])
+            new_patterns = merge_intent_rows(intents, intents_data, intent_rows)
+            if new_patterns:
+                patterns = preprocessor.preprocess_batch(item['pattern'] for item in new_patterns)
+                unknown.update(term for pattern in patterns for term in analyzer(pattern) if term not in self.vectorizer.vocabulary_)
+                vectors = self.vectorizer.transform(patterns)
+            # Rows are appended before the index that can return them is swapped in
+            self.intents = intents
+            self.intents_data = intents_data
+            if new_patterns:
+                self.intent_vectors = vectors if self.intent_vectors is None else sparse.vstack([self.intent_vectors, vectors]).tocsr()
+                self.intent_index = SparseNeighborIndex(self.intent_vectors, self.max_postings)
+        
+        if csv_rows:
+            inputs = preprocessor.preprocess_batch(example['input'] for example in csv_rows)
+            unknown.update(term for text in inputs for term in analyzer(text) if term not in self.vectorizer.vocabulary_)
+            vectors = self.vectorizer.transform(inputs)
+            self.csv_data = (self.csv_data or []) + csv_rows
+            self.csv_vectors = vectors if self.csv_vectors is None else sparse.vstack([self.csv_vectors, vectors]).tocsr()
+            self.build_retrieval_index(modes={example['mode'] for example in csv_rows})
+        
+        if unknown:
+            print(f"ℹ️ {len(unknown)} terms are not in the vocabulary (fitted on intent patterns; compact() refits it)")
+    
+    def compact(self, model_path=None):
+        """Refit the vocabulary over everything (including added examples) and save a new base model"""
+        with self._update_lock:
+            self.vectorize_all()
+        self.save_model(model_path or self.model_path)
+    
     def get_response(self, user_input, mode='friend', threshold=0.3):
         """Get chatbot response for user input"""
         if not user_input or not user_input.strip():
@@ -118,41 +329,33 @@ class MentalHealthChatbot:
         processed_input = self.preprocess_text(user_input)
         input_vector = self.vectorizer.transform([processed_input])
         
-        # Check CSV data first (more specific mental health responses)
-        if self.csv_data:
-            csv_similarities = cosine_similarity(input_vector, self.csv_vectors)[0]
-            max_csv_idx = np.argmax(csv_similarities)
-            max_csv_sim = csv_similarities[max_csv_idx]
-            
-            if max_csv_sim > threshold:
-                # Filter by mode
-                matching_responses = [item for item in self.csv_data 
-                                    if item['mode'] == mode and 
-                                    self.csv_data.index(item) == max_csv_idx]
-                
-                if matching_responses:
-                    return matching_responses[0]['response'].strip('"')
-                else:
-                    # If no match for specified mode, return the best match
-                    return self.csv_data[max_csv_idx]['response'].strip('"')
+        # Check CSV data first (more specific mental health responses), scoring only this mode's rows
+        if self.csv_data and self.csv_vectors is not None:
+            if not self.mode_index:
+                self.build_retrieval_index()
+            matches = self.top_csv_matches(input_vector, mode, k=1, threshold=threshold)
+            if matches:
+                return self.csv_data[matches[0][0]]['response'].strip('"')
         
         # Check intents data
-        if self.intents_data:
-            intent_similarities = cosine_similarity(input_vector, self.intent_vectors)[0]
-            max_intent_idx = np.argmax(intent_similarities)
-            max_intent_sim = intent_similarities[max_intent_idx]
-            
-            if max_intent_sim > threshold:
-                return self.intents_data[max_intent_idx]['response']
+        if self.intents_data and self.intent_vectors is not None:
+            if self.intent_index is None:
+                self.build_retrieval_index()
+            matches = self.intent_index.search(input_vector, k=1, threshold=threshold)
+            if matches:
+                return self.intent_response(self.intents_data[matches[0][0]]['intent_id'])
         
         # Default response if no good match
         return "I understand you're going through something. Can you tell me more about how you're feeling?"
     
     def save_model(self, model_path='chatbot_model.pkl'):
-        """Save trained model"""
+        """Save trained model (it includes all added examples, so the delta file is removed)"""
         print(f"\nSaving model to {model_path}...")
+        model_id = uuid.uuid4().hex
         model_data = {
+            'model_id': model_id,
             'vectorizer': self.vectorizer,
+            'intents': self.intents,
             'intents_data': self.intents_data,
             'csv_data': self.csv_data,
             'intent_vectors': self.intent_vectors,
@@ -160,8 +363,22 @@ class MentalHealthChatbot:
         }
         with open(model_path, 'wb') as f:
             pickle.dump(model_data, f)
+        self.model_path, self.model_id = model_path, model_id
+        self._reset_delta()
+        if os.path.exists(self.delta_path):
+            os.remove(self.delta_path)
         print("Model saved successfully!")
     
+    def _load_legacy_intents(self, rows, vectors):
+        """Older models stored one row (and vector) per pattern x response: keep unique patterns"""
+        self.intents, self.intents_data = [], []
+        if rows is None:
+            self.intents_data, self.intent_vectors = None, vectors
+            return
+        keep = [i for i, row in enumerate(rows) if merge_intent_rows(self.intents, self.intents_data, [row])]
+        self.intent_vectors = vectors[keep] if vectors is not None else None
+        print(f"   Deduplicated {len(rows)} intent rows to {len(keep)} unique patterns")
+    
     def load_model(self, model_path='chatbot_model.pkl'):
         """Load trained model"""
         print(f"Loading model from {model_path}...")
@@ -169,11 +386,20 @@ class MentalHealthChatbot:
             model_data = pickle.load(f)
         
         self.vectorizer = model_data['vectorizer']
-        self.intents_data = model_data['intents_data']
         self.csv_data = model_data['csv_data']
-        self.intent_vectors = model_data['intent_vectors']
+        if 'intents' in model_data:
+            self.intents = model_data['intents']
+            self.intents_data = model_data['intents_data']
+            self.intent_vectors = model_data['intent_vectors']
+        else:
+            self._load_legacy_intents(model_data['intents_data'], model_data['intent_vectors'])
         self.csv_vectors = model_data['csv_vectors']
+        self.model_path, self.model_id = model_path, model_data.get('model_id')
+        self._reset_delta()
+        self.build_retrieval_index()
         print("Model loaded successfully!")
+        # Examples added since the model was saved
+        self.refresh()
 
 if __name__ == "__main__":
     # Initialize chatbot
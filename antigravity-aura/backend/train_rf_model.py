@@ -21,6 +21,7 @@ detector.train(csv_path, test_size=0.1, val_size=0.1)
 # Save model
 model_path = 'distress_detector_v2_random_forest.pkl'
 detector.save_model(model_path)
+detector.save_artifact('distress_detector_v2_random_forest.model', source=model_path)
 
-print(f"\n✅ Model saved to: {model_path}")
+print(f"\n✅ Model saved to: {model_path} (+ memory-mappable .model artifact)")
 print("=" * 80)
@@ -16,8 +16,7 @@ print(f"Loading intents from: {intents_path}")
 chatbot.load_intents(intents_path)
 
 # Process intent patterns
-intent_patterns = [chatbot.preprocess_text(item['pattern']) for item in chatbot.intents_data]
-chatbot.intent_vectors = chatbot.vectorizer.fit_transform(intent_patterns)
+chatbot.vectorize_all()
 
 print(f"Loaded {len(chatbot.intents_data)} intent patterns")
 
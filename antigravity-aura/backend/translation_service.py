@@ -0,0 +1,313 @@
+"""
+Translation Service
+Persistent, batched translation layer used for non-English chat responses.
+
+- SQLite cache keyed by (sha256 of text, target language code)
+- Pluggable backends: Google Translate (pooled deep-translator instances)
+  or a local fake backend for offline tests and benchmarks
+- Batch API that only sends cache misses to the backend
+"""
+
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# Language name -> Google Translate code
+LANGUAGE_CODES = {
+    'hindi': 'hi',
+    'tamil': 'ta',
+    'telugu': 'te',
+    'marathi': 'mr',
+    'bengali': 'bn',
+    'gujarati': 'gu',
+    'kannada': 'kn',
+    'malayalam': 'ml',
+    'punjabi': 'pa',
+    'urdu': 'ur',
+    'odia': 'or',
+    'assamese': 'as',
+    'spanish': 'es',
+    'french': 'fr',
+    'german': 'de',
+    'portuguese': 'pt',
+    'russian': 'ru',
+    'japanese': 'ja',
+    'korean': 'ko',
+    'chinese': 'zh-CN',
+    'arabic': 'ar',
+    'turkish': 'tr',
+    'vietnamese': 'vi',
+    'thai': 'th',
+    'indonesian': 'id',
+    'dutch': 'nl',
+    'italian': 'it',
+    'polish': 'pl',
+    'ukrainian': 'uk',
+    'persian': 'fa'
+}
+
+
+def language_code(target_language):
+    """Map a language name (e.g. 'Hindi') or code (e.g. 'hi') to a translator code, or None"""
+    key = target_language.strip().lower()
+    if key in LANGUAGE_CODES:
+        return LANGUAGE_CODES[key]
+    codes = {code.lower(): code for code in LANGUAGE_CODES.values()}
+    return codes.get(key)
+
+
+class TranslatorBackend:
+    """Backend interface: translate many English strings into one target language"""
+
+    name = 'base'
+
+    def translate_batch(self, texts, target_code):
+        raise NotImplementedError
+
+
+class GoogleTranslateBackend(TranslatorBackend):
+    """deep-translator GoogleTranslator, with instances pooled per target language"""
+
+    name = 'google'
+
+    def __init__(self, source='en', pool_size=4):
+        from deep_translator import GoogleTranslator
+        self._translator_cls = GoogleTranslator
+        self.source = source
+        self.pool_size = pool_size
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, target_code):
+        with self._lock:
+            pool = self._pools.get(target_code)
+            if pool is None:
+                pool = queue.LifoQueue(maxsize=self.pool_size)
+                self._pools[target_code] = pool
+            return pool
+
+    def translate_batch(self, texts, target_code):
+        pool = self._pool(target_code)
+        try:
+            translator = pool.get_nowait()
+        except queue.Empty:
+            translator = self._translator_cls(source=self.source, target=target_code)
+        try:
+            if len(texts) == 1:
+                return [translator.translate(texts[0])]
+            return translator.translate_batch(list(texts))
+        finally:
+            try:
+                pool.put_nowait(translator)
+            except queue.Full:
+                pass
+
+
+class FakeTranslatorBackend(TranslatorBackend):
+    """Offline backend: tags text with the target code, optionally simulating network latency"""
+
+    name = 'fake'
+
+    def __init__(self, latency_ms=0.0):
+        self.latency = latency_ms / 1000.0
+        self.calls = 0
+
+    def translate_batch(self, texts, target_code):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [f"[{target_code}] {text}" for text in texts]
+
+
+class TranslationCache:
+    """On-disk SQLite cache of translations (safe to share between threads and processes)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = self._connect()
+        with self._lock:
+            if path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS translations ('
+                ' text_hash TEXT NOT NULL,'
+                ' target TEXT NOT NULL,'
+                ' translated TEXT NOT NULL,'
+                ' created_at REAL NOT NULL,'
+                ' PRIMARY KEY (text_hash, target))'
+            )
+            self._conn.commit()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+
+    def reopen(self):
+        """Open a fresh connection (call in a forked child; connections must not cross fork)"""
+        # Keep the inherited connection referenced: closing it in the child could
+        # checkpoint/unlink the WAL the parent is still using
+        self._inherited_conn = self._conn
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+
+    @staticmethod
+    def text_hash(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get_many(self, hashes, target_code):
+        """Return {text_hash: translated} for the hashes that are cached"""
+        found = {}
+        hashes = list(hashes)
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f'SELECT text_hash, translated FROM translations WHERE target = ? AND text_hash IN ({placeholders})',
+                    [target_code] + chunk
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def put_many(self, items, target_code):
+        """Store (text_hash, translated) pairs"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO translations (text_hash, target, translated, created_at) VALUES (?, ?, ?, ?)',
+                [(text_hash, target_code, translated, now) for text_hash, translated in items]
+            )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM translations').fetchone()[0]
+
+
+class TranslationService:
+    """Cached, batched translation from English into a target language"""
+
+    def __init__(self, backend, cache=None):
+        self.backend = backend
+        self.cache = cache
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.backend_calls = 0
+        self.errors = 0
+
+    def translate(self, text, target_language):
+        """Translate one string; returns the original text if translation is unavailable"""
+        return self.translate_batch([text], target_language)[0]
+
+    def translate_batch(self, texts, target_language):
+        """
+        Translate many strings at once.
+
+        Cached strings are served from disk; the remaining unique strings go to the
+        backend in a single call. On backend failure, untranslated strings are
+        returned unchanged and nothing is cached.
+        """
+        texts = list(texts)
+        code = language_code(target_language)
+        if not texts or code is None or code == 'en':
+            return texts
+
+        hashes = [TranslationCache.text_hash(text) for text in texts]
+        cached = self.cache.get_many(set(hashes), code) if self.cache is not None else {}
+
+        missing = {}
+        for text, text_hash in zip(texts, hashes):
+            if text_hash not in cached and text_hash not in missing and text.strip():
+                missing[text_hash] = text
+
+        with self._lock:
+            self.hits += sum(1 for text_hash in hashes if text_hash in cached)
+            self.misses += len(missing)
+
+        if missing:
+            try:
+                with self._lock:
+                    self.backend_calls += 1
+                translated = self.backend.translate_batch(list(missing.values()), code)
+                fresh = [(text_hash, result) for text_hash, result in zip(missing.keys(), translated)
+                         if result]
+                cached.update(fresh)
+                if self.cache is not None and fresh:
+                    self.cache.put_many(fresh, code)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                print(f"⚠️ Translation error ({self.backend.name}): {e}")
+
+        return [cached.get(text_hash, text) for text, text_hash in zip(texts, hashes)]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': self.backend.name,
+                'cached_translations': len(self.cache) if self.cache is not None else 0,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'backend_calls': self.backend_calls,
+                'errors': self.errors,
+            }
+
+
+def create_translation_service(backend_name=None, cache_path=None):
+    """Build the service from TRANSLATION_BACKEND / TRANSLATION_CACHE_PATH (google + on-disk cache by default)"""
+    backend_name = (backend_name or os.getenv('TRANSLATION_BACKEND', 'google')).lower()
+    if cache_path is None:
+        cache_path = os.getenv(
+            'TRANSLATION_CACHE_PATH',
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'translation_cache.sqlite3')
+        )
+
+    if backend_name == 'fake':
+        backend = FakeTranslatorBackend()
+    elif backend_name == 'google':
+        backend = GoogleTranslateBackend()
+    else:
+        raise ValueError(f"Unknown translation backend: {backend_name}")
+
+    return TranslationService(backend, TranslationCache(cache_path))
+
+
+if __name__ == '__main__':
+    # Offline benchmark: fake backend with simulated network latency
+    import tempfile
+
+    sentences = [f"Thank you for sharing this with me, message number {i}." for i in range(200)]
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = FakeTranslatorBackend(latency_ms=150)
+        service = TranslationService(backend, TranslationCache(os.path.join(tmp, 'bench.sqlite3')))
+
+        print("📊 Translation benchmark (fake backend, 150ms simulated round trip)\n")
+
+        start = time.perf_counter()
+        for sentence in sentences[:20]:
+            service.translate(sentence, 'Hindi')
+        cold_single = (time.perf_counter() - start) / 20 * 1000
+        print(f"   Cold, one call per string:  {cold_single:8.2f} ms/string")
+
+        start = time.perf_counter()
+        service.translate_batch(sentences[20:], 'Hindi')
+        cold_batch = (time.perf_counter() - start) / len(sentences[20:]) * 1000
+        print(f"   Cold, batched:              {cold_batch:8.2f} ms/string")
+
+        start = time.perf_counter()
+        for sentence in sentences:
+            service.translate(sentence, 'Hindi')
+        warm = (time.perf_counter() - start) / len(sentences) * 1000
+        print(f"   Warm (SQLite cache hits):   {warm:8.2f} ms/string")
+
+        print(f"\n   Backend calls: {backend.calls}")
+        print(f"   Stats: {service.stats()}")
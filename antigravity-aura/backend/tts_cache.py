@@ -0,0 +1,136 @@
+"""
+Text-to-Speech Audio Cache
+Content-addressed, disk-backed MP3 cache for /api/tts.
+
+Files are named by sha256(language + text), so the hash doubles as a strong
+ETag, and served straight from disk (send_file -> sendfile where supported).
+Total size is bounded with least-recently-used eviction.
+
+The directory itself is the index: a hit refreshes the file's mtime and
+eviction scans the directory, so pre-forked workers sharing it agree on what
+is cached and the size limit holds for all of them together.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+
+
+class TTSCache:
+    """Disk cache of synthesized speech, keyed by hash of language and text"""
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._evict()
+
+    @staticmethod
+    def make_key(text, language):
+        return hashlib.sha256(f"{language}\0{text}".encode('utf-8')).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def get(self, text, language):
+        """Return (key, path) if cached, else None"""
+        key = self.make_key(text, language)
+        path = self.path_for(key)
+        try:
+            # Marks the file most recently used; fails if it was never written or was
+            # evicted (possibly by another worker sharing the directory)
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return key, path
+
+    def get_or_create(self, text, language, synthesize):
+        """
+        Return (key, path, cached) for the audio, synthesizing it on a miss.
+
+        synthesize(fp) must write MP3 bytes to the binary file object fp.
+        Concurrent misses for the same key synthesize only once.
+        """
+        cached = self.get(text, language)
+        if cached:
+            return cached[0], cached[1], True
+
+        key = self.make_key(text, language)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            if os.path.exists(self.path_for(key)):
+                return key, self.path_for(key), True
+
+            # Write to a temp file first so readers never see partial audio
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as fp:
+                    synthesize(fp)
+                os.replace(tmp_path, self.path_for(key))
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+            with self._lock:
+                self._key_locks.pop(key, None)
+            self._evict(keep=key)
+        return key, self.path_for(key), False
+
+    def _scan(self):
+        """(mtime, key, size) of every cached file, least recently used first"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.mp3'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue  # Evicted by another worker meanwhile
+            entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        entries.sort()
+        return entries
+
+    def _evict(self, keep=None):
+        """Delete least recently used files until the directory is under max_bytes"""
+        entries = self._scan()
+        total = sum(size for _, _, size in entries)
+        for _, key, size in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue  # The file just written is about to be served
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                continue  # Already removed by another worker
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self):
+        entries = self._scan()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(entries),
+                'bytes': sum(size for _, _, size in entries),
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+            }
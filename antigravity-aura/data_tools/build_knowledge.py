@@ -5,14 +5,26 @@ Produces a JSONL file where each line is a document chunk with metadata.
 Usage:
   python build_knowledge.py --csv ../train_data.csv --out knowledge.jsonl
 
+Large exports are streamed: the CSV is read --rows_per_chunk rows at a time (only the
+needed columns), chunks are split and serialized on --workers processes, and the
+output is written in input order with at most a few chunks in memory. An output
+path ending in .gz is gzip-compressed. Progress is reported in rows per second:
+  python build_knowledge.py --csv export.csv --out knowledge.jsonl.gz --rows_per_chunk 50000 --workers 4
+  python build_knowledge.py --csv export.csv --out knowledge.jsonl --metadata_columns sentiment confidence
+
 Optional embedding (requires sentence-transformers and faiss):
   python build_knowledge.py --csv ../train_data.csv --out knowledge.jsonl --embed --model all-MiniLM-L6-v2 --index_out ./embeddings
 """
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import argparse
+import gzip
 import json
+import os
 import re
-from typing import List
+import time
+from typing import List, Optional
 
 import pandas as pd
 
@@ -54,27 +66,87 @@ def chunk_text(text: str, chunk_size: int = 800, min_chunk: int = 200) -> List[s
     return chunks
 
 
-def build_jsonl(csv_path: Path, out_path: Path, chunk_size: int = 800):
-    df = pd.read_csv(csv_path)
+# columns every document needs besides its metadata
+DOC_COLUMNS = ("text", "post_id", "id", "subreddit", "label")
+
+
+def chunk_documents(rows, chunk_size: int = 800) -> str:
+    """JSONL lines for a list of row dicts (runs in the worker processes)."""
+    lines = []
+    for row in rows:
+        text = str(row.get("text", ""))
+        chunks = chunk_text(text, chunk_size=chunk_size)
+        for i, ch in enumerate(chunks):
+            doc = {
+                "doc_id": f"{row.get('post_id')}_{row.get('id')}_{i}",
+                "post_id": row.get("post_id"),
+                "subreddit": row.get("subreddit"),
+                "label": int(row.get("label")) if pd.notnull(row.get("label")) else None,
+                "chunk_index": i,
+                "text": ch,
+                "metadata": {k: v for k, v in row.items() if k != "text"},
+            }
+            lines.append(json.dumps(doc) + "\n")
+    return "".join(lines)
+
+
+def _chunk_lines(frame: "pd.DataFrame", chunk_size: int):
+    return len(frame), chunk_documents(frame.to_dict("records"), chunk_size)
+
+
+def select_columns(csv_path: Path, metadata_columns: Optional[List[str]] = None) -> List[str]:
+    """Columns to read: the document fields plus metadata (all columns by default)."""
+    header = list(pd.read_csv(csv_path, nrows=0).columns)
+    if metadata_columns is None:
+        return header
+    missing = [c for c in metadata_columns if c not in header]
+    if missing:
+        raise ValueError(f"Columns not in {csv_path}: {', '.join(missing)}")
+    wanted = set(DOC_COLUMNS) | set(metadata_columns)
+    return [c for c in header if c in wanted]
+
+
+def open_output(out_path: Path):
+    if out_path.suffix == ".gz":
+        return gzip.open(out_path, "wt", encoding="utf-8")
+    return out_path.open("w", encoding="utf-8")
+
+
+def build_jsonl(csv_path: Path, out_path: Path, chunk_size: int = 800, rows_per_chunk: int = 20000,
+                workers: Optional[int] = None, metadata_columns: Optional[List[str]] = None):
+    workers = workers or os.cpu_count() or 1
+    usecols = select_columns(csv_path, metadata_columns)
+    reader = pd.read_csv(csv_path, usecols=usecols, chunksize=rows_per_chunk)
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with out_path.open("w", encoding="utf-8") as out_f:
-        for idx, row in df.iterrows():
-            text = str(row.get("text", ""))
-            chunks = chunk_text(text, chunk_size=chunk_size)
-            for i, ch in enumerate(chunks):
-                doc = {
-                    "doc_id": f"{row.get('post_id')}_{row.get('id')}_{i}",
-                    "post_id": row.get("post_id"),
-                    "subreddit": row.get("subreddit"),
-                    "label": int(row.get("label")) if pd.notnull(row.get("label")) else None,
-                    "chunk_index": i,
-                    "text": ch,
-                    "metadata": {k: v for k, v in row.items() if k != "text"},
-                }
-                out_f.write(json.dumps(doc) + "\n")
-
-    print(f"Wrote knowledge JSONL to {out_path}")
+    start = time.perf_counter()
+    rows = 0
+
+    def write(out_f, n_rows: int, text: str):
+        nonlocal rows
+        out_f.write(text)
+        rows += n_rows
+        elapsed = time.perf_counter() - start
+        print(f"  {rows:,} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)", flush=True)
+
+    with open_output(out_path) as out_f:
+        if workers == 1:
+            for frame in reader:
+                write(out_f, *_chunk_lines(frame, chunk_size))
+        else:
+            # Bounded, ordered fan-out: at most 2 chunks per worker read ahead of the writer
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for frame in reader:
+                    pending.append(pool.submit(_chunk_lines, frame, chunk_size))
+                    if len(pending) >= 2 * workers:
+                        write(out_f, *pending.popleft().result())
+                while pending:
+                    write(out_f, *pending.popleft().result())
+
+    elapsed = time.perf_counter() - start
+    print(f"Wrote knowledge JSONL to {out_path} ({rows:,} rows, {rows / max(elapsed, 1e-9):,.0f} rows/s, "
+          f"{workers} worker{'s' if workers != 1 else ''})")
 
 
 def main():
@@ -82,8 +154,13 @@ def main():
     p.add_argument("--csv", required=True, type=Path)
     p.add_argument("--out", default=Path("knowledge.jsonl"), type=Path)
     p.add_argument("--chunk_size", type=int, default=800)
+    p.add_argument("--rows_per_chunk", type=int, default=20000, help="CSV rows read and processed per chunk")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    p.add_argument("--metadata_columns", nargs="+", default=None,
+                   help="Row metadata to keep (default: every column)")
     args = p.parse_args()
-    build_jsonl(args.csv, args.out, chunk_size=args.chunk_size)
+    build_jsonl(args.csv, args.out, chunk_size=args.chunk_size, rows_per_chunk=args.rows_per_chunk,
+                workers=args.workers, metadata_columns=args.metadata_columns)
 
 
 if __name__ == "__main__":
@@ -4,10 +4,22 @@ Requirements (optional): sentence-transformers, faiss-cpu, numpy
 
 Usage:
   python create_embeddings.py --knowledge knowledge.jsonl --model all-MiniLM-L6-v2 --index_out ./embeddings
+  python create_embeddings.py --knowledge knowledge.jsonl --index_type hnsw --hnsw_m 32 --ef_search 64
+
+Index types (--index_type):
+  flat      exact brute-force search (IndexFlatL2); cost grows linearly with the corpus
+  ivf_flat  inverted lists over k-means cells; searches --nprobe of --nlist cells
+  hnsw      graph index (--hnsw_m links per node, --ef_construction / --ef_search beam widths)
+  ivf_pq    IVF with product-quantized vectors (--pq_m sub-vectors of --pq_bits bits): smallest index
+
+Benchmark every index type against exact search over the saved embeddings.npy:
+  python create_embeddings.py --benchmark --index_out ./embeddings --k 10
 """
 from pathlib import Path
 import argparse
+import gzip
 import json
+import time
 
 try:
     from sentence_transformers import SentenceTransformer
@@ -21,16 +33,92 @@ except Exception:
 
 import numpy as np
 
+from doc_store import write_doc_store
+
 
 def load_knowledge(kl_path: Path):
     docs = []
-    with kl_path.open("r", encoding="utf-8") as f:
+    opener = gzip.open if kl_path.suffix == ".gz" else open
+    with opener(kl_path, "rt", encoding="utf-8") as f:
         for line in f:
             docs.append(json.loads(line))
     return docs
 
 
-def create_index(docs, model_name: str, out_dir: Path):
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+
+DEFAULT_INDEX_PARAMS = {
+    "nlist": None,  # IVF cells; None = about 4 * sqrt(rows)
+    "nprobe": 16,
+    "hnsw_m": 32,
+    "ef_construction": 200,
+    "ef_search": 64,
+    "pq_m": 16,  # must divide the embedding dimension
+    "pq_bits": 8,
+}
+
+
+def default_nlist(n_rows: int) -> int:
+    # faiss wants ~39 training points per k-means centroid
+    return max(1, min(int(4 * np.sqrt(n_rows)), n_rows // 39))
+
+
+# tuning parameters that apply to each index type
+TYPE_PARAMS = {
+    "flat": (),
+    "ivf_flat": ("nlist", "nprobe"),
+    "hnsw": ("hnsw_m", "ef_construction", "ef_search"),
+    "ivf_pq": ("nlist", "nprobe", "pq_m", "pq_bits"),
+}
+
+
+def resolve_params(index_type: str, n_rows: int, **params) -> dict:
+    """Tuning parameters an index of this type is built with (defaults filled in)."""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type {index_type!r}; choose from {', '.join(INDEX_TYPES)}")
+    params = {**DEFAULT_INDEX_PARAMS, **{k: v for k, v in params.items() if v is not None}}
+    if params["nlist"] is None:
+        params["nlist"] = default_nlist(n_rows)
+    params["nprobe"] = min(params["nprobe"], params["nlist"])
+    return {name: params[name] for name in TYPE_PARAMS[index_type]}
+
+
+def build_index(embeddings: np.ndarray, index_type: str = "flat", **params):
+    """Train (if needed) and fill an index of the given type; search parameters are set on it."""
+    if faiss is None:
+        raise RuntimeError("faiss-cpu not installed. Install it to build an index.")
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    n_rows, dim = embeddings.shape
+    params = resolve_params(index_type, n_rows, **params)
+
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, params["hnsw_m"])
+        index.hnsw.efConstruction = params["ef_construction"]
+        index.hnsw.efSearch = params["ef_search"]
+    else:
+        quantizer = faiss.IndexFlatL2(dim)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dim, params["nlist"])
+        else:
+            if dim % params["pq_m"]:
+                raise ValueError(f"pq_m={params['pq_m']} must divide the embedding dimension {dim}")
+            if n_rows < 2 ** params["pq_bits"]:
+                raise ValueError(f"ivf_pq with pq_bits={params['pq_bits']} needs at least {2 ** params['pq_bits']} rows to train")
+            index = faiss.IndexIVFPQ(quantizer, dim, params["nlist"], params["pq_m"], params["pq_bits"])
+        index.train(embeddings)
+        index.nprobe = params["nprobe"]
+
+    index.add(embeddings)
+    return index
+
+
+def index_size_bytes(index) -> int:
+    return int(faiss.serialize_index(index).size)
+
+
+def create_index(docs, model_name: str, out_dir: Path, index_type: str = "flat", **params):
     if SentenceTransformer is None:
         raise RuntimeError("sentence-transformers not installed. Install it to create embeddings.")
     if faiss is None:
@@ -40,31 +128,126 @@ def create_index(docs, model_name: str, out_dir: Path):
     texts = [d["text"] for d in docs]
     embeddings = model.encode(texts, show_progress_bar=True, convert_to_numpy=True)
 
-    dim = embeddings.shape[1]
-    index = faiss.IndexFlatL2(dim)
-    index.add(embeddings)
+    start = time.perf_counter()
+    index = build_index(embeddings, index_type, **params)
+    print(f"Built {index_type} index over {index.ntotal} vectors in {time.perf_counter() - start:.2f}s")
 
     out_dir.mkdir(parents=True, exist_ok=True)
     faiss.write_index(index, str(out_dir / "index.faiss"))
+    with (out_dir / "index_config.json").open("w", encoding="utf-8") as f:
+        json.dump({"model": model_name, "index_type": index_type,
+                   **resolve_params(index_type, len(embeddings), **params)}, f, indent=2)
     # save metadata
     with (out_dir / "metadata.jsonl").open("w", encoding="utf-8") as f:
         for d in docs:
             f.write(json.dumps({"doc_id": d["doc_id"], "post_id": d.get("post_id"), "subreddit": d.get("subreddit"), "label": d.get("label")}) + "\n")
 
+    # full documents by row id, for hit lookups without parsing metadata.jsonl
+    write_doc_store(docs, out_dir)
+
     # also save embeddings matrix for potential re-use
     np.save(out_dir / "embeddings.npy", embeddings)
     print(f"Wrote FAISS index and metadata to {out_dir}")
 
 
+def percentile_ms(seconds, q: float) -> float:
+    return float(np.percentile(seconds, q) * 1000) if len(seconds) else 0.0
+
+
+def benchmark(embeddings: np.ndarray, index_types=INDEX_TYPES, k: int = 10, n_queries: int = 500,
+              seed: int = 0, **params):
+    """Recall@k, latency, build time and size of each index type.
+
+    n_queries rows are held out of the index and used as queries; ground truth is
+    exact search over the remaining rows.
+    """
+    if faiss is None:
+        raise RuntimeError("faiss-cpu not installed")
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(embeddings))
+    n_queries = min(n_queries, len(embeddings) // 5)
+    queries, base = embeddings[order[:n_queries]], embeddings[order[n_queries:]]
+
+    exact = faiss.IndexFlatL2(base.shape[1])
+    exact.add(base)
+    _, truth = exact.search(queries, k)
+
+    print(f"{len(base)} vectors (dim {base.shape[1]}), {n_queries} held-out queries, k={k}")
+    print(f"{'index':10s} {'build s':>8s} {'size MB':>8s} {'recall@k':>9s} "
+          f"{'p50 ms':>7s} {'p95 ms':>7s} {'p99 ms':>7s} {'batch q/s':>10s}  params")
+    results = []
+    for index_type in index_types:
+        start = time.perf_counter()
+        try:
+            index = build_index(base, index_type, **params)
+        except (ValueError, RuntimeError) as e:
+            print(f"{index_type:10s} skipped: {e}")
+            continue
+        build_seconds = time.perf_counter() - start
+
+        # one query at a time (online latency), then all at once (offline throughput)
+        latencies = []
+        found = np.empty((n_queries, k), dtype=np.int64)
+        for i in range(n_queries):
+            start = time.perf_counter()
+            _, found[i:i + 1] = index.search(queries[i:i + 1], k)
+            latencies.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        index.search(queries, k)
+        batch_qps = n_queries / (time.perf_counter() - start)
+
+        recall = np.mean([len(set(t) & set(f)) / k for t, f in zip(truth, found)])
+        result = {
+            "index_type": index_type,
+            "build_seconds": build_seconds,
+            "size_bytes": index_size_bytes(index),
+            "recall_at_k": float(recall),
+            "p50_ms": percentile_ms(latencies, 50),
+            "p95_ms": percentile_ms(latencies, 95),
+            "p99_ms": percentile_ms(latencies, 99),
+            "batch_qps": batch_qps,
+            "params": resolve_params(index_type, len(base), **params),
+        }
+        results.append(result)
+        print(f"{index_type:10s} {build_seconds:8.2f} {result['size_bytes'] / 1e6:8.2f} {recall:9.3f} "
+              f"{result['p50_ms']:7.3f} {result['p95_ms']:7.3f} {result['p99_ms']:7.3f} {batch_qps:10.0f}  {result['params']}")
+    return results
+
+
 def main():
     p = argparse.ArgumentParser()
-    p.add_argument("--knowledge", required=True, type=Path)
+    p.add_argument("--knowledge", type=Path)
     p.add_argument("--model", default="all-MiniLM-L6-v2")
     p.add_argument("--index_out", default=Path("./embeddings"), type=Path)
+    p.add_argument("--index_type", default="flat", choices=INDEX_TYPES)
+    p.add_argument("--nlist", type=int, help="IVF cells (default: about 4 * sqrt(rows))")
+    p.add_argument("--nprobe", type=int, help="IVF cells searched per query (default: 16)")
+    p.add_argument("--hnsw_m", type=int, help="HNSW links per node (default: 32)")
+    p.add_argument("--ef_construction", type=int, help="HNSW build beam width (default: 200)")
+    p.add_argument("--ef_search", type=int, help="HNSW search beam width (default: 64)")
+    p.add_argument("--pq_m", type=int, help="PQ sub-vectors, must divide the dimension (default: 16)")
+    p.add_argument("--pq_bits", type=int, help="Bits per PQ code (default: 8)")
+    p.add_argument("--benchmark", action="store_true", help="Benchmark index types on <index_out>/embeddings.npy")
+    p.add_argument("--benchmark_types", nargs="+", default=list(INDEX_TYPES), choices=INDEX_TYPES)
+    p.add_argument("--k", type=int, default=10)
+    p.add_argument("--queries", type=int, default=500)
+    p.add_argument("--results_out", type=Path, help="Write benchmark results as JSON")
     args = p.parse_args()
 
+    params = {name: getattr(args, name) for name in DEFAULT_INDEX_PARAMS}
+    if args.benchmark:
+        embeddings = np.load(args.index_out / "embeddings.npy")
+        results = benchmark(embeddings, args.benchmark_types, k=args.k, n_queries=args.queries, **params)
+        if args.results_out:
+            with args.results_out.open("w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+        return
+
+    if args.knowledge is None:
+        p.error("--knowledge is required unless --benchmark is given")
     docs = load_knowledge(args.knowledge)
-    create_index(docs, args.model, args.index_out)
+    create_index(docs, args.model, args.index_out, args.index_type, **params)
 
 
 if __name__ == "__main__":
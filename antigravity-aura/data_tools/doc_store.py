@@ -0,0 +1,105 @@
+"""Random-access document store for FAISS hits.
+
+Row i of the index is line i of `documents.jsonl`: the full chunk text plus the
+original row metadata written by `build_knowledge.py`. `documents.offsets.npy`
+holds n + 1 byte offsets (uint64), so reading a row is one seek and one read of
+exactly that line. The offset table is memory-mapped, so lookups cost k seeks
+and memory use does not grow with the corpus.
+
+`create_embeddings.py` writes the store next to `index.faiss`. For an existing
+index, build it from the knowledge file the index was created from:
+  python doc_store.py --knowledge knowledge.jsonl --index_dir ./embeddings
+"""
+from pathlib import Path
+import argparse
+import gzip
+import json
+import shutil
+import threading
+
+import numpy as np
+
+DOCUMENTS_FILE = "documents.jsonl"
+OFFSETS_FILE = "documents.offsets.npy"
+
+
+def write_offsets(offsets, out_path: Path):
+    np.save(out_path, np.asarray(offsets, dtype=np.uint64))
+
+
+def line_offsets(path: Path):
+    """Byte offset of every line start, plus the file size."""
+    offsets = [0]
+    with path.open("rb") as f:
+        for line in f:
+            offsets.append(offsets[-1] + len(line))
+    return offsets
+
+
+def write_doc_store(docs, out_dir: Path) -> int:
+    """Write docs (an iterable of dicts, in index row order); returns the row count."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    offsets = [0]
+    with (out_dir / DOCUMENTS_FILE).open("wb") as f:
+        for d in docs:
+            line = (json.dumps(d) + "\n").encode("utf-8")
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+    write_offsets(offsets, out_dir / OFFSETS_FILE)
+    return len(offsets) - 1
+
+
+def build_doc_store(knowledge_path: Path, out_dir: Path) -> int:
+    """Copy a knowledge JSONL (or .jsonl.gz) into the store and index its lines; returns the row count."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    documents = out_dir / DOCUMENTS_FILE
+    if knowledge_path.suffix == ".gz":
+        with gzip.open(knowledge_path, "rb") as src, documents.open("wb") as dst:
+            shutil.copyfileobj(src, dst)
+    else:
+        shutil.copyfile(knowledge_path, documents)
+    offsets = line_offsets(documents)
+    write_offsets(offsets, out_dir / OFFSETS_FILE)
+    return len(offsets) - 1
+
+
+class DocStore:
+    """Documents by FAISS row id, read on demand."""
+
+    def __init__(self, index_dir: Path):
+        self.offsets = np.load(index_dir / OFFSETS_FILE, mmap_mode="r")
+        self._file = (index_dir / DOCUMENTS_FILE).open("rb")
+        self._lock = threading.Lock()  # seek + read must not interleave
+
+    @staticmethod
+    def exists(index_dir: Path) -> bool:
+        return (index_dir / OFFSETS_FILE).exists() and (index_dir / DOCUMENTS_FILE).exists()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def get(self, row: int) -> dict:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        with self._lock:
+            self._file.seek(start)
+            line = self._file.read(end - start)
+        return json.loads(line)
+
+    __getitem__ = get
+
+    def close(self):
+        self._file.close()
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--knowledge", required=True, type=Path)
+    p.add_argument("--index_dir", default=Path("./embeddings"), type=Path)
+    args = p.parse_args()
+
+    rows = build_doc_store(args.knowledge, args.index_dir)
+    print(f"Wrote document store ({rows} rows) to {args.index_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,26 @@
 
 Usage:
   python query_index.py --index_dir ./embeddings --query "how to stop anxiety" --model all-MiniLM-L6-v2 --k 5
+
+Batch mode loads the model, index and metadata once, then answers many queries
+(one per line), encoding each batch in one call and running one batched search.
+Results are written as JSON lines to stdout; per-batch latency goes to stderr:
+  python query_index.py --index_dir ./embeddings --queries queries.txt > results.jsonl
+  cat queries.txt | python query_index.py --index_dir ./embeddings --queries -
+  python query_index.py --index_dir ./embeddings --port 8765   # local socket server
+
+The socket server listens on 127.0.0.1. Clients send queries one per line and get
+one JSON line back per query, in order. Queries from concurrent connections are
+batched together (up to --batch_size, waiting at most --max_wait_ms).
 """
 from pathlib import Path
 import argparse
 import json
+import queue
+import socketserver
+import sys
+import threading
+import time
 
 try:
     from sentence_transformers import SentenceTransformer
@@ -19,6 +35,8 @@ except Exception:
 
 import numpy as np
 
+from doc_store import DocStore
+
 
 def load_metadata(md_path: Path):
     meta = []
@@ -28,37 +46,204 @@ def load_metadata(md_path: Path):
     return meta
 
 
-def query(index_dir: Path, query_text: str, model_name: str, k: int = 5):
-    if SentenceTransformer is None:
-        raise RuntimeError("sentence-transformers not installed")
-    if faiss is None:
-        raise RuntimeError("faiss-cpu not installed")
-
-    model = SentenceTransformer(model_name)
-    q_emb = model.encode([query_text], convert_to_numpy=True)
+class QueryEngine:
+    """Model, index and document store loaded once, answering batches of queries."""
+
+    def __init__(self, index_dir: Path, model_name: str):
+        if SentenceTransformer is None:
+            raise RuntimeError("sentence-transformers not installed")
+        if faiss is None:
+            raise RuntimeError("faiss-cpu not installed")
+
+        start = time.perf_counter()
+        self.model = SentenceTransformer(model_name)
+        loaded_model = time.perf_counter()
+        self.index = faiss.read_index(str(index_dir / "index.faiss"))
+        loaded_index = time.perf_counter()
+        if DocStore.exists(index_dir):
+            self.docs = DocStore(index_dir)
+        else:
+            # index built before the document store: parse all of metadata.jsonl
+            log("No document store in index_dir (python doc_store.py builds one); loading metadata.jsonl")
+            self.docs = load_metadata(index_dir / "metadata.jsonl")
+        loaded_meta = time.perf_counter()
+        self.load_seconds = loaded_meta - start
+        log(f"Loaded model in {loaded_model - start:.2f}s, index ({self.index.ntotal} vectors) "
+            f"in {loaded_index - loaded_model:.2f}s, documents in {loaded_meta - loaded_index:.2f}s")
+
+        self.batches = 0
+        self.queries = 0
+        self.batch_seconds = []
+
+    def search_batch(self, query_texts, k: int = 5):
+        """Top-k (distance, metadata) pairs for each query: one encode, one index.search."""
+        start = time.perf_counter()
+        q_emb = self.model.encode(list(query_texts), convert_to_numpy=True)
+        encoded = time.perf_counter()
+        D, I = self.index.search(np.ascontiguousarray(q_emb, dtype=np.float32), k)
+        searched = time.perf_counter()
+
+        results = []
+        for dists, ids in zip(D, I):
+            # faiss pads with -1 when fewer than k vectors are found
+            results.append([(float(dist), self.docs[idx])
+                            for dist, idx in zip(dists, ids) if 0 <= idx < len(self.docs)])
+        finished = time.perf_counter()
+
+        self.batches += 1
+        self.queries += len(query_texts)
+        self.batch_seconds.append(finished - start)
+        log(f"batch {self.batches}: {len(query_texts)} queries | encode {(encoded - start) * 1000:.1f} ms | "
+            f"search {(searched - encoded) * 1000:.1f} ms | total {(finished - start) * 1000:.1f} ms | "
+            f"{len(query_texts) / (finished - start):.0f} q/s")
+        return results
+
+    def summary(self) -> str:
+        if not self.batches:
+            return "No queries answered"
+        seconds = np.array(self.batch_seconds) * 1000
+        return (f"{self.queries} queries in {self.batches} batches (load {self.load_seconds:.2f}s, "
+                f"search {seconds.sum() / 1000:.2f}s) | batch latency p50 {np.percentile(seconds, 50):.1f} ms, "
+                f"p95 {np.percentile(seconds, 95):.1f} ms, max {seconds.max():.1f} ms")
+
+
+def log(message: str):
+    print(message, file=sys.stderr, flush=True)
+
+
+def result_line(query_text: str, results) -> str:
+    return json.dumps({"query": query_text,
+                       "results": [{"score": dist, **m} for dist, m in results]})
 
-    idx = faiss.read_index(str(index_dir / "index.faiss"))
-    D, I = idx.search(q_emb, k)
 
-    meta = load_metadata(index_dir / "metadata.jsonl")
-    results = []
-    for dist, idx in zip(D[0], I[0]):
-        if idx < len(meta):
-            results.append((dist, meta[idx]))
-    return results
+def query(index_dir: Path, query_text: str, model_name: str, k: int = 5):
+    return QueryEngine(index_dir, model_name).search_batch([query_text], k)[0]
+
+
+def read_batches(lines, batch_size: int):
+    """Non-empty stripped lines, grouped into lists of up to batch_size."""
+    batch = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        batch.append(line)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_stream(engine: QueryEngine, lines, k: int, batch_size: int, out=sys.stdout):
+    for batch in read_batches(lines, batch_size):
+        for query_text, results in zip(batch, engine.search_batch(batch, k)):
+            out.write(result_line(query_text, results) + "\n")
+        out.flush()
+
+
+class _Connection:
+    """Reply side of one socket client: writes are serialized, unanswered queries counted."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.outstanding = 0
+        self.cond = threading.Condition()
+
+    def submit(self, pending: queue.Queue, text: str):
+        with self.cond:
+            self.outstanding += 1
+        pending.put((text, self))
+
+    def reply(self, line: str):
+        with self.cond:
+            try:
+                self.wfile.write((line + "\n").encode("utf-8"))
+                self.wfile.flush()
+            except OSError:
+                pass  # client went away
+            self.outstanding -= 1
+            self.cond.notify_all()
+
+    def wait_answered(self):
+        with self.cond:
+            self.cond.wait_for(lambda: self.outstanding == 0)
+
+
+def serve(engine: QueryEngine, port: int, k: int, batch_size: int, max_wait_ms: float):
+    """Answer line-delimited queries on 127.0.0.1:port, batching across connections."""
+    pending = queue.Queue()  # (query text, _Connection)
+
+    def batch_worker():
+        while True:
+            batch = [pending.get()]
+            deadline = time.perf_counter() + max_wait_ms / 1000
+            while len(batch) < batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(pending.get(timeout=remaining) if remaining > 0 else pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                all_results = engine.search_batch([text for text, _ in batch], k)
+            except Exception as e:
+                log(f"batch failed: {e}")
+                all_results = [None] * len(batch)
+            # One worker writes every reply, so each connection gets its answers in order
+            for (text, conn), results in zip(batch, all_results):
+                conn.reply(result_line(text, results) if results is not None
+                           else json.dumps({"query": text, "error": "search failed"}))
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            conn = _Connection(self.wfile)
+            for raw in self.rfile:
+                text = raw.decode("utf-8", errors="replace").strip()
+                if text:
+                    conn.submit(pending, text)
+            # The client closed its side; answer what it sent before the socket closes
+            conn.wait_answered()
+
+    threading.Thread(target=batch_worker, name="query-batcher", daemon=True).start()
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    with socketserver.ThreadingTCPServer(("127.0.0.1", port), Handler) as server:
+        server.daemon_threads = True
+        log(f"Listening on 127.0.0.1:{port} (one query per line; Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
 
 
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("--index_dir", required=True, type=Path)
-    p.add_argument("--query", required=True)
+    source = p.add_mutually_exclusive_group(required=True)
+    source.add_argument("--query", help="Answer a single query")
+    source.add_argument("--queries", help="File with one query per line ('-' for stdin)")
+    source.add_argument("--port", type=int, help="Serve queries on a local socket (127.0.0.1)")
     p.add_argument("--model", default="all-MiniLM-L6-v2")
     p.add_argument("--k", type=int, default=5)
+    p.add_argument("--batch_size", type=int, default=64)
+    p.add_argument("--max_wait_ms", type=float, default=10.0, help="Socket mode: wait for more queries per batch")
     args = p.parse_args()
 
-    res = query(args.index_dir, args.query, args.model, args.k)
-    for dist, m in res:
-        print(f"score={dist:.4f} doc={m}")
+    if args.query is not None:
+        res = query(args.index_dir, args.query, args.model, args.k)
+        for dist, m in res:
+            print(f"score={dist:.4f} doc={m}")
+        return
+
+    engine = QueryEngine(args.index_dir, args.model)
+    if args.port is not None:
+        serve(engine, args.port, args.k, args.batch_size, args.max_wait_ms)
+    elif args.queries == "-":
+        # Answer interactive input line by line instead of waiting for a full batch
+        run_stream(engine, sys.stdin, args.k, 1 if sys.stdin.isatty() else args.batch_size)
+    else:
+        with open(args.queries, "r", encoding="utf-8") as f:
+            run_stream(engine, f, args.k, args.batch_size)
+    log(engine.summary())
 
 
 if __name__ == "__main__":